@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Benchmark cold-start import time of each package entry point."""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = [
+    "src",
+    "src.tools",
+    "src.tools.response_parser",
+    "src.exporter",
+    "src.exporter.exporter",
+    "src.pipeline",
+    "src.agents",
+    "src.utils",
+]
+
+# Heavy dependencies worth reporting when an entry point pulls them in
+HEAVY_MODULES = ["google.adk", "google.genai", "reportlab.platypus"]
+
+PROBE = """
+import json, sys, time
+start_time = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start_time
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(module, repeats):
+    """Best-of-repeats import time of module in a fresh interpreter, and the heavy modules it loaded."""
+    best = float("inf")
+    loaded = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        best = min(best, result["seconds"])
+        loaded = result["loaded"]
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Package import cold-start benchmark")
+    parser.add_argument("--modules", nargs="+", default=ENTRY_POINTS,
+                       help="Modules to import (default: every package entry point)")
+    parser.add_argument("--repeats", type=int, default=5,
+                       help="Fresh interpreters per module, best is reported (default: 5)")
+
+    args = parser.parse_args()
+
+    print("="*70)
+    print("IMPORT TIME BENCHMARK")
+    print("="*70)
+    print(f"{'Module':<28} {'Time (ms)':>10}  Heavy dependencies loaded")
+
+    for module in args.modules:
+        elapsed, loaded = time_import(module, args.repeats)
+        print(f"{module:<28} {elapsed*1000:>10.1f}  {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
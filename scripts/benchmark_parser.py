@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Benchmark report parsing on synthetic reports of growing size."""
+
+import argparse
+import random
+import time
+
+from src.tools.response_parser import extract_violation_details, parse_compliance_response
+
+SEVERITIES = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+ICONS = {"CRITICAL": "🔴", "HIGH": "🟠", "MEDIUM": "🟡", "LOW": "🟢"}
+
+
+def synthetic_report(violations, seed=0):
+    """Build an orchestrator-style report with the given number of violations."""
+    rng = random.Random(seed)
+    per_severity = {severity: [] for severity in SEVERITIES}
+    for i in range(violations):
+        per_severity[rng.choice(SEVERITIES)].append(i)
+
+    lines = [
+        "📊 EXECUTIVE SUMMARY:",
+        f"- Total violations found: {violations}",
+        "- Severity breakdown: " + ", ".join(f"{len(per_severity[s])} {s}" for s in SEVERITIES),
+        "- Overall compliance status: FAIL",
+    ]
+    for severity in SEVERITIES:
+        lines.append("")
+        lines.append(f"{ICONS[severity]} {severity} VIOLATIONS:")
+        for i in per_severity[severity]:
+            lines.append(f"{severity}: Violation {i} found in section {i % 17}.{i % 5}, "
+                         "where the document stores customer records without the required controls")
+            if severity in ("CRITICAL", "HIGH"):
+                lines.append(f"✅ COMPLIANT REWRITE:\nStore record set {i} encrypted with AES-256")
+    return "\n".join(lines)
+
+
+def time_parse(report, repeats):
+    """Best-of-repeats time to produce counts, rewrites and violation details."""
+    best = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        parse_compliance_response(report)
+        extract_violation_details(report)
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report parser throughput benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                       help="Violations per synthetic report (default: 10 100 1000 10000)")
+    parser.add_argument("--repeats", type=int, default=5,
+                       help="Timed runs per size, best is reported (default: 5)")
+
+    args = parser.parse_args()
+
+    print("="*70)
+    print("REPORT PARSER BENCHMARK")
+    print("="*70)
+    print(f"{'Violations':>10} {'Chars':>12} {'Time (ms)':>12} {'us/KB':>10} {'MB/s':>10}")
+
+    for size in args.sizes:
+        report = synthetic_report(size)
+        elapsed = time_parse(report, args.repeats)
+        kb = len(report) / 1024
+        print(f"{size:>10} {len(report):>12} {elapsed*1000:>12.2f} "
+              f"{elapsed*1e6/kb:>10.1f} {kb/1024/elapsed:>10.1f}")
+
+    print("\nLinear scaling shows as a flat us/KB column.")
+
+
+if __name__ == "__main__":
+    main()
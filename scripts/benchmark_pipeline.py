@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Benchmark pipeline orchestration, parsing and export offline with the stub model."""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.exporter.exporter import export_to_csv, export_to_html, export_to_json
+from src.pipeline import collect_documents, create_compliance_pipeline
+from src.tools.response_parser import parse_compliance_response
+from src.utils.config import get_retry_config
+from src.utils.rate_limiter import rate_limiter_stats
+
+
+async def benchmark_pipeline(policy_text, documents, repeats, concurrency):
+    """Run every document `repeats` times and time each pipeline run."""
+    pipeline = create_compliance_pipeline(get_retry_config(), backend="stub")
+    rules, _ = await pipeline.extract_policy(policy_text)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed_run(document_text):
+        async with semaphore:
+            start_time = time.perf_counter()
+            results = await pipeline.run(policy_text, document_text, rules=rules)
+            return results, time.perf_counter() - start_time
+
+    wall_start = time.perf_counter()
+    runs = await asyncio.gather(*(timed_run(doc) for doc in documents * repeats))
+    wall_time = time.perf_counter() - wall_start
+
+    return [results for results, _ in runs], [elapsed for _, elapsed in runs], wall_time
+
+
+def benchmark_parsing(reports):
+    """Time parse_compliance_response over every report."""
+    start_time = time.perf_counter()
+    for report in reports:
+        parse_compliance_response(report)
+    return time.perf_counter() - start_time
+
+
+def benchmark_export(all_results):
+    """Time the JSON, CSV and HTML exporters over every result set."""
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, exporter, suffix in [
+            ("json", export_to_json, "json"),
+            ("csv", export_to_csv, "csv"),
+            ("html", export_to_html, "html"),
+        ]:
+            start_time = time.perf_counter()
+            for i, results in enumerate(all_results):
+                exporter(results, Path(tmp) / f"report_{i}.{suffix}")
+            timings[name] = time.perf_counter() - start_time
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark")
+    parser.add_argument("--policy", default="demo_data/acme_corporation_company_policy.txt",
+                       help="Path to policy document")
+    parser.add_argument("--documents", default="demo_data/test_documents",
+                       help="Directory or glob of documents")
+    parser.add_argument("--repeats", type=int, default=20,
+                       help="Times each document is scanned (default: 20)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                       help="Simulated seconds per model call (default: 0)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                       help="Documents processed concurrently (default: 8)")
+    parser.add_argument("--rpm", type=float,
+                       help="Shared requests-per-minute budget for all model calls")
+
+    args = parser.parse_args()
+
+    os.environ["COMPLIANCE_STUB_LATENCY"] = str(args.latency)
+    if args.rpm:
+        os.environ["COMPLIANCE_RPM"] = str(args.rpm)
+
+    with open(args.policy, 'r') as f:
+        policy_text = f.read()
+
+    documents = [p.read_text() for p in collect_documents(args.documents)]
+
+    all_results, latencies, wall_time = asyncio.run(
+        benchmark_pipeline(policy_text, documents, args.repeats, args.concurrency)
+    )
+    runs = len(all_results)
+    model_calls = sum(r["model_calls"] for r in all_results)
+
+    # Exporters print one line per file; keep the benchmark output readable
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            parse_time = benchmark_parsing([r["report"] for r in all_results])
+            export_times = benchmark_export(all_results)
+
+    print("="*70)
+    print("OFFLINE PIPELINE BENCHMARK (stub model)")
+    print("="*70)
+    print(f"Runs: {runs} ({len(documents)} documents x {args.repeats})")
+    print(f"Simulated model latency: {args.latency*1000:.1f} ms/call, {model_calls} calls")
+    print(f"Pipeline: {runs/wall_time:.1f} docs/s, "
+          f"mean {statistics.mean(latencies)*1000:.2f} ms/doc, "
+          f"max {max(latencies)*1000:.2f} ms/doc")
+    if args.rpm:
+        print(f"Rate limit: {args.rpm:.0f} rpm budget, {model_calls/wall_time*60:.0f} rpm achieved, "
+              f"stats {rate_limiter_stats()}")
+    print(f"Parsing: {runs/parse_time:.0f} reports/s")
+    for fmt, elapsed in export_times.items():
+        print(f"Export {fmt}: {runs/elapsed:.0f} files/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Script to gate a CI build on compliance violations at or above a severity."""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import Optional
+
+from src.pipeline import collect_documents, create_compliance_pipeline
+from src.pipeline.compliance_pipeline import PRESCAN_MODES, SEVERITY_LEVELS
+from src.utils.config import get_retry_config, load_api_key
+from src.utils.models import MODEL_BACKENDS, uses_remote_model
+from src.utils.policy_cache import DEFAULT_POLICY_CACHE_PATH, PolicyRuleCache
+
+
+async def run_gate(
+    policy_path: str,
+    documents: str,
+    pattern: str = "*.txt",
+    threshold: str = "CRITICAL",
+    workers: int = 8,
+    concurrency: int = 4,
+    policy_cache_path: Optional[str] = DEFAULT_POLICY_CACHE_PATH,
+    chunk_chars: Optional[int] = None,
+    prescan: str = "off"
+) -> bool:
+    """Gate every matching document; returns whether all of them passed."""
+    if uses_remote_model():
+        load_api_key()
+
+    policy_cache = PolicyRuleCache(policy_cache_path) if policy_cache_path else None
+    pipeline = create_compliance_pipeline(
+        get_retry_config(),
+        max_concurrency=concurrency,
+        policy_cache=policy_cache,
+        chunk_chars=chunk_chars,
+        prescan=prescan
+    )
+
+    with open(policy_path, 'r') as f:
+        policy_text = f.read()
+
+    document_paths = collect_documents(documents, pattern)
+    if not document_paths:
+        raise FileNotFoundError(f"No documents found: {documents}")
+
+    print(f"Gating {len(document_paths)} documents on {threshold} or above...\n")
+
+    rules, _ = await pipeline.extract_policy(policy_text)
+    slots = asyncio.Semaphore(workers)
+
+    async def gate_document(path):
+        async with slots:
+            verdict = await pipeline.gate(policy_text, path.read_text(), threshold, rules=rules)
+        evidence = verdict["evidence"]
+        if evidence is None:
+            print(f"PASS {path} ({verdict['violations_analyzed']} findings below {threshold})")
+        else:
+            print(f"FAIL {path}: {evidence['severity']} {evidence['description']} "
+                  f"[{evidence['policy_ref']}] at {evidence['location']}")
+            print(f"     \"{evidence['quote']}\"")
+        return verdict["passed"]
+
+    passed = await asyncio.gather(*(gate_document(path) for path in document_paths))
+    print(f"\n{sum(passed)}/{len(passed)} documents passed")
+    return all(passed)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fail (exit status 1) if any document has a violation at or above a severity"
+    )
+    parser.add_argument("--policy", required=True, help="Path to policy document")
+    parser.add_argument("--documents", required=True,
+                       help="Directory of documents, or a glob such as 'docs/**/*.md'")
+    parser.add_argument("--pattern", default="*.txt",
+                       help="File pattern when --documents is a directory (default: *.txt)")
+    parser.add_argument("--fail-on", choices=SEVERITY_LEVELS, default="CRITICAL",
+                       help="Lowest severity that fails the gate (default: CRITICAL)")
+    parser.add_argument("--workers", type=int, default=8,
+                       help="Documents gated concurrently (default: 8)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                       help="Max concurrent model calls per document (default: 4)")
+    parser.add_argument("--policy-cache", default=DEFAULT_POLICY_CACHE_PATH,
+                       help=f"Extracted policy rule cache (default: {DEFAULT_POLICY_CACHE_PATH})")
+    parser.add_argument("--no-policy-cache", action="store_true",
+                       help="Always re-extract policy rules")
+    parser.add_argument("--chunk-chars", type=int,
+                       help="Scan documents longer than this many characters as concurrent chunks, "
+                            "stopping at the first failing chunk")
+    parser.add_argument("--prescan", choices=PRESCAN_MODES, default="off",
+                       help="Flag pattern-detectable violations locally; hits are confirmed by the "
+                            "scanner (merge) or analyzer (local) before they can fail (default: off)")
+    parser.add_argument("--backend", choices=MODEL_BACKENDS,
+                       help="Model backend (default: $COMPLIANCE_MODEL_BACKEND or gemini)")
+
+    args = parser.parse_args()
+
+    if args.backend:
+        os.environ["COMPLIANCE_MODEL_BACKEND"] = args.backend
+
+    passed = asyncio.run(run_gate(
+        args.policy,
+        args.documents,
+        pattern=args.pattern,
+        threshold=args.fail_on,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        policy_cache_path=None if args.no_policy_cache else args.policy_cache,
+        chunk_chars=args.chunk_chars,
+        prescan=args.prescan
+    ))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,41 @@ import json
 from pathlib import Path
 from argparse import ArgumentParser
 from src.exporter.exporter import export_all
+from src.exporter.streaming import (
+    iter_batch_records,
+    iter_violation_records,
+    stream_to_csv,
+    stream_to_jsonl,
+)
+
+
+def export_streaming(records_factory, base_name, output_dir, fmt, append):
+    """Stream violation records to JSON Lines and/or CSV without loading them all."""
+    output_dir = Path(output_dir)
+    writers = {"jsonl": stream_to_jsonl, "csv": stream_to_csv}
+    for name, writer in writers.items():
+        if fmt not in (name, "all"):
+            continue
+        output_path = output_dir / f"{base_name}_violations.{name}"
+        # Each format gets a fresh iterator, so records are never materialized
+        count = writer(records_factory(), output_path, append=append)
+        print(f"💾 {count} violations {'appended to' if append else 'written to'} → {output_path}")
 
 
 def main():
     """Export results from JSON file to multiple formats."""
     parser = ArgumentParser(description="Export compliance results")
-    parser.add_argument("--input", required=True, help="Path to input JSON results file")
-    parser.add_argument("--format", choices=["json", "csv", "html", "pdf", "all"], 
+    parser.add_argument("--input", required=True,
+                       help="Path to input JSON results file, or a run_batch .jsonl file")
+    parser.add_argument("--format", choices=["json", "jsonl", "csv", "html", "pdf", "all"], 
                        default="all", help="Export format (default: all)")
     parser.add_argument("--output-dir", default="output", help="Output directory")
+    parser.add_argument("--append", action="store_true",
+                       help="Append violation records to an existing jsonl/csv export")
+    parser.add_argument("--pdf-volume-size", type=int, default=None,
+                       help="Violations per PDF; larger reports are split into volumes")
+    parser.add_argument("--html-page-size", type=int, default=None,
+                       help="Violations per HTML page; larger reports are split into linked pages")
     
     args = parser.parse_args()
     
@@ -26,6 +52,17 @@ def main():
     if not input_path.is_file():
         raise ValueError(f"Input path is not a file: {args.input}")
     
+    base_name = input_path.stem
+    
+    # Batch output is streamed record by record; only jsonl and csv make sense
+    if input_path.suffix == ".jsonl":
+        if args.format not in ("jsonl", "csv", "all"):
+            raise ValueError("Batch .jsonl input can only be exported as jsonl or csv")
+        export_streaming(lambda: iter_batch_records(input_path), base_name,
+                         args.output_dir, args.format, args.append)
+        print(f"✅ Export completed to: {args.output_dir}/")
+        return
+    
     # Load results
     try:
         with open(input_path, 'r') as f:
@@ -34,8 +71,14 @@ def main():
         raise ValueError(f"Invalid JSON file: {e}")
     
     # Export
-    base_name = input_path.stem
-    export_all(results, base_name=base_name, output_dir=args.output_dir, fmt=args.format)
+    if args.append and args.format not in ("jsonl", "csv"):
+        raise ValueError("--append is only supported for jsonl and csv exports")
+    if args.format == "jsonl" or args.append:
+        export_streaming(lambda: iter_violation_records(results), base_name,
+                         args.output_dir, args.format, args.append)
+    else:
+        export_all(results, base_name=base_name, output_dir=args.output_dir, fmt=args.format,
+                   html_page_size=args.html_page_size, pdf_volume_size=args.pdf_volume_size)
     
     print(f"✅ Export completed to: {args.output_dir}/")
 
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Script to run compliance checks on a whole directory of documents."""
+
+import argparse
+import asyncio
+import os
+from typing import Optional
+
+from src.pipeline import collect_documents, create_compliance_pipeline, run_batch
+from src.pipeline.compliance_pipeline import PRESCAN_MODES
+from src.utils.checkpoint_store import DEFAULT_CHECKPOINT_STORE_PATH, CheckpointStore
+from src.utils.config import get_retry_config, load_api_key
+from src.utils.metrics import get_metrics
+from src.utils.models import MODEL_BACKENDS, uses_remote_model
+from src.utils.rate_limiter import rate_limiter_stats
+from src.utils.response_cache import DEFAULT_RESPONSE_CACHE_PATH
+from src.utils.policy_cache import DEFAULT_POLICY_CACHE_PATH, PolicyRuleCache
+
+
+async def run_batch_check(
+    policy_path: str,
+    documents: str,
+    output_path: str,
+    pattern: str = "*.txt",
+    workers: int = 8,
+    concurrency: int = 4,
+    policy_cache_path: Optional[str] = DEFAULT_POLICY_CACHE_PATH,
+    chunk_chars: Optional[int] = None,
+    prescan: str = "off",
+    csv_path: Optional[str] = None,
+    pdf_dir: Optional[str] = None,
+    pdf_workers: Optional[int] = None,
+    checkpoint_store_path: Optional[str] = DEFAULT_CHECKPOINT_STORE_PATH,
+    resume: bool = False,
+    metrics_path: Optional[str] = None
+):
+    """Scan every matching document against one policy."""
+    if uses_remote_model():
+        load_api_key()
+    
+    # Build agents once for the whole batch
+    policy_cache = PolicyRuleCache(policy_cache_path) if policy_cache_path else None
+    pipeline = create_compliance_pipeline(
+        get_retry_config(),
+        max_concurrency=concurrency,
+        policy_cache=policy_cache,
+        chunk_chars=chunk_chars,
+        prescan=prescan,
+        checkpoint_store=CheckpointStore(checkpoint_store_path) if checkpoint_store_path else None
+    )
+    
+    with open(policy_path, 'r') as f:
+        policy_text = f.read()
+    
+    document_paths = collect_documents(documents, pattern)
+    if not document_paths:
+        raise FileNotFoundError(f"No documents found: {documents}")
+    
+    print(f"Scanning {len(document_paths)} documents with {workers} workers...\n")
+    
+    summary = await run_batch(
+        pipeline,
+        policy_text,
+        document_paths,
+        output_path,
+        max_in_flight=workers,
+        csv_path=csv_path,
+        pdf_dir=pdf_dir,
+        pdf_workers=pdf_workers,
+        resume=resume
+    )
+    
+    print(f"Documents: {summary['documents']} ({summary['errors']} errors)")
+    if resume:
+        print(f"Skipped (already done): {summary['skipped']}")
+    print(f"Total violations: {summary['total_violations']}")
+    print(f"Severity breakdown: {summary['severity_counts']}")
+    print(f"Elapsed: {summary['elapsed']:.1f}s")
+    if rate_limiter_stats():
+        stats = rate_limiter_stats()
+        print(f"Rate limiter: {stats['granted']} calls, {stats['rate_limited']} rate limited, "
+              f"{stats['wait_seconds']:.1f}s queued")
+    print(f"✅ Results streamed to: {output_path}")
+    if csv_path:
+        print(f"✅ Violations appended to: {csv_path}")
+    if pdf_dir:
+        print(f"✅ {summary['pdf_reports']} PDF reports written to: {pdf_dir}/")
+        if summary["pdf_errors"]:
+            print(f"❌ {summary['pdf_errors']} PDF reports failed to render:")
+            for message in summary["pdf_error_messages"]:
+                print(f"   {message}")
+    if metrics_path:
+        get_metrics().write(metrics_path)
+        print(f"✅ Metrics written to: {metrics_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run compliance checks on many documents")
+    parser.add_argument("--policy", required=True, help="Path to policy document")
+    parser.add_argument("--documents", required=True,
+                       help="Directory of documents, or a glob such as 'docs/**/*.md'")
+    parser.add_argument("--pattern", default="*.txt",
+                       help="File pattern when --documents is a directory (default: *.txt)")
+    parser.add_argument("--output", default="output/batch_results.jsonl",
+                       help="JSON Lines file results are appended to")
+    parser.add_argument("--csv",
+                       help="Also append every violation to this CSV file as documents finish")
+    parser.add_argument("--pdf-dir",
+                       help="Also render one PDF report per document into this directory")
+    parser.add_argument("--pdf-workers", type=int,
+                       help="Processes rendering PDF reports (default: one per CPU)")
+    parser.add_argument("--workers", type=int, default=8,
+                       help="Documents processed concurrently (default: 8)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                       help="Max concurrent per-violation calls per document (default: 4)")
+    parser.add_argument("--policy-cache", default=DEFAULT_POLICY_CACHE_PATH,
+                       help=f"Extracted policy rule cache (default: {DEFAULT_POLICY_CACHE_PATH})")
+    parser.add_argument("--no-policy-cache", action="store_true",
+                       help="Always re-extract policy rules")
+    parser.add_argument("--checkpoint-store", default=DEFAULT_CHECKPOINT_STORE_PATH,
+                       help="Per-document stage checkpoints for resuming interrupted runs "
+                            f"(default: {DEFAULT_CHECKPOINT_STORE_PATH})")
+    parser.add_argument("--no-checkpoints", action="store_true",
+                       help="Do not checkpoint stage outputs")
+    parser.add_argument("--resume", action="store_true",
+                       help="Skip documents already completed in --output and resume the rest "
+                            "from their checkpoints")
+    parser.add_argument("--chunk-chars", type=int,
+                       help="Scan documents longer than this many characters as concurrent chunks")
+    parser.add_argument("--prescan", choices=PRESCAN_MODES, default="off",
+                       help="Flag pattern-detectable violations locally, alongside (merge) "
+                            "or instead of (local) the model scan")
+    parser.add_argument("--rpm", type=float,
+                       help="Requests per minute shared by all model calls (default: $COMPLIANCE_RPM, unlimited)")
+    parser.add_argument("--tpm", type=float,
+                       help="Tokens per minute shared by all model calls (default: $COMPLIANCE_TPM, unlimited)")
+    parser.add_argument("--response-cache", nargs="?", const=DEFAULT_RESPONSE_CACHE_PATH,
+                       help="Answer identical model calls from a local cache "
+                            f"(default path: {DEFAULT_RESPONSE_CACHE_PATH}; $COMPLIANCE_RESPONSE_CACHE)")
+    parser.add_argument("--metrics-out",
+                       help="Write per-agent and per-stage metrics here "
+                            "(Prometheus text for a .prom file, JSON otherwise)")
+    parser.add_argument("--backend", choices=MODEL_BACKENDS,
+                       help="Model backend (default: $COMPLIANCE_MODEL_BACKEND or gemini)")
+    
+    args = parser.parse_args()
+    
+    if args.backend:
+        os.environ["COMPLIANCE_MODEL_BACKEND"] = args.backend
+    if args.response_cache:
+        os.environ["COMPLIANCE_RESPONSE_CACHE"] = args.response_cache
+    if args.rpm:
+        os.environ["COMPLIANCE_RPM"] = str(args.rpm)
+    if args.tpm:
+        os.environ["COMPLIANCE_TPM"] = str(args.tpm)
+    
+    asyncio.run(run_batch_check(
+        args.policy,
+        args.documents,
+        args.output,
+        pattern=args.pattern,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        policy_cache_path=None if args.no_policy_cache else args.policy_cache,
+        chunk_chars=args.chunk_chars,
+        prescan=args.prescan,
+        csv_path=args.csv,
+        pdf_dir=args.pdf_dir,
+        pdf_workers=args.pdf_workers,
+        checkpoint_store_path=None if args.no_checkpoints else args.checkpoint_store,
+        resume=args.resume,
+        metrics_path=args.metrics_out
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import argparse
 import asyncio
 import os
 from pathlib import Path
+from typing import Optional
 
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
@@ -17,13 +18,31 @@ from src.agents import (
     create_violation_analyzer_agent,
     create_rewrite_agent,
 )
+from src.pipeline import create_compliance_pipeline
+from src.pipeline.compliance_pipeline import PRESCAN_MODES
+from src.pipeline.events import (
+    PipelineCompleted,
+    PipelineEvent,
+    RewriteGenerated,
+    RulesExtracted,
+    ScanCompleted,
+    ViolationAnalyzed,
+    ViolationFound,
+)
+from src.tools.response_parser import finding_summary
+from src.utils.checkpoint_store import DEFAULT_CHECKPOINT_STORE_PATH, CheckpointStore
 from src.utils.config import get_retry_config, load_api_key
+from src.utils.models import MODEL_BACKENDS, uses_remote_model
+from src.utils.policy_cache import DEFAULT_POLICY_CACHE_PATH, PolicyRuleCache
+from src.utils.response_cache import DEFAULT_RESPONSE_CACHE_PATH
+from src.utils.section_store import DEFAULT_SECTION_STORE_PATH, SectionFindingsStore
 
 
 async def run_single_check(policy_path: str, document_path: str):
     """Run compliance check on a single document."""
-    # Load API key
-    load_api_key()
+    # Load API key (not needed for the offline stub backend)
+    if uses_remote_model():
+        load_api_key()
     
     # Create agents
     retry_config = get_retry_config()
@@ -74,6 +93,12 @@ Provide detailed analysis with violations and rewrites.
         parts=[types.Part(text=query)]
     )
     
+    await session_service.create_session(
+        app_name="ComplianceCheck",
+        user_id="cli_user",
+        session_id="cli_session"
+    )
+    
     print("Running compliance check...\n")
     
     async for event in runner.run_async(
@@ -81,20 +106,135 @@ Provide detailed analysis with violations and rewrites.
         session_id="cli_session",
         new_message=query_content
     ):
+        # Each specialist agent's answer arrives as a tool response of the orchestrator
+        for response in event.get_function_responses():
+            print(f"✔ {response.name} finished")
         if event.is_final_response() and event.content:
             for part in event.content.parts:
                 if hasattr(part, 'text'):
                     print(part.text)
 
 
+def describe_event(event: PipelineEvent) -> str:
+    """One progress line for a streamed pipeline event."""
+    if isinstance(event, RulesExtracted):
+        return "✔ Policy rules ready" + (" (cached)" if not event.model_calls else "")
+    if isinstance(event, ScanCompleted):
+        return f"✔ Scan complete: {event.findings} potential violations"
+    if isinstance(event, ViolationFound):
+        return f"  #{event.index + 1} found: {finding_summary(event.finding)}"
+    if isinstance(event, ViolationAnalyzed):
+        violation = event.violation
+        return (f"  #{event.index + 1} {violation['severity']}: "
+                f"{violation['description']} [{violation['policy_ref']}]")
+    if isinstance(event, RewriteGenerated):
+        return f"  #{event.index + 1} rewrite ready"
+    return event.event
+
+
+async def run_pipeline_check(
+    policy_path: str,
+    document_path: str,
+    concurrency: int = 4,
+    policy_cache_path: Optional[str] = DEFAULT_POLICY_CACHE_PATH,
+    section_store_path: Optional[str] = None,
+    prescan: str = "off",
+    checkpoint_store_path: Optional[str] = None,
+    resume: bool = False
+):
+    """Run compliance check on a single document with the deterministic pipeline."""
+    if uses_remote_model():
+        load_api_key()
+    
+    policy_cache = PolicyRuleCache(policy_cache_path) if policy_cache_path else None
+    pipeline = create_compliance_pipeline(
+        get_retry_config(),
+        max_concurrency=concurrency,
+        policy_cache=policy_cache,
+        prescan=prescan,
+        checkpoint_store=CheckpointStore(checkpoint_store_path) if checkpoint_store_path else None
+    )
+    
+    with open(policy_path, 'r') as f:
+        policy_text = f.read()
+    
+    with open(document_path, 'r') as f:
+        document_text = f.read()
+    
+    print("Running compliance check (pipeline mode)...\n")
+    
+    if section_store_path:
+        results = await pipeline.run_incremental(
+            policy_text, document_text, SectionFindingsStore(section_store_path)
+        )
+    else:
+        # Print each stage as it completes instead of waiting for the slowest rewrite
+        async for event in pipeline.stream(policy_text, document_text, resume=resume):
+            if isinstance(event, PipelineCompleted):
+                results = event.results
+            else:
+                print(describe_event(event))
+        print()
+    print(results["report"])
+    print(f"\nModel calls: {results['model_calls']}"
+          f"{' (policy rules from cache)' if results['policy_cache_hit'] else ''}")
+    if results.get("resumed_stages"):
+        print(f"Stages resumed from checkpoints: {results['resumed_stages']}")
+    if results.get("prescan_hits"):
+        print(f"Local pre-scan hits: {results['prescan_hits']}")
+    if section_store_path:
+        print(f"Sections re-scanned: {results['sections_rescanned']}/{results['sections_total']}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run compliance check")
     parser.add_argument("--policy", required=True, help="Path to policy document")
     parser.add_argument("--document", required=True, help="Path to document to check")
+    parser.add_argument("--pipeline", action="store_true",
+                       help="Run the deterministic pipeline instead of the orchestrator agent")
+    parser.add_argument("--concurrency", type=int, default=4,
+                       help="Max concurrent per-violation calls in pipeline mode (default: 4)")
+    parser.add_argument("--policy-cache", default=DEFAULT_POLICY_CACHE_PATH,
+                       help=f"Extracted policy rule cache in pipeline mode (default: {DEFAULT_POLICY_CACHE_PATH})")
+    parser.add_argument("--no-policy-cache", action="store_true",
+                       help="Always re-extract policy rules in pipeline mode")
+    parser.add_argument("--section-store", nargs="?", const=DEFAULT_SECTION_STORE_PATH,
+                       help="Pipeline mode: only re-check sections changed since the last scan, "
+                            f"storing per-section findings here (default: {DEFAULT_SECTION_STORE_PATH})")
+    parser.add_argument("--checkpoint-store", nargs="?", const=DEFAULT_CHECKPOINT_STORE_PATH,
+                       help="Pipeline mode: checkpoint every stage output until the run completes "
+                            f"(default: {DEFAULT_CHECKPOINT_STORE_PATH})")
+    parser.add_argument("--resume", action="store_true",
+                       help="Pipeline mode: restart an interrupted run from its --checkpoint-store")
+    parser.add_argument("--prescan", choices=PRESCAN_MODES, default="off",
+                       help="Pipeline mode: flag pattern-detectable violations locally, "
+                            "alongside (merge) or instead of (local) the model scan")
+    parser.add_argument("--response-cache", nargs="?", const=DEFAULT_RESPONSE_CACHE_PATH,
+                       help="Answer identical model calls from a local cache "
+                            f"(default path: {DEFAULT_RESPONSE_CACHE_PATH}; $COMPLIANCE_RESPONSE_CACHE)")
+    parser.add_argument("--backend", choices=MODEL_BACKENDS,
+                       help="Model backend (default: $COMPLIANCE_MODEL_BACKEND or gemini)")
     
     args = parser.parse_args()
     
-    asyncio.run(run_single_check(args.policy, args.document))
+    if args.backend:
+        os.environ["COMPLIANCE_MODEL_BACKEND"] = args.backend
+    if args.response_cache:
+        os.environ["COMPLIANCE_RESPONSE_CACHE"] = args.response_cache
+    
+    if args.pipeline:
+        asyncio.run(run_pipeline_check(
+            args.policy,
+            args.document,
+            args.concurrency,
+            None if args.no_policy_cache else args.policy_cache,
+            args.section_store,
+            args.prescan,
+            args.checkpoint_store,
+            args.resume
+        ))
+    else:
+        asyncio.run(run_single_check(args.policy, args.document))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Script to serve compliance checks over HTTP."""
+
+import argparse
+import os
+from typing import Optional
+
+import uvicorn
+
+from src.api import create_app
+from src.pipeline import create_compliance_service
+from src.pipeline.compliance_pipeline import PRESCAN_MODES
+from src.utils.config import get_retry_config, load_api_key
+from src.utils.models import MODEL_BACKENDS, uses_remote_model
+from src.utils.policy_cache import DEFAULT_POLICY_CACHE_PATH, PolicyRuleCache
+from src.utils.response_cache import DEFAULT_RESPONSE_CACHE_PATH
+
+
+def build_service_factory(
+    concurrency: int = 4,
+    policy_cache_path: Optional[str] = DEFAULT_POLICY_CACHE_PATH,
+    prescan: str = "off"
+):
+    """Return a factory that builds the ComplianceService at server startup."""
+    def factory():
+        if uses_remote_model():
+            load_api_key()
+        return create_compliance_service(
+            get_retry_config(),
+            max_concurrency=concurrency,
+            policy_cache=PolicyRuleCache(policy_cache_path) if policy_cache_path else None,
+            prescan=prescan
+        )
+    return factory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve compliance checks over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("--workers", type=int, default=4,
+                       help="Checks run concurrently (default: 4)")
+    parser.add_argument("--queue-size", type=int, default=32,
+                       help="Checks allowed to wait before new ones get 429 (default: 32)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                       help="Max concurrent per-violation calls within one check (default: 4)")
+    parser.add_argument("--policy-cache", default=DEFAULT_POLICY_CACHE_PATH,
+                       help=f"Extracted policy rule cache (default: {DEFAULT_POLICY_CACHE_PATH})")
+    parser.add_argument("--no-policy-cache", action="store_true",
+                       help="Always re-extract policy rules")
+    parser.add_argument("--prescan", choices=PRESCAN_MODES, default="off",
+                       help="Flag pattern-detectable violations locally, "
+                            "alongside (merge) or instead of (local) the model scan")
+    parser.add_argument("--rpm", type=float,
+                       help="Requests per minute shared by all model calls (default: $COMPLIANCE_RPM, unlimited)")
+    parser.add_argument("--tpm", type=float,
+                       help="Tokens per minute shared by all model calls (default: $COMPLIANCE_TPM, unlimited)")
+    parser.add_argument("--response-cache", nargs="?", const=DEFAULT_RESPONSE_CACHE_PATH,
+                       help="Answer identical model calls from a local cache "
+                            f"(default path: {DEFAULT_RESPONSE_CACHE_PATH}; $COMPLIANCE_RESPONSE_CACHE)")
+    parser.add_argument("--backend", choices=MODEL_BACKENDS,
+                       help="Model backend (default: $COMPLIANCE_MODEL_BACKEND or gemini)")
+
+    args = parser.parse_args()
+
+    if args.backend:
+        os.environ["COMPLIANCE_MODEL_BACKEND"] = args.backend
+    if args.response_cache:
+        os.environ["COMPLIANCE_RESPONSE_CACHE"] = args.response_cache
+    if args.rpm:
+        os.environ["COMPLIANCE_RPM"] = str(args.rpm)
+    if args.tpm:
+        os.environ["COMPLIANCE_TPM"] = str(args.tpm)
+
+    app = create_app(
+        build_service_factory(
+            args.concurrency,
+            None if args.no_policy_cache else args.policy_cache,
+            args.prescan
+        ),
+        workers=args.workers,
+        max_queued=args.queue_size
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
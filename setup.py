@@ -33,5 +33,9 @@ setup(
             "pytest-asyncio>=0.21.0",
             "jupyter>=1.0.0",
         ],
+        "server": [
+            "fastapi>=0.100.0",
+            "uvicorn>=0.20.0",
+        ],
     },
 )
\ No newline at end of file
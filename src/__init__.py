@@ -8,11 +8,7 @@ __version__ = "1.0.0"
 __author__ = "Praxc"
 __email__ = "praxc@github.com"
 
-from src.agents.orchestrator import create_orchestrator_agent
-from src.agents.policy_extractor import create_policy_extractor_agent
-from src.agents.document_scanner import create_document_scanner_agent
-from src.agents.violation_analyzer import create_violation_analyzer_agent
-from src.agents.rewrite_agent import create_rewrite_agent
+import importlib
 
 __all__ = [
     "create_orchestrator_agent",
@@ -20,4 +16,14 @@ __all__ = [
     "create_document_scanner_agent",
     "create_violation_analyzer_agent",
     "create_rewrite_agent",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # The agent factories import google.adk, so load them on first access
+    # rather than whenever a tool or exporter under src is imported
+    if name in __all__:
+        value = getattr(importlib.import_module("src.agents"), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,16 +2,27 @@
 Agent implementations for the compliance Agent system.
 """
 
-from .orchestrator import create_orchestrator_agent
-from .policy_extractor import create_policy_extractor_agent
-from .document_scanner import create_document_scanner_agent
-from .violation_analyzer import create_violation_analyzer_agent
-from .rewrite_agent import create_rewrite_agent
+import importlib
 
-__all__ = [
-    "create_orchestrator_agent",
-    "create_policy_extractor_agent",
-    "create_document_scanner_agent",
-    "create_violation_analyzer_agent",
-    "create_rewrite_agent",
-]
\ No newline at end of file
+# Factory name -> defining module, imported on first access (each pulls in google.adk)
+_FACTORIES = {
+    "create_orchestrator_agent": ".orchestrator",
+    "create_policy_extractor_agent": ".policy_extractor",
+    "create_document_scanner_agent": ".document_scanner",
+    "create_violation_analyzer_agent": ".violation_analyzer",
+    "create_rewrite_agent": ".rewrite_agent",
+}
+
+__all__ = list(_FACTORIES)
+
+
+def __getattr__(name):
+    if name in _FACTORIES:
+        value = getattr(importlib.import_module(_FACTORIES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
\ No newline at end of file
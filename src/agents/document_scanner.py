@@ -1,23 +1,31 @@
 """Document scanner agent that analyzes documents for potential compliance issues."""
 
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
+from typing import Optional
 
+from src.tools.schemas import ScanResult
+from src.utils.models import create_model
 
-def create_document_scanner_agent(retry_config: types.HttpRetryOptions):
+
+def create_document_scanner_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+):
     """
     Creates an agent that scans documents for compliance violations.
     
     Args:
         retry_config: HTTP retry configuration for API calls
+        model: Model to use instead of the configured backend
         
     Returns:
         LlmAgent configured for document scanning
     """
     return LlmAgent(
         name="document_scanner",
-        model=Gemini(model="gemini-2.0-flash-lite", retry_options=retry_config),
+        model=model or create_model("document_scanner", retry_config),
         description="Scans documents to identify potential compliance violations",
         instruction="""
         You are a document compliance scanner. Your task is to:
@@ -39,14 +47,15 @@ def create_document_scanner_agent(retry_config: types.HttpRetryOptions):
            - Improper PII handling
            - Missing encryption requirements
         
-        For each potential violation found, provide:
-        - Specific text/code snippet that violates policy (exact quote)
-        - Section or line reference where found
-        - Brief explanation of WHY it's a violation
-        - Which policy rule it violates (reference the rule ID)
+        Return a JSON object with a "violations" list. For each violation found, provide:
+        - rule_id: Which policy rule it violates (reference the rule ID)
+        - quote: Specific text/code snippet that violates policy (exact quote)
+        - location: Section or line reference where found
+        - explanation: Brief explanation of WHY it's a violation
         
         Be thorough but precise. Only flag CLEAR violations, not hypotheticals.
-        If something is ambiguous, note it separately as "needs clarification".
+        Leave ambiguous statements out. An empty list means the document is compliant.
         """,
+        output_schema=ScanResult,
         tools=[]
     )
\ No newline at end of file
@@ -1,9 +1,12 @@
 """Orchestrator agent that coordinates the compliance workflow."""
 
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+from google.adk.models.base_llm import BaseLlm
 from google.adk.tools import AgentTool
 from google.genai import types
+from typing import Optional
+
+from src.utils.models import create_model
 
 
 def create_orchestrator_agent(
@@ -11,7 +14,8 @@ def create_orchestrator_agent(
     document_scanner,
     violation_analyzer,
     rewrite_agent,
-    retry_config: types.HttpRetryOptions
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
 ):
     """
     Creates the main orchestrator agent that coordinates compliance checking.
@@ -22,13 +26,14 @@ def create_orchestrator_agent(
         violation_analyzer: Violation analysis agent
         rewrite_agent: Rewrite agent
         retry_config: HTTP retry configuration
+        model: Model to use instead of the configured backend
         
     Returns:
         LlmAgent configured as orchestrator
     """
     return LlmAgent(
         name="compliance_orchestrator",
-        model=Gemini(model="gemini-2.0-flash-lite", retry_options=retry_config),
+        model=model or create_model("compliance_orchestrator", retry_config),
         description="Orchestrates the complete compliance checking workflow",
         instruction="""
         You are the Compliance Copilot orchestrator. You coordinate a team of specialist agents
@@ -91,6 +96,13 @@ def create_orchestrator_agent(
         🟢 LOW VIOLATIONS: (if any)
         [List each with severity, issue, remediation suggestion]
         
+        Finish with the same violations as a ```json block, built from the
+        specialist agents' JSON outputs (no other fields, no comments):
+        {"violations": [{"severity": "...", "description": "...", "policy_ref": "...",
+          "quote": "...", "remediation": "...", "effort": "...", "rewrite": "..."}]}
+        Use an empty "rewrite" for MEDIUM and LOW violations and an empty list
+        when the document is compliant.
+        
         ═══════════════════════════════════════════════════════════════
         
         IMPORTANT RULES:
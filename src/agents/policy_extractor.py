@@ -1,23 +1,31 @@
 """Policy extraction agent that extracts compliance rules from policy documents."""
 
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
+from typing import Optional
 
+from src.tools.schemas import PolicyRules
+from src.utils.models import create_model
 
-def create_policy_extractor_agent(retry_config: types.HttpRetryOptions):
+
+def create_policy_extractor_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+):
     """
     Creates an agent that extracts structured compliance requirements from policy documents.
     
     Args:
         retry_config: HTTP retry configuration for API calls
+        model: Model to use instead of the configured backend
         
     Returns:
         LlmAgent configured for policy extraction
     """
     return LlmAgent(
         name="policy_extractor",
-        model=Gemini(model="gemini-2.0-flash-lite", retry_options=retry_config),
+        model=model or create_model("policy_extractor", retry_config),
         description="Extracts and structures compliance requirements from policy documents",
         instruction="""
         You are a policy extraction specialist. Your task is to:
@@ -29,15 +37,16 @@ def create_policy_extractor_agent(retry_config: types.HttpRetryOptions):
         5. Note any specific metrics or thresholds (e.g., "within 72 hours", "AES-256")
         
         Output Format:
-        For each requirement, provide:
-        - Rule ID (e.g., SEC-1.1, ACCESS-2.3)
-        - Category (e.g., Data Security, Access Control, Data Retention)
-        - Requirement description (clear and specific)
-        - Severity level if violated
-        - Key metrics or constraints
+        Return a JSON object with a "rules" list. For each requirement, provide:
+        - rule_id: Rule ID (e.g., SEC-1.1, ACCESS-2.3)
+        - category: Category (e.g., Data Security, Access Control, Data Retention)
+        - requirement: Requirement description (clear and specific)
+        - severity: Severity level if violated
+        - constraints: Key metrics or constraints (empty if none)
         
         Be thorough and precise. Every requirement matters for compliance.
         Extract even minor requirements - they all count.
         """,
+        output_schema=PolicyRules,
         tools=[]  # No tools needed - pure text analysis
     )
\ No newline at end of file
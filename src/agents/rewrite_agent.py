@@ -1,23 +1,31 @@
 """Rewrite agent that generates compliant versions of violated sections."""
 
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
+from typing import Optional
 
+from src.tools.schemas import ComplianceRewrite
+from src.utils.models import create_model
 
-def create_rewrite_agent(retry_config: types.HttpRetryOptions):
+
+def create_rewrite_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+):
     """
     Creates an agent that rewrites document sections to be compliant.
     
     Args:
         retry_config: HTTP retry configuration for API calls
+        model: Model to use instead of the configured backend
         
     Returns:
         LlmAgent configured for compliance rewrites
     """
     return LlmAgent(
         name="rewrite_agent",
-        model=Gemini(model="gemini-2.0-flash-lite", retry_options=retry_config),
+        model=model or create_model("rewrite_agent", retry_config),
         description="Rewrites document sections to comply with policies",
         instruction="""
         You are a compliance rewrite specialist. Your task is to:
@@ -51,23 +59,14 @@ def create_rewrite_agent(retry_config: types.HttpRetryOptions):
         - Add encryption requirements for PII
         - Specify secure data storage methods
         
-        Format your output as:
-        
-        ❌ ORIGINAL (VIOLATION):
-        [Exact quote of violating text]
-        
-        ✅ COMPLIANT REWRITE:
-        [Fully compliant version]
-        
-        📋 CHANGES MADE:
-        - [Specific change 1]
-        - [Specific change 2]
-        - ...
-        
-        ✔️ COMPLIANCE ACHIEVED:
-        [Which policy requirements are now met]
+        Return a JSON object with:
+        - original: Exact quote of violating text
+        - rewrite: Fully compliant version
+        - changes: List of specific changes made, each naming the policy
+          requirement it now meets
         
         Keep rewrites practical, implementable, and maintain the original purpose.
         """,
+        output_schema=ComplianceRewrite,
         tools=[]
     )
\ No newline at end of file
@@ -1,23 +1,31 @@
 """Violation analysis agent that scores severity and provides detailed analysis."""
 
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
+from typing import Optional
 
+from src.tools.schemas import ViolationAnalysis
+from src.utils.models import create_model
 
-def create_violation_analyzer_agent(retry_config: types.HttpRetryOptions):
+
+def create_violation_analyzer_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+):
     """
     Creates an agent that analyzes and scores compliance violations.
     
     Args:
         retry_config: HTTP retry configuration for API calls
+        model: Model to use instead of the configured backend
         
     Returns:
         LlmAgent configured for violation analysis
     """
     return LlmAgent(
         name="violation_analyzer",
-        model=Gemini(model="gemini-2.0-flash-lite", retry_options=retry_config),
+        model=model or create_model("violation_analyzer", retry_config),
         description="Analyzes violations, assigns severity scores, and provides remediation guidance",
         instruction="""
         You are a compliance violation analyst. Your task is to:
@@ -55,14 +63,15 @@ def create_violation_analyzer_agent(retry_config: types.HttpRetryOptions):
         - Minor documentation issues
         - Style/formatting violations
         
-        For each violation provide:
-        - Severity score with justification
-        - Detailed explanation of risk
-        - Step-by-step remediation plan
-        - Estimated fix time
-        - Priority ranking
+        Return a JSON object for the violation with:
+        - severity: Severity score (CRITICAL, HIGH, MEDIUM or LOW)
+        - justification: Why this severity applies
+        - risk: Detailed explanation of risk
+        - remediation: Step-by-step remediation plan
+        - effort: Estimated fix time (e.g., "2 hours", "3 days")
         
         Be precise and actionable in your recommendations.
         """,
+        output_schema=ViolationAnalysis,
         tools=[]
     )
\ No newline at end of file
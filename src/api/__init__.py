@@ -0,0 +1,13 @@
+"""
+HTTP service mode: queued compliance checks with progress streaming.
+"""
+
+from .app import create_app
+from .queue import CheckJob, CheckQueue, QueueFullError
+
+__all__ = [
+    "create_app",
+    "CheckJob",
+    "CheckQueue",
+    "QueueFullError",
+]
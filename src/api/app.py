@@ -0,0 +1,115 @@
+"""Async HTTP service that queues compliance checks and streams their progress."""
+
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+from src.pipeline.service import ComplianceService
+from src.utils.metrics import get_metrics
+from .queue import CheckQueue, QueueFullError
+
+
+class CheckRequest(BaseModel):
+    """Body of POST /checks."""
+
+    policy_text: str
+    document_text: str
+    mode: str = "pipeline"
+    threshold: str = "CRITICAL"
+
+
+def create_app(
+    service_factory: Callable[[], ComplianceService],
+    workers: int = 4,
+    max_queued: int = 32
+) -> FastAPI:
+    """
+    Create the HTTP app around a CheckQueue.
+
+    The service is built by service_factory at startup, on the server's event
+    loop, and closed at shutdown. Endpoints:
+
+    - POST /checks: queue a check; 202 with the job, or 429 with Retry-After
+      when max_queued checks are already waiting
+    - GET /checks/{id}: job status, with the results once completed
+    - GET /checks/{id}/events: server-sent events, one per pipeline stage,
+      until the check completes or fails
+    - GET /health: queue depth and counters
+    - GET /metrics: per-agent and per-stage metrics as Prometheus text
+
+    Args:
+        service_factory: Builds the ComplianceService, e.g. create_compliance_service
+        workers: Checks run concurrently
+        max_queued: Checks allowed to wait for a worker
+
+    Returns:
+        FastAPI application, e.g. for uvicorn.run
+    """
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        service = service_factory()
+        app.state.queue = CheckQueue(service, workers=workers, max_queued=max_queued)
+        app.state.queue.start()
+        try:
+            yield
+        finally:
+            await app.state.queue.stop()
+            await service.aclose()
+
+    app = FastAPI(title="Compliance Copilot", lifespan=lifespan)
+
+    def job_or_404(job_id: str):
+        job = app.state.queue.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown check '{job_id}'")
+        return job
+
+    @app.post("/checks", status_code=202)
+    async def submit_check(request: CheckRequest) -> Dict[str, Any]:
+        try:
+            job = app.state.queue.submit(
+                request.policy_text, request.document_text, request.mode, request.threshold
+            )
+        except QueueFullError as e:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": str(e)},
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return job.summary()
+
+    @app.get("/checks/{job_id}")
+    async def get_check(job_id: str) -> Dict[str, Any]:
+        return job_or_404(job_id).summary()
+
+    @app.get("/checks/{job_id}/events")
+    async def stream_check_events(job_id: str) -> StreamingResponse:
+        job = job_or_404(job_id)
+
+        async def events() -> AsyncIterator[str]:
+            async for event in job.follow():
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        queue = app.state.queue
+        return {
+            "workers": queue.workers,
+            "queued": queue.queued,
+            "max_queued": queue.max_queued,
+            **queue.stats,
+        }
+
+    @app.get("/metrics")
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(get_metrics().to_prometheus())
+
+    return app
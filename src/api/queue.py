@@ -0,0 +1,229 @@
+"""Bounded queue of compliance checks served by a fixed number of workers."""
+
+import asyncio
+import math
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from src.pipeline.compliance_pipeline import SEVERITY_LEVELS, progress_listener
+from src.pipeline.service import SERVICE_MODES, ComplianceService
+
+
+class QueueFullError(Exception):
+    """Raised when a check is submitted while the queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Check queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class CheckJob:
+    """One submitted check, its progress events and its result."""
+
+    def __init__(self, policy_text: str, document_text: str, mode: str, threshold: str = "CRITICAL"):
+        self.id = uuid.uuid4().hex
+        self.policy_text = policy_text
+        self.document_text = document_text
+        self.mode = mode
+        self.threshold = threshold
+        self.status = "queued"
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self._updated = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def emit(self, event: str, **details: Any) -> None:
+        """Record a progress event and wake everyone following the job."""
+        self.events.append({"event": event, "job": self.id, "time": time.time(), **details})
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    async def follow(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every event of the job, past and future, until it finishes."""
+        seen = 0
+        while True:
+            while seen < len(self.events):
+                seen += 1
+                yield self.events[seen - 1]
+            if self.finished:
+                return
+            await self._updated.wait()
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-serializable status of the job (with its result once completed)."""
+        summary = {
+            "id": self.id,
+            "mode": self.mode,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.result is not None:
+            summary["result"] = self.result
+        if self.error is not None:
+            summary["error"] = self.error
+        return summary
+
+
+class CheckQueue:
+    """
+    Runs submitted checks on a ComplianceService with bounded concurrency.
+
+    At most `workers` checks run at once and at most `max_queued` wait.
+    Beyond that, submit raises QueueFullError with a Retry-After estimate
+    based on the recent check duration, so callers back off instead of
+    piling up work the service cannot absorb. Finished jobs are kept, up to
+    `max_finished`, so their status and events can still be read.
+    """
+
+    def __init__(
+        self,
+        service: ComplianceService,
+        workers: int = 4,
+        max_queued: int = 32,
+        max_finished: int = 1000
+    ):
+        """
+        Args:
+            service: Service the checks run on
+            workers: Checks run concurrently
+            max_queued: Checks allowed to wait for a worker
+            max_finished: Finished jobs kept for status queries
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_queued < 1:
+            raise ValueError("max_queued must be at least 1")
+
+        self.service = service
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.jobs: "OrderedDict[str, CheckJob]" = OrderedDict()
+        self.stats = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "running": 0}
+        # Mean check duration, smoothed; seeds the Retry-After estimate
+        self.mean_seconds = 10.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued checks are dropped."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def retry_after(self) -> int:
+        """Seconds until a worker is likely to finish a check and free a queue slot."""
+        return max(1, math.ceil(self.mean_seconds / self.workers))
+
+    def submit(
+        self,
+        policy_text: str,
+        document_text: str,
+        mode: str = "pipeline",
+        threshold: str = "CRITICAL"
+    ) -> CheckJob:
+        """
+        Queue one check.
+
+        Args:
+            policy_text: Policy document text
+            document_text: Document to check
+            mode: One of SERVICE_MODES
+            threshold: Lowest severity that fails the check in gate mode
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If the mode or threshold is unknown
+            QueueFullError: If max_queued checks are already waiting
+        """
+        if mode not in SERVICE_MODES:
+            raise ValueError(f"mode must be one of {SERVICE_MODES}")
+        if threshold not in SEVERITY_LEVELS:
+            raise ValueError(f"threshold must be one of {SEVERITY_LEVELS}")
+        if self._queue is None:
+            raise RuntimeError("CheckQueue.start() has not been called")
+
+        if self._queue.full():
+            self.stats["rejected"] += 1
+            raise QueueFullError(self.retry_after())
+
+        job = CheckJob(policy_text, document_text, mode, threshold)
+        self._queue.put_nowait(job)
+        self.jobs[job.id] = job
+        self.stats["submitted"] += 1
+        job.emit("queued", position=self.queued)
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[CheckJob]:
+        """Return a job by id, or None if unknown or evicted."""
+        return self.jobs.get(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self.stats["running"] += 1
+            job.status = "running"
+            job.started_at = time.time()
+            job.emit("started")
+            # Stage events of this check only, since each worker runs one check at a time
+            progress_listener.set(
+                lambda event, job=job: job.emit(event.event, **event.model_dump(exclude={"event"}))
+            )
+            try:
+                job.result = await self.service.check(
+                    job.policy_text, job.document_text, mode=job.mode, threshold=job.threshold
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.error = str(e)
+            finally:
+                self.stats["running"] -= 1
+                self._queue.task_done()
+
+            job.finished_at = time.time()
+            self.mean_seconds = 0.8 * self.mean_seconds + 0.2 * (job.finished_at - job.started_at)
+            # Status and final event change together, so followers always see the final event
+            if job.error is None:
+                job.status = "completed"
+                self.stats["completed"] += 1
+                if job.mode == "gate":
+                    job.emit("completed", status=job.result["status"], evidence=job.result["evidence"])
+                else:
+                    job.emit("completed", total_violations=job.result["total_violations"],
+                             severity_counts=job.result["severity_counts"])
+            else:
+                job.status = "failed"
+                self.stats["failed"] += 1
+                job.emit("failed", error=job.error)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs beyond max_finished."""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
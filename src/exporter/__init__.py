@@ -1,9 +1,14 @@
 # Enables module import
 from .exporter import export_all, export_to_json, export_to_csv, export_to_html
+from .report import build_report
+from .streaming import document_label, iter_violation_records, iter_batch_records, stream_to_jsonl, stream_to_csv
 
-try:
-    from .pdf_generator import export_to_pdf
-except ImportError:
-    # reportlab not installed, PDF export will fail gracefully
-    def export_to_pdf(*args, **kwargs):
-        raise ImportError("reportlab is required for PDF export. Install with: pip install reportlab")
\ No newline at end of file
+
+def export_to_pdf(*args, **kwargs):
+    # reportlab is imported on first use, so other exports start without it
+    try:
+        from .pdf_generator import export_to_pdf as _export_to_pdf
+    except ImportError:
+        # reportlab not installed, PDF export will fail gracefully
+        raise ImportError("reportlab is required for PDF export. Install with: pip install reportlab")
+    return _export_to_pdf(*args, **kwargs)
\ No newline at end of file
@@ -1,69 +1,121 @@
-import json, csv
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from .html_template import HTML_TEMPLATE
-from .pdf_generator import export_to_pdf
+from .html_template import HTML_FOOTER, HTML_HEADER, PAGE_LINK, VIOLATION_HTML
+from .report import build_report
+from .streaming import REPORT_CSV_FIELDS, iter_violation_records, stream_to_csv
+
+FORMATS = ["json", "csv", "html", "pdf"]
 
 def export_to_json(results, output_path):
+    write_json(build_report(results), output_path)
+
+def export_to_csv(results, output_path):
+    write_csv(build_report(results), output_path)
+
+def export_to_html(results, output_path, page_size=None):
+    return write_html(build_report(results), output_path, page_size)
+
+def write_json(report, output_path):
     with open(output_path, "w") as f:
-        json.dump(results, f, indent=2)
+        json.dump(report["results"], f, indent=2)
     print(f"💾 JSON saved → {output_path}")
 
-def export_to_csv(results, output_path):
-    with open(output_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["ID","Severity","Description","Policy Reference","Remediation"])
-        vid = 1
-        for severity, violations in results.get("violations", {}).items():
-            for v in violations:
-                writer.writerow([
-                    f"V{vid:03d}",
-                    severity,
-                    v.get("description", ""),
-                    v.get("policy_ref", ""),
-                    v.get("remediation", "")
-                ])
-                vid += 1
+def write_csv(report, output_path):
+    # The report layout predates the streaming records: same columns, same numbering
+    records = iter_violation_records(report["results"], severity_order=False)
+    stream_to_csv(records, output_path, fields=REPORT_CSV_FIELDS)
     print(f"📄 CSV saved → {output_path}")
 
-def export_to_html(results, output_path):
-    violations_html = ""
-    for severity, violations in results.get("violations", {}).items():
-        for v in violations:
-            violations_html += f"""
-<div class="violation {severity.lower()}">
-<span class="severity-badge {severity.lower()}">{severity}</span>
-<h3>{v.get('description', 'Violation')}</h3>
-<p><b>Policy Reference:</b> {v.get('policy_ref', 'N/A')}</p>
-<p><b>Remediation:</b> {v.get('remediation', 'N/A')}</p>
-</div>
-"""
-    html = HTML_TEMPLATE.format(
-        timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        total_violations=results.get("total_violations", 0),
-        critical_count=results["severity_counts"].get("CRITICAL", 0),
-        high_count=results["severity_counts"].get("HIGH", 0),
-        medium_count=results["severity_counts"].get("MEDIUM", 0),
-        low_count=results["severity_counts"].get("LOW", 0),
-        violations_html=violations_html,
-    )
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
-    print(f"🌐 HTML saved → {output_path}")
-
-def export_all(results, base_name, output_dir, fmt="all"):
+def write_html(report, output_path, page_size=None):
+    """
+    Write the HTML report, split into pages of page_size violations if given.
+
+    Violations are rendered one at a time straight to the file. The first
+    page is output_path; later pages are "<stem>_page<n>.html" next to it.
+
+    Returns:
+        List of written page paths
+    """
+    output_path = Path(output_path)
+    records = report["records"]
+    page_size = page_size or max(len(records), 1)
+    page_count = max(-(-len(records) // page_size), 1)
+    pages = [output_path] + [output_path.with_name(f"{output_path.stem}_page{n}{output_path.suffix}")
+                             for n in range(2, page_count + 1)]
+
+    counts = report["severity_counts"]
+    for index, page_path in enumerate(pages):
+        page_nav = _page_nav(pages, index) if page_count > 1 else ""
+        with open(page_path, "w", encoding="utf-8") as f:
+            f.write(HTML_HEADER.render(
+                page_title=f" (page {index + 1} of {page_count})" if page_count > 1 else "",
+                timestamp=report["timestamp"],
+                total_violations=report["total_violations"],
+                critical_count=counts.get("CRITICAL", 0),
+                high_count=counts.get("HIGH", 0),
+                medium_count=counts.get("MEDIUM", 0),
+                low_count=counts.get("LOW", 0),
+                page_nav=page_nav,
+            ))
+            for record in records[index * page_size:(index + 1) * page_size]:
+                f.write(VIOLATION_HTML.render(
+                    severity_class=record["severity"].lower(),
+                    severity=record["severity"],
+                    description=record["description"] or "Violation",
+                    policy_ref=record["policy_ref"] or "N/A",
+                    remediation=record["remediation"] or "N/A",
+                ))
+            f.write(HTML_FOOTER.render(page_nav=page_nav))
+    print(f"🌐 HTML saved → {output_path}" + (f" ({page_count} pages)" if page_count > 1 else ""))
+    return pages
+
+def _page_nav(pages, current):
+    links = [f"<b>{n}</b>" if n == current + 1 else PAGE_LINK.render(href=path.name, label=n)
+             for n, path in enumerate(pages, start=1)]
+    return '<nav class="pages">Page ' + " ".join(links) + "</nav>"
+
+WRITERS = {"json": write_json, "csv": write_csv, "html": write_html}
+
+def export_all(results, base_name, output_dir, fmt="all", html_page_size=None, pdf_volume_size=None):
+    """
+    Export results to one or all formats concurrently.
+
+    The results are normalized once with build_report. JSON, CSV and HTML
+    are written on threads while the PDF, which is CPU-bound in ReportLab,
+    renders in a separate process, so the export takes about as long as its
+    slowest format. html_page_size splits the HTML report into pages and
+    pdf_volume_size splits the PDF into volumes.
+
+    Returns:
+        Dictionary of format -> output path
+    """
     output_dir = Path(output_dir)
-    output_dir.mkdir(exist_ok=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
 
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    json_path = output_dir / f"{base_name}_{ts}.json"
-    csv_path = output_dir / f"{base_name}_{ts}.csv"
-    html_path = output_dir / f"{base_name}_{ts}.html"
-    pdf_path = output_dir / f"{base_name}_{ts}.pdf"
+    paths = {name: output_dir / f"{base_name}_{ts}.{name}"
+             for name in FORMATS if fmt in (name, "all")}
 
-    if fmt in ["json", "all"]: export_to_json(results, json_path)
-    if fmt in ["csv", "all"]: export_to_csv(results, csv_path)
-    if fmt in ["html", "all"]: export_to_html(results, html_path)
-    if fmt in ["pdf", "all"]: export_to_pdf(results, pdf_path)
+    report = build_report(results)
+    writers = dict(WRITERS, html=partial(write_html, page_size=html_page_size))
+    pdf_pool = ProcessPoolExecutor(max_workers=1) if "pdf" in paths else None
+    try:
+        futures = []
+        if pdf_pool:
+            # Imported here so JSON/CSV/HTML exports never load reportlab
+            from .pdf_generator import render_pdf
+            futures.append(pdf_pool.submit(render_pdf, report, str(paths["pdf"]), pdf_volume_size))
+        with ThreadPoolExecutor(max_workers=len(WRITERS)) as pool:
+            futures += [pool.submit(writers[name], report, path)
+                        for name, path in paths.items() if name in writers]
+            for future in futures:
+                future.result()
+    finally:
+        if pdf_pool:
+            pdf_pool.shutdown()
 
     print("\n✔ Export completed!")
+    return paths
@@ -1,11 +1,39 @@
-HTML_TEMPLATE = """
+from html import escape
+from string import Formatter
+
+
+class HtmlTemplate:
+    """
+    A str.format-style template that is parsed once and escapes every value.
+
+    Fields listed in ``raw`` are inserted as is; use them only for markup the
+    exporter builds itself, never for agent text.
+    """
+
+    def __init__(self, template, raw=()):
+        self._parts = [(literal, field) for literal, field, _, _ in Formatter().parse(template)]
+        self._raw = frozenset(raw)
+
+    def render(self, **values):
+        out = []
+        for literal, field in self._parts:
+            out.append(literal)
+            if field is not None:
+                value = str(values[field])
+                out.append(value if field in self._raw else escape(value))
+        return "".join(out)
+
+
+HTML_HEADER = HtmlTemplate("""
 <!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
-<title>Compliance Report</title>
+<title>Compliance Report{page_title}</title>
 <style>
 /* (truncated for readability — this contains your same CSS) */
+/* Skip layout of off-screen violations so long pages stay responsive */
+.violation {{ content-visibility: auto; contain-intrinsic-size: auto 160px; }}
 </style>
 </head>
 <body>
@@ -20,8 +48,23 @@ HTML_TEMPLATE = """
         <div class="summary-card"><h3>Medium</h3><div class="value">{medium_count}</div></div>
         <div class="summary-card"><h3>Low</h3><div class="value">{low_count}</div></div>
     </div>
+    {page_nav}
     <h2>Violations</h2>
-    {violations_html}
+""", raw={"page_nav"})
+
+VIOLATION_HTML = HtmlTemplate("""
+<div class="violation {severity_class}">
+<span class="severity-badge {severity_class}">{severity}</span>
+<h3>{description}</h3>
+<p><b>Policy Reference:</b> {policy_ref}</p>
+<p><b>Remediation:</b> {remediation}</p>
+</div>
+""")
+
+PAGE_LINK = HtmlTemplate('<a href="{href}">{label}</a>')
+
+HTML_FOOTER = HtmlTemplate("""
+    {page_nav}
 </body>
 </html>
-"""
\ No newline at end of file
+""", raw={"page_nav"})
@@ -1,32 +1,101 @@
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, LongTable, Table, TableStyle
+
+from .report import build_report, records_by_severity
+
+# Rows per violation table; ReportLab re-splits a table at every page break,
+# so short tables lay out faster than one long one
+TABLE_CHUNK_ROWS = 25
+
+TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+])
 
-def export_to_pdf(results, output_path):
+def export_to_pdf(results, output_path, volume_size=None):
     """
     Generates a compliance report PDF from the given results.
 
     Args:
         results (dict): Dictionary containing 'total_violations' (int) and 'violations' (dict of lists).
         output_path (str): Path to save the generated PDF file.
+        volume_size (int, optional): Maximum violations per PDF; larger reports are split into volumes.
+
+    Returns:
+        list: Paths of the generated PDF files.
+    """
+    return render_pdf(build_report(results), output_path, volume_size)
+
+def render_pdf(report, output_path, volume_size=None):
+    """
+    Generates a compliance report PDF from a normalized report.
+
+    Each volume is built on its own, so memory is bounded by volume_size
+    rather than by the whole report. Volume 1 is written to output_path,
+    later volumes to "<stem>_vol<n>.pdf" next to it. Module-level so that
+    it can run in a worker process.
+
+    Args:
+        report (dict): Report dictionary from build_report.
+        output_path (str): Path to save the generated PDF file.
+        volume_size (int, optional): Maximum violations per PDF.
 
     Returns:
-        None
+        list: Paths of the generated PDF files.
     """
+    output_path = str(output_path)
+    records = report["records"]
+    volume_size = volume_size or max(len(records), 1)
+    volume_count = max(-(-len(records) // volume_size), 1)
+    stem = output_path[:-4] if output_path.lower().endswith(".pdf") else output_path
+
+    paths = []
+    for index in range(volume_count):
+        path = output_path if index == 0 else f"{stem}_vol{index + 1}.pdf"
+        volume = records[index * volume_size:(index + 1) * volume_size]
+        title = f"Volume {index + 1} of {volume_count}" if volume_count > 1 else None
+        _build_volume(report, volume, path, title)
+        paths.append(path)
+
+    print(f"📄 PDF generated: {output_path}" + (f" ({volume_count} volumes)" if volume_count > 1 else ""))
+    return paths
+
+def _build_volume(report, records, output_path, title=None):
     doc = SimpleDocTemplate(output_path, pagesize=A4)
     styles = getSampleStyleSheet()
+    cell = styles["BodyText"]
     elements = []
 
     elements.append(Paragraph("<b>Compliance Report</b>", styles["Heading1"]))
+    if title:
+        elements.append(Paragraph(title, styles["Heading2"]))
     elements.append(Spacer(1, 12))
 
-    elements.append(Paragraph(f"Total Violations: {results.get('total_violations', 0)}", styles["Normal"]))
+    elements.append(Paragraph(f"Total Violations: {report['total_violations']}", styles["Normal"]))
+    elements.append(Spacer(1, 6))
+    summary = [["Severity", "Violations"]] + [[s, str(c)] for s, c in report["severity_counts"].items()]
+    elements.append(Table(summary, colWidths=[120, 80], style=TABLE_STYLE, hAlign="LEFT"))
 
-    for severity, violations in results.get("violations", {}).items():
+    width = doc.width
+    col_widths = [0.12 * width, 0.48 * width, 0.2 * width, 0.2 * width]
+    for severity, severity_records in records_by_severity({"records": records}).items():
         elements.append(Spacer(1, 12))
-        elements.append(Paragraph(f"<b>{severity}</b>", styles["Heading3"]))
-        for v in violations:
-            elements.append(Paragraph(f"• {v.get('description', 'No description')}", styles["Normal"]))
+        elements.append(Paragraph(f"<b>{severity}</b> ({len(severity_records)} in this volume)"
+                                  if title else f"<b>{severity}</b>", styles["Heading3"]))
+        for start in range(0, len(severity_records), TABLE_CHUNK_ROWS):
+            rows = [["ID", "Description", "Policy Reference", "Effort"]]
+            for record in severity_records[start:start + TABLE_CHUNK_ROWS]:
+                rows.append([
+                    record["id"],
+                    Paragraph(escape(record["description"] or "No description"), cell),
+                    record["policy_ref"] or "N/A",
+                    record["effort"] or "-",
+                ])
+            elements.append(LongTable(rows, colWidths=col_widths, repeatRows=1, style=TABLE_STYLE))
 
     doc.build(elements)
-    print(f"📄 PDF generated: {output_path}")
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""Format-independent view of a results dictionary shared by every exporter."""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+from .streaming import SEVERITY_ORDER, iter_violation_records
+
+
+def build_report(results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize pipeline results once for all export formats.
+
+    The violations are flattened a single time into records; every writer
+    reads from the returned dictionary instead of walking
+    ``results["violations"]`` again. It holds only plain data, so it can be
+    sent to a worker process as is.
+
+    Args:
+        results: Results dictionary from the pipeline or parse_compliance_response
+
+    Returns:
+        Report dictionary with timestamp, total_violations, severity_counts,
+        records (flat violation records in severity order) and the original
+        results
+    """
+    records = list(iter_violation_records(results))
+    severity_counts = {severity: 0 for severity in SEVERITY_ORDER}
+    for record in records:
+        severity_counts[record["severity"]] = severity_counts.get(record["severity"], 0) + 1
+
+    return {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total_violations": results.get("total_violations", len(records)),
+        "severity_counts": severity_counts,
+        "records": records,
+        "results": results,
+    }
+
+
+def records_by_severity(report: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Group a report's records by severity, keeping severity order.
+
+    Args:
+        report: Report dictionary from build_report
+
+    Returns:
+        Dictionary of severity -> records, with empty severities omitted
+    """
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for record in report["records"]:
+        grouped.setdefault(record["severity"], []).append(record)
+    return grouped
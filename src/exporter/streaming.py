@@ -0,0 +1,174 @@
+"""Streaming JSON Lines / CSV export of violation records with bounded memory."""
+
+import csv
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SEVERITY_ORDER = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+
+# (record key, CSV header) for every exported column
+RECORD_FIELDS = [
+    ("id", "ID"),
+    ("document", "Document"),
+    ("severity", "Severity"),
+    ("description", "Description"),
+    ("policy_ref", "Policy Reference"),
+    ("quote", "Quote"),
+    ("remediation", "Remediation"),
+    ("effort", "Effort"),
+]
+
+# Columns of export_to_csv, kept in their original order for positional consumers
+REPORT_CSV_FIELDS = [
+    ("id", "ID"),
+    ("severity", "Severity"),
+    ("description", "Description"),
+    ("policy_ref", "Policy Reference"),
+    ("remediation", "Remediation"),
+]
+
+
+def document_label(document: str) -> str:
+    """
+    Build a file-name-safe label that is unique per document path.
+
+    Batches collect documents recursively, so a/README.txt and b/README.txt
+    share a stem; a short hash of the full path tells them apart.
+
+    Args:
+        document: Source document path
+
+    Returns:
+        "<stem>-<8 hex digits>"
+    """
+    digest = hashlib.sha256(str(document).encode("utf-8")).hexdigest()[:8]
+    return f"{Path(document).stem}-{digest}"
+
+
+def iter_violation_records(
+    results: Dict[str, Any],
+    document: Optional[str] = None,
+    severity_order: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    Flatten one results dictionary into violation records.
+
+    IDs are numbered per document ("<document_label>-V001"), so records from
+    different documents never collide and appending needs no global counter.
+
+    Args:
+        results: Results dictionary from the pipeline or parse_compliance_response
+        document: Source document path, if known
+        severity_order: Number the records from CRITICAL down; if False, in
+            the order of results["violations"], as export_to_csv always has
+
+    Yields:
+        One flat record per violation, with the keys in RECORD_FIELDS
+    """
+    prefix = f"{document_label(document)}-" if document else ""
+    number = 0
+    violations = results.get("violations", {})
+    if severity_order:
+        severities = SEVERITY_ORDER + [s for s in violations if s not in SEVERITY_ORDER]
+    else:
+        severities = list(violations)
+    for severity in severities:
+        for v in violations.get(severity, []):
+            number += 1
+            yield {
+                "id": f"{prefix}V{number:03d}",
+                "document": document or "",
+                "severity": severity,
+                "description": v.get("description", ""),
+                "policy_ref": v.get("policy_ref", ""),
+                "quote": v.get("quote", ""),
+                "remediation": v.get("remediation", ""),
+                "effort": v.get("effort", ""),
+            }
+
+
+def iter_batch_records(batch_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read violation records from a run_batch JSON Lines file one line at a time.
+
+    Documents that failed to scan are skipped. The file may still be growing;
+    only complete lines are read.
+
+    Args:
+        batch_path: JSON Lines file written by run_batch
+
+    Yields:
+        Violation records as produced by iter_violation_records
+    """
+    with open(batch_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                # A writer is mid-line; the record will be complete next time
+                break
+            record = json.loads(line)
+            if record.get("status") != "success":
+                continue
+            yield from iter_violation_records(record, record.get("document"))
+
+
+def stream_to_jsonl(
+    records: Iterable[Dict[str, Any]],
+    output_path: str,
+    append: bool = False
+) -> int:
+    """
+    Write records as JSON Lines without holding them in memory.
+
+    Args:
+        records: Iterable of violation records
+        output_path: Destination file
+        append: Add to an existing export instead of replacing it
+
+    Returns:
+        Number of records written
+    """
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(output_path, "a" if append else "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+            count += 1
+    return count
+
+
+def stream_to_csv(
+    records: Iterable[Dict[str, Any]],
+    output_path: str,
+    append: bool = False,
+    fields: List[Tuple[str, str]] = RECORD_FIELDS
+) -> int:
+    """
+    Write records as CSV without holding them in memory.
+
+    The header row is written only when the file is new or empty, so repeated
+    appends produce one well-formed CSV.
+
+    Args:
+        records: Iterable of violation records
+        output_path: Destination file
+        append: Add to an existing export instead of replacing it
+        fields: (record key, CSV header) of each column, in order
+
+    Returns:
+        Number of records written
+    """
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not append or not path.exists() or path.stat().st_size == 0
+
+    count = 0
+    with open(path, "a" if append else "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow([header for _, header in fields])
+        for record in records:
+            writer.writerow([record.get(key, "") for key, _ in fields])
+            count += 1
+    return count
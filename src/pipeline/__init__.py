@@ -0,0 +1,36 @@
+"""
+Code-driven compliance pipeline that runs the specialist agents directly.
+"""
+
+from .agent_runner import run_agent
+from .compliance_pipeline import CompliancePipeline, create_compliance_pipeline, format_report
+from .batch import collect_documents, run_batch
+from .events import (
+    PipelineCompleted,
+    PipelineEvent,
+    RewriteGenerated,
+    RulesExtracted,
+    ScanCompleted,
+    ViolationAnalyzed,
+    ViolationFound,
+)
+from .service import SERVICE_MODES, ComplianceService, create_compliance_service
+
+__all__ = [
+    "run_agent",
+    "CompliancePipeline",
+    "create_compliance_pipeline",
+    "format_report",
+    "collect_documents",
+    "run_batch",
+    "PipelineEvent",
+    "RulesExtracted",
+    "ScanCompleted",
+    "ViolationFound",
+    "ViolationAnalyzed",
+    "RewriteGenerated",
+    "PipelineCompleted",
+    "SERVICE_MODES",
+    "ComplianceService",
+    "create_compliance_service",
+]
@@ -0,0 +1,55 @@
+"""Helper for running a single specialist agent turn outside the orchestrator."""
+
+import uuid
+
+from google.adk.runners import Runner
+from google.genai import types
+
+
+async def run_agent(runner: Runner, prompt: str, user_id: str = "pipeline") -> str:
+    """
+    Send one prompt to an agent in a fresh session and collect its final answer.
+
+    Every call gets its own session so that no stage sees the conversation
+    history of another stage - each prompt carries exactly the context it needs.
+    The session is deleted afterwards, so a long-lived runner does not keep
+    every past conversation in memory.
+
+    Args:
+        runner: Runner wrapping the agent to call
+        prompt: Full prompt text for this turn
+        user_id: User ID to record the session under
+
+    Returns:
+        Concatenated text of the agent's final response
+    """
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name,
+        user_id=user_id,
+        session_id=uuid.uuid4().hex
+    )
+
+    query_content = types.Content(
+        role="user",
+        parts=[types.Part(text=prompt)]
+    )
+
+    response_text = ""
+    try:
+        async for event in runner.run_async(
+            user_id=user_id,
+            session_id=session.id,
+            new_message=query_content
+        ):
+            if event.is_final_response() and event.content:
+                for part in event.content.parts:
+                    if getattr(part, "text", None):
+                        response_text += part.text
+    finally:
+        await runner.session_service.delete_session(
+            app_name=runner.app_name,
+            user_id=user_id,
+            session_id=session.id
+        )
+
+    return response_text
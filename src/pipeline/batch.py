@@ -0,0 +1,213 @@
+"""Batch scanning of many documents against one policy with a worker pool."""
+
+import asyncio
+import glob
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from src.exporter.report import build_report
+from src.exporter.streaming import document_label, iter_violation_records, stream_to_csv
+from .compliance_pipeline import CompliancePipeline
+
+DEFAULT_DOCUMENT_PATTERN = "*.txt"
+
+
+def collect_documents(source: str, pattern: str = DEFAULT_DOCUMENT_PATTERN) -> List[Path]:
+    """
+    Resolve a directory or glob expression to a sorted list of document files.
+
+    Args:
+        source: Directory (searched recursively with pattern) or glob expression
+        pattern: File name pattern used when source is a directory
+
+    Returns:
+        Sorted list of document paths
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        paths = source_path.rglob(pattern)
+    else:
+        paths = (Path(p) for p in glob.glob(source, recursive=True))
+
+    return sorted(p for p in paths if p.is_file())
+
+
+async def run_batch(
+    pipeline: CompliancePipeline,
+    policy_text: str,
+    document_paths: Iterable[Path],
+    output_path: str,
+    max_in_flight: int = 8,
+    csv_path: Optional[str] = None,
+    pdf_dir: Optional[str] = None,
+    pdf_workers: Optional[int] = None,
+    resume: bool = False
+) -> Dict[str, Any]:
+    """
+    Scan many documents concurrently and stream one JSON line per document.
+
+    The policy is extracted once up front and shared by every document.
+    Results are appended to output_path as each document finishes, so a long
+    run can be monitored (or salvaged) while it is still going.
+
+    Args:
+        pipeline: Pipeline built once and reused for every document
+        policy_text: Policy document text
+        document_paths: Documents to scan
+        output_path: JSON Lines file to append results to
+        max_in_flight: Maximum number of documents processed at once
+        csv_path: Optional CSV file each document's violations are appended to
+            as it finishes
+        pdf_dir: Optional directory for one PDF report per document, named
+            by document_label and rendered in a process pool while the batch
+            keeps scanning
+        pdf_workers: PDF rendering processes (default: one per CPU)
+        resume: Skip documents that already have a success record in
+            output_path, e.g. after an interrupted run. Combined with a
+            pipeline checkpoint_store, unfinished documents also restart from
+            their last completed stage; without resume, checkpoints are only
+            written, never read.
+
+    Returns:
+        Summary dictionary with document, error and violation totals, the
+        number of documents skipped as already done and, with pdf_dir, the
+        PDF reports written and those that failed to render (pdf_errors,
+        with one message per document in pdf_error_messages)
+    """
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1")
+
+    start_time = time.time()
+    rules, _ = await pipeline.extract_policy(policy_text)
+
+    done = _completed_documents(output_path) if resume else set()
+
+    summary = {
+        "documents": 0,
+        "errors": 0,
+        "skipped": 0,
+        "total_violations": 0,
+        "severity_counts": {},
+    }
+
+    loop = asyncio.get_running_loop()
+    pdf_pool = None
+    pdf_jobs = []
+    pdf_documents = []
+    if pdf_dir:
+        # Imported here so batches without PDF output do not need reportlab
+        from src.exporter.pdf_generator import render_pdf
+        Path(pdf_dir).mkdir(parents=True, exist_ok=True)
+        pdf_pool = ProcessPoolExecutor(max_workers=pdf_workers)
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "a", encoding="utf-8") as out:
+
+        async def worker(paths: Iterator[Path]):
+            # All workers share one iterator, so each path is taken exactly once
+            for path in paths:
+                record = await _scan_document(pipeline, policy_text, rules, path, resume)
+
+                summary["documents"] += 1
+                if record["status"] == "success":
+                    summary["total_violations"] += record["total_violations"]
+                    for severity, count in record["severity_counts"].items():
+                        summary["severity_counts"][severity] = (
+                            summary["severity_counts"].get(severity, 0) + count
+                        )
+                else:
+                    summary["errors"] += 1
+
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                if csv_path and record["status"] == "success":
+                    stream_to_csv(iter_violation_records(record, record["document"]), csv_path, append=True)
+                if pdf_pool and record["status"] == "success":
+                    pdf_path = Path(pdf_dir) / f"{document_label(record['document'])}.pdf"
+                    pdf_jobs.append(loop.run_in_executor(pdf_pool, render_pdf, build_report(record), str(pdf_path)))
+                    pdf_documents.append(record["document"])
+
+        def pending() -> Iterator[Path]:
+            for path in document_paths:
+                if str(path) in done:
+                    summary["skipped"] += 1
+                else:
+                    yield path
+
+        try:
+            paths = pending()
+            await asyncio.gather(*(worker(paths) for _ in range(max_in_flight)))
+            # Reports still rendering are awaited only once every document is scanned;
+            # one failed render must not lose the summary of the whole batch
+            rendered = await asyncio.gather(*pdf_jobs, return_exceptions=True)
+        finally:
+            if pdf_pool:
+                pdf_pool.shutdown()
+
+    pdf_errors = [f"{document}: {result}" for document, result in zip(pdf_documents, rendered)
+                  if isinstance(result, Exception)]
+    summary["pdf_reports"] = len(pdf_jobs) - len(pdf_errors)
+    summary["pdf_errors"] = len(pdf_errors)
+    summary["pdf_error_messages"] = pdf_errors
+    summary["elapsed"] = time.time() - start_time
+    return summary
+
+
+def _completed_documents(output_path: str) -> Set[str]:
+    """
+    Documents with a success record in an existing batch results file.
+
+    A half-written last line left by a killed run is truncated, so new
+    records start on a line of their own.
+    """
+    if not Path(output_path).exists():
+        return set()
+    done = set()
+    complete_bytes = 0
+    with open(output_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            complete_bytes += len(line)
+            record = json.loads(line)
+            if record.get("status") == "success":
+                done.add(record["document"])
+    with open(output_path, "r+b") as f:
+        f.truncate(complete_bytes)
+    return done
+
+
+async def _scan_document(
+    pipeline: CompliancePipeline,
+    policy_text: str,
+    rules: str,
+    path: Path,
+    resume: bool = False
+) -> Dict[str, Any]:
+    """Run the pipeline on one document file and build its result record."""
+    start_time = time.time()
+    try:
+        document_text = path.read_text(encoding="utf-8")
+        results = await pipeline.run(policy_text, document_text, rules=rules, resume=resume)
+    except Exception as e:
+        return {
+            "document": str(path),
+            "status": "error",
+            "error_message": f"Failed to scan document: {str(e)}",
+            "time": time.time() - start_time
+        }
+
+    return {
+        "document": str(path),
+        "status": "success",
+        "total_violations": results["total_violations"],
+        "severity_counts": results["severity_counts"],
+        "rewrites_generated": results["rewrites_generated"],
+        "model_calls": results["model_calls"],
+        "resumed_stages": results.get("resumed_stages", 0),
+        "violations": results["violations"],
+        "time": time.time() - start_time
+    }
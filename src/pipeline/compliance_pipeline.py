@@ -0,0 +1,845 @@
+"""Deterministic compliance pipeline that replaces the LLM-driven orchestrator loop."""
+
+import asyncio
+import contextvars
+import re
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from src.agents.document_scanner import create_document_scanner_agent
+from src.agents.policy_extractor import create_policy_extractor_agent
+from src.agents.rewrite_agent import create_rewrite_agent
+from src.agents.violation_analyzer import create_violation_analyzer_agent
+from src.tools.document_sections import chunk_document, section_fingerprint, split_sections
+from src.tools.prescan import prescan_document, prescan_finding
+from src.tools.response_parser import (
+    deduplicate_findings,
+    finding_quote,
+    finding_summary,
+    parse_analysis_response,
+    parse_policy_rules,
+    parse_rewrite_response,
+    parse_scan_response,
+)
+from src.utils.checkpoint_store import CheckpointStore, document_key
+from src.utils.config import get_retry_config
+from src.utils.metrics import get_metrics
+from src.utils.models import create_model
+from src.utils.policy_cache import PolicyRuleCache, policy_cache_key
+from src.utils.rate_limiter import rate_limit_key
+from src.utils.section_store import SectionFindingsStore
+from .agent_runner import run_agent
+from .events import (
+    PipelineCompleted,
+    PipelineEvent,
+    RewriteGenerated,
+    RulesExtracted,
+    ScanCompleted,
+    ViolationAnalyzed,
+    ViolationFound,
+)
+
+SEVERITY_LEVELS = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+
+# Only these severities get a compliant rewrite (orchestrator STEP 4)
+REWRITE_SEVERITIES = {"CRITICAL", "HIGH"}
+# off: model scan only; merge: local hits plus a model scan for everything else;
+# local: local hits only, no scanner call
+PRESCAN_MODES = ["off", "merge", "local"]
+
+# Called with a PipelineEvent as each stage of CompliancePipeline.run completes;
+# set it in the task that awaits run to follow that document's progress
+progress_listener: contextvars.ContextVar[Optional[Callable[[PipelineEvent], None]]] = (
+    contextvars.ContextVar("progress_listener", default=None)
+)
+
+
+class CompliancePipeline:
+    """
+    Runs policy extraction, scanning, analysis and rewrites as fixed stages.
+
+    Unlike the orchestrator agent, no model decides which agent to call next:
+    each stage's output is passed straight into the prompt of the next stage,
+    so a document costs exactly 2 + violations + rewrites model calls (one
+    fewer when the extracted rules come from the policy cache).
+
+    Analysis and rewrite calls for different violations are independent, so
+    they fan out concurrently, at most max_concurrency model calls at a time.
+    With chunk_chars set, long documents are scanned as overlapping chunks
+    under the same limit, and duplicate boundary findings are dropped.
+
+    With a checkpoint_store, every completed stage output is persisted, so a
+    run interrupted midway resumes from the last completed stage of each
+    document instead of paying for its model calls again.
+
+    stream yields typed events as each stage of a run completes, so CRITICAL
+    findings are visible right after their analysis rather than after the
+    last rewrite; progress_listener receives the same events from run.
+
+    Each stage's wall time (model call plus response parsing) is recorded
+    in the get_metrics() recorder under "extract", "scan", "analysis",
+    "rewrite" and, for a whole run, "document".
+    """
+
+    def __init__(
+        self,
+        policy_extractor: LlmAgent,
+        document_scanner: LlmAgent,
+        violation_analyzer: LlmAgent,
+        rewrite_agent: LlmAgent,
+        app_name: str = "CompliancePipeline",
+        max_concurrency: int = 4,
+        policy_cache: Optional[PolicyRuleCache] = None,
+        chunk_chars: Optional[int] = None,
+        chunk_overlap: int = 500,
+        prescan: str = "off",
+        checkpoint_store: Optional[CheckpointStore] = None
+    ):
+        """
+        Args:
+            policy_extractor: Policy extraction agent
+            document_scanner: Document scanning agent
+            violation_analyzer: Violation analysis agent
+            rewrite_agent: Rewrite agent
+            app_name: ADK application name used for the pipeline's sessions
+            max_concurrency: Maximum in-flight analysis/rewrite calls per document
+            policy_cache: Optional persistent cache of extracted policy rules
+            chunk_chars: Scan documents longer than this as separate chunks
+                (None scans every document in one call)
+            chunk_overlap: Characters of context shared by consecutive chunks
+            prescan: Local pattern pre-scan mode, one of PRESCAN_MODES
+            checkpoint_store: Optional persistent store of stage outputs for
+                resuming interrupted runs
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if chunk_chars is not None and chunk_chars < 1:
+            raise ValueError("chunk_chars must be at least 1")
+        if prescan not in PRESCAN_MODES:
+            raise ValueError(f"prescan must be one of {PRESCAN_MODES}")
+
+        self.max_concurrency = max_concurrency
+        self.policy_cache = policy_cache
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = chunk_overlap
+        self.prescan = prescan
+        self.checkpoint_store = checkpoint_store
+        self._policy_extractor_agent = policy_extractor
+        self.agents = (policy_extractor, document_scanner, violation_analyzer, rewrite_agent)
+        self.session_service = InMemorySessionService()
+        self.runners = {
+            agent.name: Runner(agent=agent, app_name=app_name, session_service=self.session_service)
+            for agent in self.agents
+        }
+        self.policy_extractor = self.runners[policy_extractor.name]
+        self.document_scanner = self.runners[document_scanner.name]
+        self.violation_analyzer = self.runners[violation_analyzer.name]
+        self.rewrite_agent = self.runners[rewrite_agent.name]
+
+    async def extract_policy(self, policy_text: str) -> Tuple[str, bool]:
+        """
+        STEP 1: Extract structured compliance requirements from the policy.
+
+        Returns:
+            Tuple of (rules text, whether they were served from the policy
+            cache instead of a model call)
+        """
+        cache_key = None
+        if self.policy_cache is not None:
+            agent = self._policy_extractor_agent
+            model_name = getattr(agent.model, "model", agent.model)
+            cache_key = policy_cache_key(policy_text, str(agent.instruction), str(model_name))
+            rules = self.policy_cache.get(cache_key)
+            if rules is not None:
+                return rules, True
+
+        prompt = f"""
+Extract all compliance requirements from this policy:
+
+{policy_text}
+"""
+        with get_metrics().stage("extract"):
+            rules = parse_policy_rules(await run_agent(self.policy_extractor, prompt))
+
+        if cache_key is not None and rules.strip():
+            self.policy_cache.put(cache_key, rules)
+        return rules, False
+
+    async def scan_document(
+        self,
+        rules: str,
+        document_text: str,
+        candidates: Optional[List[Dict[str, str]]] = None
+    ) -> List[Dict[str, str]]:
+        """
+        STEP 2: Scan the document and return one finding dictionary per violation.
+
+        Candidates (local pre-scan hits) are listed for the scanner to confirm
+        or dismiss; only those it reports itself become findings.
+        """
+        candidate_list = ""
+        if candidates:
+            listed = "\n".join(f"- {f['explanation']}: \"{f['quote']}\"" for f in candidates)
+            candidate_list = f"""
+CANDIDATES (flagged by a local pattern scan and not yet confirmed; report each
+one that violates a requirement, with that requirement's rule ID, and ignore
+any that are compliant):
+{listed}
+"""
+        prompt = f"""
+COMPLIANCE REQUIREMENTS:
+{rules}
+{candidate_list}
+DOCUMENT:
+{document_text}
+
+Report every violation with the violated rule ID, an exact quote, where it
+was found and why it violates the rule. Report no violations if the document
+is compliant.
+"""
+        with get_metrics().stage("scan"):
+            scan_text = await run_agent(self.document_scanner, prompt)
+            return parse_scan_response(scan_text)
+
+    async def analyze_violation(self, rules: str, finding: Dict[str, str]) -> Dict[str, Any]:
+        """STEP 3: Score one finding and build its violation record."""
+        prompt = f"""
+POLICY REQUIREMENT:
+{_relevant_rules(rules, finding["rule_id"])}
+
+VIOLATION:
+{_finding_text(finding)}
+
+Assign a severity of CRITICAL, HIGH, MEDIUM or LOW.
+"""
+        with get_metrics().stage("analysis"):
+            analysis = parse_analysis_response(await run_agent(self.violation_analyzer, prompt))
+        return {
+            "description": finding_summary(finding),
+            "policy_ref": finding["rule_id"],
+            "quote": finding["quote"],
+            "location": finding["location"],
+            **analysis,
+        }
+
+    async def rewrite_violation(self, rules: str, violation: Dict[str, Any]) -> Dict[str, Any]:
+        """STEP 4: Generate a compliant rewrite for one analyzed violation."""
+        finding = {
+            "rule_id": violation["policy_ref"],
+            "quote": violation["quote"],
+            "location": violation["location"],
+            "explanation": violation["description"],
+        }
+        prompt = f"""
+POLICY REQUIREMENT:
+{_relevant_rules(rules, violation["policy_ref"])}
+
+VIOLATION:
+{_finding_text(finding)}
+
+SEVERITY ANALYSIS:
+Severity: {violation["severity"]}
+{violation["justification"]}
+Remediation: {violation["remediation"]}
+"""
+        with get_metrics().stage("rewrite"):
+            return parse_rewrite_response(await run_agent(self.rewrite_agent, prompt))
+
+    async def _scan(
+        self,
+        rules: str,
+        document_text: str,
+        semaphore: asyncio.Semaphore
+    ) -> Tuple[List[Dict[str, str]], int, int]:
+        """
+        STEP 2 with pre-scan and chunking.
+
+        Pattern-detectable violations are found locally first (prescan mode
+        "merge" or "local"). In "local" mode the hits are the findings. In
+        "merge" mode the model then scans the document, as concurrent chunks
+        if it is long, with the hits listed as candidates: it confirms them
+        against a policy rule or dismisses them, and finds anything else.
+
+        Returns:
+            Tuple of (de-duplicated findings in document order, scanner calls
+            made, local pre-scan hits)
+        """
+        hits = prescan_document(document_text) if self.prescan != "off" else []
+        local_findings = [prescan_finding(hit) for hit in hits]
+        if self.prescan == "local":
+            return local_findings, 0, len(hits)
+
+        if self.chunk_chars is None or len(document_text) <= self.chunk_chars:
+            chunks = [document_text]
+        else:
+            chunks = chunk_document(document_text, self.chunk_chars, self.chunk_overlap)
+
+        async def scan_chunk(chunk: str) -> List[Dict[str, str]]:
+            candidates = [f for f, hit in zip(local_findings, hits) if hit["quote"] in chunk]
+            async with semaphore:
+                return await self.scan_document(rules, chunk, candidates)
+
+        per_chunk = await asyncio.gather(*(scan_chunk(chunk) for chunk in chunks))
+        findings = [finding for chunk_findings in per_chunk for finding in chunk_findings]
+
+        # Overlapping chunks report boundary findings twice
+        if len(chunks) > 1:
+            findings = deduplicate_findings(findings)
+        return findings, len(chunks), len(hits)
+
+    async def _process_finding(
+        self,
+        rules: str,
+        finding: Dict[str, str],
+        semaphore: asyncio.Semaphore,
+        checkpoints: "_DocumentCheckpoints",
+        index: int
+    ) -> Dict[str, Any]:
+        """Run STEP 3 and, for CRITICAL/HIGH results, STEP 4 for one finding."""
+        async def analyze() -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_violation(rules, finding)
+
+        violation = await checkpoints.stage(f"analysis:{index}", analyze)
+        _emit(ViolationAnalyzed(index=index, violation=dict(violation)))
+
+        if violation["severity"] in REWRITE_SEVERITIES:
+            async def rewrite() -> Dict[str, Any]:
+                async with semaphore:
+                    return await self.rewrite_violation(rules, violation)
+
+            rewritten = await checkpoints.stage(f"rewrite:{index}", rewrite)
+            violation.update(rewritten)
+            _emit(RewriteGenerated(index=index, rewrite=rewritten))
+
+        return violation
+
+    async def run(
+        self,
+        policy_text: str,
+        document_text: str,
+        rules: Optional[str] = None,
+        resume: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run the full compliance workflow on one document.
+
+        With a checkpoint_store, every stage output is checkpointed while the
+        run is in progress and the document's checkpoints are deleted once it
+        completes. Only a resumed run reads them back; any other run starts
+        the document afresh.
+
+        Args:
+            policy_text: Policy document text
+            document_text: Document to check
+            rules: Rules already extracted from policy_text; skips STEP 1
+            resume: Restart from the checkpoints of an interrupted run
+
+        Returns:
+            Results dictionary in the same shape as parse_compliance_response,
+            plus the extracted rules, the final report, the model call count
+            and the number of stages restored from checkpoints
+        """
+        with get_metrics().stage("document"):
+            return await self._run(policy_text, document_text, rules, resume)
+
+    async def _run(
+        self,
+        policy_text: str,
+        document_text: str,
+        rules: Optional[str],
+        resume: bool = False
+    ) -> Dict[str, Any]:
+        # Rate-limited model calls are queued fairly per document
+        rate_limit_key.set(uuid.uuid4().hex)
+        rules, cached, model_calls = await self._resolve_rules(policy_text, rules)
+        _emit(RulesExtracted(rules=rules, model_calls=model_calls))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        checkpoints = _DocumentCheckpoints(
+            self.checkpoint_store,
+            self._findings_key(policy_text) if self.checkpoint_store is not None else "",
+            document_text,
+            resume
+        )
+        if not resume:
+            # A fresh run must not later resume from an older run's stage outputs
+            await checkpoints.discard()
+
+        async def scan() -> Dict[str, Any]:
+            findings, scan_calls, prescan_hits = await self._scan(rules, document_text, semaphore)
+            return {"findings": findings, "scan_calls": scan_calls, "prescan_hits": prescan_hits}
+
+        scan_output = await checkpoints.stage("findings", scan, calls=lambda output: output["scan_calls"])
+        findings = scan_output["findings"]
+        model_calls += scan_output["scan_calls"]
+        _emit(ScanCompleted(findings=len(findings), prescan_hits=scan_output["prescan_hits"]))
+        for index, finding in enumerate(findings):
+            _emit(ViolationFound(index=index, finding=finding))
+
+        processed = await asyncio.gather(*(
+            self._process_finding(rules, finding, semaphore, checkpoints, index)
+            for index, finding in enumerate(findings)
+        ))
+        model_calls += _downstream_calls(processed) - checkpoints.restored_calls
+
+        # gather() keeps input order, so violations stay in scanner order
+        results = _build_results(processed, rules, cached, model_calls)
+        results["prescan_hits"] = scan_output["prescan_hits"]
+        results["resumed_stages"] = checkpoints.restored_stages
+        await checkpoints.discard()
+        return results
+
+    async def stream(
+        self,
+        policy_text: str,
+        document_text: str,
+        rules: Optional[str] = None,
+        resume: bool = False
+    ) -> AsyncIterator[PipelineEvent]:
+        """
+        Run the workflow on one document, yielding events as stages complete.
+
+        Events arrive in completion order: RulesExtracted, ScanCompleted, one
+        ViolationFound per finding, then ViolationAnalyzed and
+        RewriteGenerated as each concurrent call finishes, and finally
+        PipelineCompleted with the results run would return. Closing the
+        iterator early cancels the run and waits for its calls to stop.
+
+        Args:
+            policy_text: Policy document text
+            document_text: Document to check
+            rules: Rules already extracted from policy_text; skips STEP 1
+            resume: Restart from the checkpoints of an interrupted run
+
+        Yields:
+            PipelineEvent instances
+        """
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def run_with_events() -> Dict[str, Any]:
+            progress_listener.set(events.put_nowait)
+            try:
+                return await self.run(policy_text, document_text, rules, resume)
+            finally:
+                events.put_nowait(None)
+
+        task = asyncio.create_task(run_with_events())
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            yield PipelineCompleted(results=await task)
+        finally:
+            task.cancel()
+            # Wait for the cancelled calls to unwind, so none is left running after aclose()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def gate(
+        self,
+        policy_text: str,
+        document_text: str,
+        threshold: str = "CRITICAL",
+        rules: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Pass or fail a document on its first violation at or above a severity.
+
+        For CI gating only the verdict matters, so no rewrites or report are
+        produced. Findings are analyzed as soon as their chunk is scanned,
+        and the first analysis at or above threshold cancels every remaining
+        scan and analysis call. Local pre-scan hits never fail the document
+        by themselves: in "merge" mode the scanner confirms or dismisses them,
+        and in "local" mode each hit is analyzed like a scanned finding.
+
+        Args:
+            policy_text: Policy document text
+            document_text: Document to check
+            threshold: Lowest severity that fails the gate, one of SEVERITY_LEVELS
+            rules: Rules already extracted from policy_text; skips STEP 1
+
+        Returns:
+            Dictionary with status ("PASS" or "FAIL"), passed, threshold,
+            evidence (the triggering violation, or None), findings and
+            violations_analyzed before the verdict, chunks_scanned,
+            chunks_total, prescan_hits and model_calls (calls sent,
+            including cancelled ones)
+
+        Raises:
+            ValueError: If threshold is not a severity level
+        """
+        if threshold not in SEVERITY_LEVELS:
+            raise ValueError(f"threshold must be one of {SEVERITY_LEVELS}")
+        failing = set(SEVERITY_LEVELS[:SEVERITY_LEVELS.index(threshold) + 1])
+
+        rate_limit_key.set(uuid.uuid4().hex)
+        model_calls = 0
+        hits = prescan_document(document_text) if self.prescan != "off" else []
+        local_findings = [prescan_finding(hit) for hit in hits]
+        if self.prescan == "local" or self.chunk_chars is None or len(document_text) <= self.chunk_chars:
+            chunks = [] if self.prescan == "local" else [document_text]
+        else:
+            chunks = chunk_document(document_text, self.chunk_chars, self.chunk_overlap)
+        verdict = {
+            "threshold": threshold,
+            "evidence": None,
+            "findings": len(local_findings) if self.prescan == "local" else 0,
+            "violations_analyzed": 0,
+            "chunks_scanned": 0,
+            "chunks_total": len(chunks),
+            "prescan_hits": len(hits),
+        }
+
+        def decide(evidence: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            verdict.update(
+                status="PASS" if evidence is None else "FAIL",
+                passed=evidence is None,
+                evidence=evidence,
+                model_calls=model_calls,
+            )
+            return verdict
+
+        rules, _, model_calls = await self._resolve_rules(policy_text, rules)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        seen_quotes = set()
+
+        async def call(coroutine_function, *args):
+            nonlocal model_calls
+            async with semaphore:
+                model_calls += 1
+                return await coroutine_function(*args)
+
+        async def scan_chunk(chunk: str) -> List[Dict[str, str]]:
+            candidates = [f for f, hit in zip(local_findings, hits) if hit["quote"] in chunk]
+            return await call(self.scan_document, rules, chunk, candidates)
+
+        scans = {asyncio.ensure_future(scan_chunk(chunk)) for chunk in chunks}
+        # In local mode the analyzer, not the pattern's own severity, decides each hit
+        analyses = {asyncio.ensure_future(call(self.analyze_violation, rules, finding))
+                    for finding in (local_findings if self.prescan == "local" else [])}
+        try:
+            while scans or analyses:
+                done, _ = await asyncio.wait(scans | analyses, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task in scans:
+                        scans.discard(task)
+                        verdict["chunks_scanned"] += 1
+                        for finding in task.result():
+                            # Overlapping chunks may report the same quote
+                            if finding_quote(finding) in seen_quotes:
+                                continue
+                            seen_quotes.add(finding_quote(finding))
+                            verdict["findings"] += 1
+                            analyses.add(asyncio.ensure_future(call(self.analyze_violation, rules, finding)))
+                    else:
+                        analyses.discard(task)
+                        violation = task.result()
+                        verdict["violations_analyzed"] += 1
+                        if violation["severity"] in failing:
+                            return decide(violation)
+        finally:
+            for task in scans | analyses:
+                task.cancel()
+            await asyncio.gather(*scans, *analyses, return_exceptions=True)
+
+        return decide(None)
+
+    async def run_incremental(
+        self,
+        policy_text: str,
+        document_text: str,
+        section_store: SectionFindingsStore,
+        rules: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-check only the sections of a document that changed since the last scan.
+
+        The document is split into heading-delimited sections. Sections whose
+        fingerprint already has stored findings for this policy reuse them;
+        only new or edited sections go through scanning, analysis and rewrites
+        (each section scanned separately, up to max_concurrency at a time).
+
+        Args:
+            policy_text: Policy document text
+            document_text: Document to check
+            section_store: Persistent per-section findings
+            rules: Rules already extracted from policy_text; skips STEP 1
+
+        Returns:
+            Same results dictionary as run, plus sections_total and
+            sections_rescanned
+        """
+        rules, cached, model_calls = await self._resolve_rules(policy_text, rules)
+        findings_key = self._findings_key(policy_text)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def process_section(section: str, fingerprint: str) -> Tuple[List[Dict[str, Any]], int]:
+            findings, scan_calls, _ = await self._scan(rules, section, semaphore)
+            # Sections are already persisted by the section store
+            checkpoints = _DocumentCheckpoints(None, "", section)
+            processed = list(await asyncio.gather(*(
+                self._process_finding(rules, finding, semaphore, checkpoints, index)
+                for index, finding in enumerate(findings)
+            )))
+            section_store.put(findings_key, fingerprint, processed)
+            return processed, scan_calls
+
+        sections = split_sections(document_text)
+        fingerprints = [section_fingerprint(section) for section in sections]
+
+        # Identical sections in one document are only scanned once
+        stored = {}
+        changed = {}
+        for section, fingerprint in zip(sections, fingerprints):
+            if fingerprint in stored or fingerprint in changed:
+                continue
+            violations = section_store.get(findings_key, fingerprint)
+            if violations is None:
+                changed[fingerprint] = section
+            else:
+                stored[fingerprint] = violations
+
+        rescanned = await asyncio.gather(
+            *(process_section(section, fingerprint) for fingerprint, section in changed.items())
+        )
+        for fingerprint, (violations, scan_calls) in zip(changed, rescanned):
+            stored[fingerprint] = violations
+            model_calls += scan_calls + _downstream_calls(violations)
+
+        processed = [v for fingerprint in fingerprints for v in stored[fingerprint]]
+        results = _build_results(processed, rules, cached, model_calls)
+        results["sections_total"] = len(sections)
+        results["sections_rescanned"] = len(changed)
+        return results
+
+    async def _resolve_rules(
+        self,
+        policy_text: str,
+        rules: Optional[str]
+    ) -> Tuple[str, bool, int]:
+        """Return (rules, served from policy cache, model calls spent on STEP 1)."""
+        if rules is not None:
+            return rules, False, 0
+        rules, cached = await self.extract_policy(policy_text)
+        return rules, cached, 0 if cached else 1
+
+    def _findings_key(self, policy_text: str) -> str:
+        """Key for everything section findings depend on besides the section itself."""
+        instructions = "\n".join(str(agent.instruction) for agent in self.agents)
+        models = ",".join(str(getattr(agent.model, "model", agent.model)) for agent in self.agents)
+        # Pre-scan and chunking change which findings the scan stage produces
+        settings = f"prescan={self.prescan};chunk_chars={self.chunk_chars};chunk_overlap={self.chunk_overlap}"
+        return policy_cache_key(policy_text, instructions, f"{models};{settings}")
+
+
+class _DocumentCheckpoints:
+    """Stage outputs of one document in a CheckpointStore; a pass-through without one."""
+
+    def __init__(
+        self,
+        store: Optional[CheckpointStore],
+        run_key: str,
+        document_text: str,
+        resume: bool = False
+    ):
+        self.store = store
+        self.run_key = run_key
+        self.document_key = document_key(document_text) if store is not None else ""
+        self.resume = resume
+        self.restored_stages = 0
+        self.restored_calls = 0
+
+    async def stage(
+        self,
+        name: str,
+        compute: Callable[[], Awaitable[Any]],
+        calls: Callable[[Any], int] = lambda output: 1
+    ) -> Any:
+        """
+        Return the stored output of a stage, or compute and store it.
+
+        Args:
+            name: Stage name, unique within the document
+            compute: Coroutine function running the stage
+            calls: Model calls a stored output saved (one per stage by default)
+
+        Returns:
+            The stage output
+        """
+        if self.store is None:
+            return await compute()
+
+        # SQLite calls block (up to the lock timeout), so they run off the event loop
+        output = None
+        if self.resume:
+            output = await asyncio.to_thread(self.store.get, self.run_key, self.document_key, name)
+        if output is not None:
+            self.restored_stages += 1
+            self.restored_calls += calls(output)
+            return output
+
+        output = await compute()
+        await asyncio.to_thread(self.store.put, self.run_key, self.document_key, name, output)
+        return output
+
+    async def discard(self) -> None:
+        """Delete the document's checkpoints, before a fresh run or once a run has completed."""
+        if self.store is not None:
+            await asyncio.to_thread(self.store.delete, self.run_key, self.document_key)
+
+
+def create_compliance_pipeline(
+    retry_config: Optional[types.HttpRetryOptions] = None,
+    max_concurrency: int = 4,
+    policy_cache: Optional[PolicyRuleCache] = None,
+    backend: Optional[str] = None,
+    chunk_chars: Optional[int] = None,
+    prescan: str = "off",
+    checkpoint_store: Optional[CheckpointStore] = None,
+    base_model: Optional[BaseLlm] = None,
+    app_name: str = "CompliancePipeline"
+) -> CompliancePipeline:
+    """
+    Creates the four specialist agents and wraps them in a CompliancePipeline.
+
+    Args:
+        retry_config: HTTP retry configuration for API calls
+        max_concurrency: Maximum in-flight analysis/rewrite calls per document
+        policy_cache: Optional persistent cache of extracted policy rules
+        backend: Model backend for every agent ("gemini" or "stub")
+        chunk_chars: Scan documents longer than this as concurrent chunks
+        prescan: Local pattern pre-scan mode ("off", "merge" or "local")
+        checkpoint_store: Optional persistent store of stage outputs for
+            resuming interrupted runs
+        base_model: Backend model shared by all four agents (see create_model)
+        app_name: ADK application name used for the pipeline's sessions
+
+    Returns:
+        CompliancePipeline ready to run documents
+    """
+    if retry_config is None:
+        retry_config = get_retry_config()
+
+    return CompliancePipeline(
+        create_policy_extractor_agent(
+            retry_config, create_model("policy_extractor", retry_config, backend, base_model)
+        ),
+        create_document_scanner_agent(
+            retry_config, create_model("document_scanner", retry_config, backend, base_model)
+        ),
+        create_violation_analyzer_agent(
+            retry_config, create_model("violation_analyzer", retry_config, backend, base_model)
+        ),
+        create_rewrite_agent(
+            retry_config, create_model("rewrite_agent", retry_config, backend, base_model)
+        ),
+        app_name=app_name,
+        max_concurrency=max_concurrency,
+        policy_cache=policy_cache,
+        chunk_chars=chunk_chars,
+        prescan=prescan,
+        checkpoint_store=checkpoint_store
+    )
+
+
+def format_report(results: Dict[str, Any]) -> str:
+    """
+    Compile the final report (orchestrator STEP 5) locally, without a model call.
+
+    Args:
+        results: Results dictionary produced by CompliancePipeline.run
+
+    Returns:
+        Report text in the orchestrator's report format
+    """
+    counts = results["severity_counts"]
+    status = "FAIL" if counts.get("CRITICAL", 0) else "PASS"
+    icons = {"CRITICAL": "🔴", "HIGH": "🟠", "MEDIUM": "🟡", "LOW": "🟢"}
+
+    lines = [
+        "📊 EXECUTIVE SUMMARY:",
+        f"- Total violations found: {results['total_violations']}",
+        "- Severity breakdown: " + ", ".join(f"{counts.get(s, 0)} {s}" for s in SEVERITY_LEVELS),
+        f"- Overall compliance status: {status}",
+    ]
+
+    for severity in SEVERITY_LEVELS:
+        violations = results["violations"].get(severity, [])
+        if not violations:
+            continue
+        lines.append("")
+        lines.append(f"{icons[severity]} {severity} VIOLATIONS:")
+        for v in violations:
+            ref = f" [{v['policy_ref']}]" if v.get("policy_ref") else ""
+            effort = f" (fix: {v['effort']})" if v.get("effort") else ""
+            lines.append(f"- {v['description']}{ref}{effort}")
+            if v.get("quote"):
+                lines.append(f"  Quote: \"{v['quote']}\"")
+            if v.get("rewrite"):
+                lines.append(f"  ✅ COMPLIANT REWRITE: {v['rewrite']}")
+
+    return "\n".join(lines)
+
+
+def _emit(event: PipelineEvent) -> None:
+    """Pass an event to the current progress_listener, if any."""
+    listener = progress_listener.get()
+    if listener is not None:
+        listener(event)
+
+
+def _downstream_calls(violations: List[Dict[str, Any]]) -> int:
+    """Model calls spent on analysis and rewrites for these violations."""
+    return sum(2 if "rewrite" in v else 1 for v in violations)
+
+
+def _build_results(
+    processed: List[Dict[str, Any]],
+    rules: str,
+    cached: bool,
+    model_calls: int
+) -> Dict[str, Any]:
+    """Group analyzed violations by severity into the pipeline results dictionary."""
+    violations = {severity: [] for severity in SEVERITY_LEVELS}
+    for violation in processed:
+        violations[violation["severity"]].append(violation)
+
+    results = {
+        "violations": violations,
+        "total_violations": len(processed),
+        "severity_counts": {k: len(v) for k, v in violations.items()},
+        "rewrites_generated": sum("rewrite" in v for v in processed),
+        "rules": rules,
+        "policy_cache_hit": cached,
+        "model_calls": model_calls,
+    }
+    results["report"] = format_report(results)
+    return results
+
+
+def _finding_text(finding: Dict[str, str]) -> str:
+    """Render a finding dictionary for an agent prompt."""
+    lines = [f"Rule: {finding['rule_id'] or 'not specified'}"]
+    if finding["quote"]:
+        lines.append(f"Quote: \"{finding['quote']}\"")
+    if finding["location"]:
+        lines.append(f"Location: {finding['location']}")
+    lines.append(f"Explanation: {finding['explanation']}")
+    return "\n".join(lines)
+
+
+def _relevant_rules(rules: str, rule_id: str) -> str:
+    """Return only the extracted rule blocks mentioning rule_id, or all rules."""
+    if rule_id:
+        # Whole IDs only, so SEC-1.1 does not select SEC-1.10; a trailing full stop is fine
+        pattern = re.compile(rf"(?<![\w.-]){re.escape(rule_id)}(?![\w-]|\.\w)")
+        blocks = re.split(r"\n\s*\n", rules)
+        matching = [block.strip() for block in blocks if pattern.search(block)]
+        if matching:
+            return "\n\n".join(matching)
+    return rules
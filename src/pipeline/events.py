@@ -0,0 +1,58 @@
+"""Typed events emitted as the stages of a pipeline run complete."""
+
+from typing import Any, Dict, Literal
+
+from pydantic import BaseModel
+
+
+class PipelineEvent(BaseModel):
+    """Base class of every pipeline event; `event` names the event type."""
+
+    event: str
+
+
+class RulesExtracted(PipelineEvent):
+    """STEP 1 finished: the policy's rules are available."""
+
+    event: Literal["rules"] = "rules"
+    rules: str
+    model_calls: int
+
+
+class ScanCompleted(PipelineEvent):
+    """STEP 2 finished: the document was scanned."""
+
+    event: Literal["scan"] = "scan"
+    findings: int
+    prescan_hits: int
+
+
+class ViolationFound(PipelineEvent):
+    """One finding of the scan, before its severity is known."""
+
+    event: Literal["violation"] = "violation"
+    index: int
+    finding: Dict[str, str]
+
+
+class ViolationAnalyzed(PipelineEvent):
+    """STEP 3 finished for one finding: its severity and remediation are known."""
+
+    event: Literal["analysis"] = "analysis"
+    index: int
+    violation: Dict[str, Any]
+
+
+class RewriteGenerated(PipelineEvent):
+    """STEP 4 finished for one CRITICAL or HIGH violation."""
+
+    event: Literal["rewrite"] = "rewrite"
+    index: int
+    rewrite: Dict[str, Any]
+
+
+class PipelineCompleted(PipelineEvent):
+    """The run finished; carries the same results dictionary run returns."""
+
+    event: Literal["completed"] = "completed"
+    results: Dict[str, Any]
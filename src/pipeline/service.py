@@ -0,0 +1,260 @@
+"""Long-lived compliance service that builds its agents and model clients once."""
+
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.runners import Runner
+from google.genai import types
+
+from src.agents import create_orchestrator_agent
+from src.tools.response_parser import parse_compliance_response
+from src.utils.checkpoint_store import CheckpointStore
+from src.utils.config import get_retry_config
+from src.utils.models import create_backend_model, create_model
+from src.utils.policy_cache import PolicyRuleCache
+from .agent_runner import run_agent
+from .compliance_pipeline import CompliancePipeline, create_compliance_pipeline
+
+# pipeline: fixed stages (CompliancePipeline); orchestrator: the LLM-driven orchestrator agent;
+# gate: pass/fail on the first violation at or above a severity (CompliancePipeline.gate)
+SERVICE_MODES = ["pipeline", "orchestrator", "gate"]
+
+
+class ComplianceService:
+    """
+    Serves many compliance checks from one set of agents, runners and clients.
+
+    The agents, their Runners and the session service are built once; every
+    check runs in fresh sessions, so concurrent checks never see each other's
+    conversation. When the agents share one backend model, they also share its
+    API client and pooled HTTP connections, which stay warm between checks.
+
+    Rules extracted from a policy are kept in memory: concurrent checks
+    against the same policy wait for a single extraction, and later checks
+    reuse its result without a model call. Only the max_policies most
+    recently used policies are kept.
+
+    The service must be used from one event loop, since the API client's
+    async connections are bound to the loop that opened them.
+    """
+
+    def __init__(
+        self,
+        pipeline: CompliancePipeline,
+        orchestrator: LlmAgent,
+        app_name: str = "ComplianceService",
+        shared_model: Optional[BaseLlm] = None,
+        max_policies: int = 128
+    ):
+        """
+        Args:
+            pipeline: Pipeline over the specialist agents
+            orchestrator: Orchestrator agent over the same specialist agents
+            app_name: ADK application name for orchestrator sessions
+            shared_model: Backend model shared by the agents, closed by aclose
+            max_policies: Maximum number of policies whose rules are kept in memory
+        """
+        self.pipeline = pipeline
+        self.orchestrator = Runner(
+            agent=orchestrator,
+            app_name=app_name,
+            session_service=pipeline.session_service
+        )
+        self.shared_model = shared_model
+        self.max_policies = max_policies
+        self._rules: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+        self.stats = {"checks": 0, "in_flight": 0, "rules_extracted": 0}
+
+    async def rules_for(self, policy_text: str) -> str:
+        """
+        Return the extracted rules of a policy, extracting them at most once.
+
+        Args:
+            policy_text: Policy document text
+
+        Returns:
+            Extracted rules text
+        """
+        key = hashlib.sha256(policy_text.encode("utf-8")).hexdigest()
+        if key in self._rules:
+            self._rules.move_to_end(key)
+        else:
+            self._rules[key] = asyncio.ensure_future(self.pipeline.extract_policy(policy_text))
+            self.stats["rules_extracted"] += 1
+            self._evict_rules()
+        future = self._rules[key]
+        try:
+            rules, _ = await asyncio.shield(future)
+        except Exception:
+            # Let the next check retry instead of replaying the failure
+            self._drop_rules(key, future)
+            raise
+        if not rules.strip():
+            self._drop_rules(key, future)
+        return rules
+
+    def _drop_rules(self, key: str, future: asyncio.Future) -> None:
+        """Forget a policy's extraction, unless it was already replaced by a newer one."""
+        if self._rules.get(key) is future:
+            del self._rules[key]
+
+    def _evict_rules(self) -> None:
+        """Drop the least recently used completed extractions beyond max_policies."""
+        # Extractions still in flight are kept, so their waiters are not duplicated
+        for key in [key for key, future in self._rules.items() if future.done()]:
+            if len(self._rules) <= self.max_policies:
+                break
+            del self._rules[key]
+
+    async def check(
+        self,
+        policy_text: str,
+        document_text: str,
+        mode: str = "pipeline",
+        user_id: str = "service",
+        threshold: str = "CRITICAL"
+    ) -> Dict[str, Any]:
+        """
+        Check one document against a policy.
+
+        Args:
+            policy_text: Policy document text
+            document_text: Document to check
+            mode: One of SERVICE_MODES
+            user_id: User ID to record the check's sessions under
+            threshold: Lowest severity that fails the check in gate mode
+
+        Returns:
+            Results dictionary as produced by CompliancePipeline.run, by
+            CompliancePipeline.gate in gate mode, or by
+            parse_compliance_response plus the report text in orchestrator mode
+
+        Raises:
+            ValueError: If the mode or threshold is unknown
+        """
+        if mode not in SERVICE_MODES:
+            raise ValueError(f"mode must be one of {SERVICE_MODES}")
+
+        self.stats["checks"] += 1
+        self.stats["in_flight"] += 1
+        try:
+            if mode == "pipeline":
+                rules = await self.rules_for(policy_text)
+                return await self.pipeline.run(policy_text, document_text, rules=rules)
+            if mode == "gate":
+                rules = await self.rules_for(policy_text)
+                return await self.pipeline.gate(policy_text, document_text, threshold, rules=rules)
+
+            query = f"""
+Scan this document for violations:
+
+POLICY:
+{policy_text}
+
+DOCUMENT:
+{document_text}
+
+Provide summary with severity breakdown.
+"""
+            response_text = await run_agent(self.orchestrator, query, user_id=user_id)
+            results = parse_compliance_response(response_text)
+            results["report"] = response_text
+            return results
+        finally:
+            self.stats["in_flight"] -= 1
+
+    async def aclose(self) -> None:
+        """Close the shared API client's pooled connections, if one was opened."""
+        client = _opened_api_client(self.shared_model)
+        if client is not None:
+            await client.aio.aclose()
+
+    async def __aenter__(self) -> "ComplianceService":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+def _opened_api_client(model: Optional[BaseLlm]) -> Any:
+    """
+    The API client a Gemini model opened for the running event loop, or None.
+
+    Gemini.api_client is cached per event loop (under "_per_loop_api_client")
+    in current ADK releases and once per model (under "api_client") in older
+    ones. Reading it on the running loop returns that loop's client; a model
+    that never opened one is left alone rather than made to build a client
+    only to close it.
+    """
+    if model is None:
+        return None
+    state = getattr(model, "__dict__", {})
+    if "api_client" in state:
+        return state["api_client"]
+    if "_per_loop_api_client" in state:
+        return model.api_client
+    return None
+
+
+def create_compliance_service(
+    retry_config: Optional[types.HttpRetryOptions] = None,
+    backend: Optional[str] = None,
+    max_concurrency: int = 4,
+    policy_cache: Optional[PolicyRuleCache] = None,
+    chunk_chars: Optional[int] = None,
+    prescan: str = "off",
+    checkpoint_store: Optional[CheckpointStore] = None,
+    app_name: str = "ComplianceService",
+    max_policies: int = 128
+) -> ComplianceService:
+    """
+    Creates the agents once and wraps them in a ComplianceService.
+
+    With the Gemini backend, all five agents share one Gemini model and so
+    one API client; rate limiting, response caching and metrics still apply
+    per agent.
+
+    Args:
+        retry_config: HTTP retry configuration for API calls
+        backend: Model backend for every agent ("gemini" or "stub")
+        max_concurrency: Maximum in-flight analysis/rewrite calls per document
+        policy_cache: Optional persistent cache of extracted policy rules
+        chunk_chars: Scan documents longer than this as concurrent chunks
+        prescan: Local pattern pre-scan mode ("off", "merge" or "local")
+        checkpoint_store: Optional persistent store of stage outputs
+        app_name: ADK application name for the service's sessions
+        max_policies: Maximum number of policies whose rules are kept in memory
+
+    Returns:
+        ComplianceService ready to serve checks
+    """
+    if retry_config is None:
+        retry_config = get_retry_config()
+
+    backend = backend or os.environ.get("COMPLIANCE_MODEL_BACKEND", "gemini")
+    # The stub answers per agent, so only a remote backend is shared
+    shared_model = create_backend_model("shared", retry_config, backend) if backend == "gemini" else None
+
+    pipeline = create_compliance_pipeline(
+        retry_config,
+        max_concurrency=max_concurrency,
+        policy_cache=policy_cache,
+        backend=backend,
+        chunk_chars=chunk_chars,
+        prescan=prescan,
+        checkpoint_store=checkpoint_store,
+        base_model=shared_model,
+        app_name=app_name
+    )
+    orchestrator = create_orchestrator_agent(
+        *pipeline.agents,
+        retry_config,
+        model=create_model("compliance_orchestrator", retry_config, backend, base_model=shared_model)
+    )
+    return ComplianceService(pipeline, orchestrator, app_name=app_name, shared_model=shared_model,
+                             max_policies=max_policies)
@@ -2,11 +2,19 @@
 Tools for the compliance Agent system.
 """
 
-from .pdf_ingestion import extract_text_from_pdf, parse_policy_structure
+from .pdf_ingestion import extract_text_from_pdf, iter_pdf_pages, count_pdf_pages, parse_policy_structure
 from .response_parser import parse_compliance_response
+from .prescan import prescan_document
+from .document_sections import split_sections, section_fingerprint, chunk_document
 
 __all__ = [
     "extract_text_from_pdf",
+    "iter_pdf_pages",
+    "count_pdf_pages",
     "parse_policy_structure",
     "parse_compliance_response",
+    "split_sections",
+    "section_fingerprint",
+    "chunk_document",
+    "prescan_document",
 ]
\ No newline at end of file
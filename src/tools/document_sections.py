@@ -0,0 +1,159 @@
+"""Splitting documents into heading-delimited sections and fingerprinting them."""
+
+import hashlib
+import re
+from typing import List
+
+_MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+\S")
+_SECTION_HEADING = re.compile(r"^SECTION\s+\d+", re.IGNORECASE)
+_CODE_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+def is_heading(line: str) -> bool:
+    """
+    Check whether a line starts a new section.
+
+    Headings are Markdown headings, "SECTION <n>" lines, and short all-caps
+    lines such as "DATABASE:" or "DATA RETENTION".
+
+    Args:
+        line: One line of document text
+
+    Returns:
+        True if the line is a heading
+    """
+    stripped = line.strip()
+    if not stripped or len(stripped) > 80:
+        return False
+    if _MARKDOWN_HEADING.match(stripped) or _SECTION_HEADING.match(stripped):
+        return True
+
+    letters = [c for c in stripped if c.isalpha()]
+    return len(letters) >= 3 and all(c.isupper() for c in letters)
+
+
+def split_sections(document_text: str) -> List[str]:
+    """
+    Split a document into sections, starting a new section at every heading.
+
+    Code blocks fenced with ``` or ~~~ are never split, even if they contain
+    heading-like lines.
+
+    Args:
+        document_text: Raw document text
+
+    Returns:
+        Non-empty sections in document order
+    """
+    sections = []
+    current = []
+    in_code_block = False
+
+    for line in document_text.splitlines():
+        if _CODE_FENCE.match(line):
+            in_code_block = not in_code_block
+        elif not in_code_block and is_heading(line) and any(l.strip() for l in current):
+            sections.append("\n".join(current).strip("\n"))
+            current = []
+        current.append(line)
+
+    if any(l.strip() for l in current):
+        sections.append("\n".join(current).strip("\n"))
+
+    return sections
+
+
+def section_fingerprint(section: str) -> str:
+    """
+    Fingerprint a section so that whitespace-only edits keep the same value.
+
+    Args:
+        section: Section text
+
+    Returns:
+        Hex SHA-256 digest of the whitespace-normalized section
+    """
+    normalized = " ".join(section.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def chunk_document(document_text: str, max_chars: int = 6000, overlap_chars: int = 500) -> List[str]:
+    """
+    Split a long document into scan-sized chunks along section boundaries.
+
+    Whole sections are packed into chunks of at most max_chars; a section that
+    is larger on its own is split between lines. Each chunk after the first
+    starts with the last lines (up to overlap_chars) of the previous chunk so
+    that findings straddling a boundary are seen in full by one chunk. The
+    overlap counts towards max_chars and is shortened, or dropped, when the
+    next section would not fit beside it.
+
+    Args:
+        document_text: Raw document text
+        max_chars: Maximum chunk size in characters
+        overlap_chars: Characters of trailing context repeated in the next chunk
+
+    Returns:
+        Chunks in document order; a single chunk if the document already fits
+    """
+    if max_chars < 1:
+        raise ValueError("max_chars must be at least 1")
+    if len(document_text) <= max_chars:
+        return [document_text] if document_text.strip() else []
+
+    pieces = []
+    for section in split_sections(document_text):
+        pieces.extend(_split_oversized(section, max_chars))
+
+    chunks = []
+    current = []
+    size = 0
+    for piece in pieces:
+        if current and size + 2 + len(piece) > max_chars:
+            chunks.append("\n\n".join(current))
+            # Reserve room for the piece that starts the next chunk
+            overlap = _tail_lines(chunks[-1], min(overlap_chars, max_chars - len(piece) - 2))
+            current = [overlap] if overlap else []
+            size = len(overlap)
+        size += (2 if current else 0) + len(piece)
+        current.append(piece)
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _split_oversized(section: str, max_chars: int) -> List[str]:
+    """Split a section larger than max_chars between lines (or hard-split huge lines)."""
+    if len(section) <= max_chars:
+        return [section]
+
+    parts = []
+    current = ""
+    for line in section.splitlines():
+        while len(line) > max_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + 1 + len(line) > max_chars:
+            parts.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _tail_lines(text: str, max_chars: int) -> str:
+    """Return the longest run of trailing whole lines that fits in max_chars."""
+    tail = []
+    size = 0
+    for line in reversed(text.splitlines()):
+        if size + len(line) + 1 > max_chars:
+            break
+        tail.insert(0, line)
+        size += len(line) + 1
+    return "\n".join(tail).strip("\n")
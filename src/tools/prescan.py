@@ -0,0 +1,139 @@
+"""Local pattern pre-scanner for violations that do not need a model to spot."""
+
+import bisect
+import re
+from typing import Any, Dict, List
+
+# (name, violation type, description, severity, pattern)
+PRESCAN_RULES = [
+    ("credential_url", "hardcoded_credential", "Credentials embedded in a connection string", "CRITICAL",
+     r"\b[a-z][a-z0-9+.-]*://[^\s:/@\"']+:[^\s@\"']+@"),
+    # A quoted value, or a bare value with a digit or symbol, so "Password: must be rotated" is prose
+    ("password", "hardcoded_credential", "Hardcoded password", "CRITICAL",
+     r"\b(?:password|passwd|pwd)\b[\"']?\s*[=:]\s*"
+     r"(?:[\"'][^\s\"']{3,}[\"']|[^\s\"',;)]*[0-9!@#$%^&*][^\s\"',;)]*(?<=[^\s\"',;)]{3}))"),
+    ("api_key", "hardcoded_credential", "Hardcoded API key", "CRITICAL",
+     r"\b(?:sk|pk|rk)_(?:live|test)_[0-9a-z]{8,}|\bAKIA[0-9A-Z]{16}\b"
+     r"|\bapi[_ -]?key\b[\"']?\s*[=:]\s*[\"']?[0-9a-z_\-]{12,}"),
+    ("private_key", "hardcoded_credential", "Private key in document", "CRITICAL",
+     r"-----BEGIN (?:RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----"),
+    ("sql_concatenation", "sql_injection", "SQL built by string concatenation", "CRITICAL",
+     r"\b(?:SELECT|INSERT|UPDATE|DELETE)\b[^\n]*[\"']\s*(?:\+|\|\||%\s*[(\w])"
+     r"|\bf[\"'](?:SELECT|INSERT|UPDATE|DELETE)\b[^\n]*\{"),
+    # Only where data is actually stored or sent, not a bare "unencrypted PII" in a list
+    ("plaintext_data", "unencrypted_pii", "Sensitive data stored unencrypted", "CRITICAL",
+     r"\b(?:stor(?:ed?|es|ing|age)|sav(?:ed?|es|ing)|kept|written|sen[dt]|transmit(?:s|ted|ting)?|at rest)\b"
+     r"[^\n]*\b(?:plaintext|plain text|unencrypted|not encrypted)\b"
+     r"|\b(?:plaintext|plain text|unencrypted|not encrypted)\b"
+     r"[^\n]*\b(?:stor(?:ed?|es|ing|age)|sav(?:ed?|es|ing)|kept|written|sen[dt]|transmit(?:s|ted|ting)?|at rest)\b"),
+    ("missing_mfa", "missing_mfa", "Missing MFA", "HIGH",
+     r"\b(?:no|without)\s+(?:MFA|2FA|multi-factor)\b"
+     r"|\b(?:MFA|2FA|multi-factor authentication)\s+(?:is\s+)?(?:not\s+required|disabled)\b"),
+    ("pii_in_logs", "pii_in_logs", "PII written to logs", "HIGH",
+     r"\blog(?:s|ged|ging)?\b[^\n]*\b(?:e-?mails?|SSNs?|PII|phone numbers?|credit cards?)\b"
+     r"|\b(?:e-?mails?|SSNs?|phone numbers?)\b[^\n]*\blogged\b"),
+    ("error_details", "excessive_error_details", "Internal details exposed in error messages", "HIGH",
+     r"\berror messages?\b[^\n]*\b(?:stack traces?|e-?mails?|PII)\b"),
+    ("indefinite_retention", "non_compliant_retention", "Non-compliant data retention", "HIGH",
+     r"\bindefinite(?:ly)?\b|\b(?:kept|retained|stored)\s+forever\b|\bnever\s+deleted\b"),
+]
+
+_RULES_BY_NAME = {rule[0]: rule for rule in PRESCAN_RULES}
+
+# Rules describing a practice rather than a value; "nothing is stored unencrypted" or
+# "do not keep logs indefinitely" state the policy, not a violation of it
+_NEGATABLE_RULES = {"plaintext_data", "pii_in_logs", "error_details", "indefinite_retention"}
+
+_NEGATION_PATTERN = re.compile(
+    r"\b(?:no|not|never|nothing|none|neither|nor|cannot|can't|don't|doesn't|mustn't|must not|"
+    r"prohibit(?:s|ed)?|forbid(?:s|den)?|avoid(?:s|ed)?)\b",
+    re.IGNORECASE
+)
+
+# Negations that are part of what the rules look for
+_VIOLATION_NEGATIONS = re.compile(r"\bnot encrypted\b|\bnever\s+deleted\b", re.IGNORECASE)
+
+# Sentence or clause ends; a dot inside a file name or version number does not end a clause
+_CLAUSE_END = re.compile(r"[.;!?](?=\s|$)|\n")
+
+# One alternation with a named group per rule, so a document is matched in a single pass
+_PRESCAN_PATTERN = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, _, _, _, pattern in PRESCAN_RULES),
+    re.IGNORECASE
+)
+
+
+def prescan_document(document_text: str) -> List[Dict[str, Any]]:
+    """
+    Flag pattern-detectable violations without calling a model.
+
+    Looks for hardcoded credentials, API keys, SQL built by string
+    concatenation, unencrypted sensitive data and similar issues that a
+    regular expression finds reliably. Each rule is reported at most once
+    per line. Credentials must be assigned a value, and practices such as
+    unencrypted storage are skipped when their clause is negated. Hits are
+    still candidates, not confirmed violations.
+
+    Args:
+        document_text: Raw document text
+
+    Returns:
+        List of hit dictionaries (rule, type, description, severity, line,
+        quote) in document order
+    """
+    line_starts = [0] + [m.end() for m in re.finditer("\n", document_text)]
+    lines = document_text.split("\n")
+
+    hits = []
+    seen = set()
+    for match in _PRESCAN_PATTERN.finditer(document_text):
+        name = match.lastgroup
+        line_index = bisect.bisect_right(line_starts, match.start()) - 1
+        if (line_index, name) in seen:
+            continue
+        if name in _NEGATABLE_RULES and _is_negated(document_text, match, line_starts[line_index]):
+            continue
+        seen.add((line_index, name))
+
+        _, violation_type, description, severity, _ = _RULES_BY_NAME[name]
+        hits.append({
+            "rule": name,
+            "type": violation_type,
+            "description": description,
+            "severity": severity,
+            "line": line_index + 1,
+            "quote": lines[line_index].strip(),
+        })
+    return hits
+
+
+def _is_negated(document_text: str, match: re.Match, line_start: int) -> bool:
+    """Whether the clause around a match negates it, e.g. "nothing is stored unencrypted"."""
+    # A newline ends a clause, so only the match's own line is searched
+    boundaries = [m.end() for m in _CLAUSE_END.finditer(document_text, line_start, match.start())]
+    start = boundaries[-1] if boundaries else line_start
+    end_match = _CLAUSE_END.search(document_text, match.end())
+    end = end_match.start() if end_match else len(document_text)
+    clause = _VIOLATION_NEGATIONS.sub("", document_text[start:end])
+    return _NEGATION_PATTERN.search(clause) is not None
+
+
+def prescan_finding(hit: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Convert a pre-scan hit into a finding like the document scanner's.
+
+    The pre-scan rule name is not a policy rule, so rule_id is left empty
+    until the scanner confirms the hit against the policy.
+
+    Args:
+        hit: Hit dictionary from prescan_document
+
+    Returns:
+        Finding dictionary with rule_id, quote, location and explanation
+    """
+    return {
+        "rule_id": "",
+        "quote": hit["quote"],
+        "location": f"line {hit['line']}",
+        "explanation": f"{hit['description']} (local pre-scan)",
+    }
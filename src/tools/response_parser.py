@@ -1,63 +1,115 @@
 """Response parser for extracting structured data from agent outputs."""
 
 import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from .schemas import ComplianceReport, ComplianceRewrite, PolicyRules, ScanResult, ViolationAnalysis
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+_SEVERITY_ICONS = {"🔴": "CRITICAL", "🟠": "HIGH", "🟡": "MEDIUM", "🟢": "LOW"}
+
+# One alternation covering every report token, so a report is tokenized in a
+# single left-to-right pass:
+# - "3 CRITICAL": count before the severity (the severity stays a token of its own)
+# - "CRITICAL: 2", "🔴 2", "HIGH severity issues: 2": severity, then count;
+#   "CRITICAL:" also starts a violation block
+# - "✅ COMPLIANT REWRITE" and similar rewrite markers
+# The leading lookahead rejects positions that cannot start any token cheaply.
+_REPORT_TOKEN = re.compile(
+    r"(?=[\dCHMLRF🔴🟠🟡🟢✅])(?:"
+    r"(?P<count_first>\d+)[ \t]*(?=(?P<count_sev>CRITICAL|HIGH|MEDIUM|LOW)\b)"
+    r"|(?P<sev>🔴|🟠|🟡|🟢|\b(?:CRITICAL|HIGH|MEDIUM|LOW)\b)(?P<label>:)?"
+    r"(?:[:\s]*(?P<count>\d+)"
+    r"|(?:[ \t]+(?:severity|violations?|issues?|findings?|problems?)){1,2}[ \t]*:?[ \t]*(?P<word_count>\d+))?"
+    r"|(?P<rewrite>✅\s*COMPLIANT\s+REWRITE|COMPLIANT\s+VERSION|REWRITE\s*:|Fixed\s+version))",
+    re.IGNORECASE
+)
+
+
+def tokenize_report(response_text: str) -> Dict[str, Any]:
+    """
+    Tokenize a free-text compliance report in a single pass.
+
+    Severity counts, rewrite markers and "SEVERITY: description" violation
+    blocks are all collected from one scan with one precompiled pattern, so
+    parsing time grows linearly with report length.
+
+    Args:
+        response_text: Raw text response from compliance agent
+
+    Returns:
+        Dictionary with severity_counts (first count reported per severity),
+        rewrites (number of rewrite markers) and violation_blocks (list of
+        (severity, description) tuples in report order)
+    """
+    counts = {}
+    rewrites = 0
+    markers = []
+
+    for match in _REPORT_TOKEN.finditer(response_text):
+        if match.group("rewrite"):
+            rewrites += 1
+            continue
+
+        if match.group("count_first"):
+            severity, count = match.group("count_sev").upper(), match.group("count_first")
+        else:
+            token = match.group("sev")
+            severity = _SEVERITY_ICONS.get(token, token.upper())
+            count = match.group("count") or match.group("word_count")
+            if match.group("label") and token.isalpha():
+                markers.append((severity, match.start(), match.end("label")))
+
+        if count is not None and severity not in counts:
+            counts[severity] = int(count)
+
+    blocks = []
+    for i, (severity, _, body_start) in enumerate(markers):
+        body_end = markers[i + 1][1] if i + 1 < len(markers) else len(response_text)
+        description = response_text[body_start:body_end].strip()
+        if description:
+            blocks.append((severity, description))
+
+    return {
+        "severity_counts": {level: counts.get(level, 0) for level in ("CRITICAL", "HIGH", "MEDIUM", "LOW")},
+        "rewrites": rewrites,
+        "violation_blocks": blocks,
+    }
 
 
 def parse_compliance_response(response_text: str) -> Dict[str, Any]:
     """
     Parse the agent's response to extract violations dynamically.
     
+    The JSON ComplianceReport block the orchestrator ends its report with is
+    used when present; otherwise counts are read from the report text with
+    tokenize_report.
+    
     Args:
         response_text: Raw text response from compliance agent
         
     Returns:
         Dictionary with violations by severity and other metrics
     """
+    report = parse_structured(response_text, ComplianceReport)
+    if report is not None:
+        return _results_from_report(report)
+
+    tokens = tokenize_report(response_text)
     violations = {
-        "CRITICAL": [],
-        "HIGH": [],
-        "MEDIUM": [],
-        "LOW": []
+        severity: [{"id": f"{severity}_{i+1}"} for i in range(count)]
+        for severity, count in tokens["severity_counts"].items()
     }
-    
-    total_violations = 0
-    rewrites_generated = 0
-    
-    # Extract severity counts using regex patterns
-    severity_patterns = {
-        "CRITICAL": r"(?:🔴|CRITICAL)[:\s]*(\d+)|(\d+)\s*(?:CRITICAL|critical)",
-        "HIGH": r"(?:🟠|HIGH)[:\s]*(\d+)|(\d+)\s*(?:HIGH|high)",
-        "MEDIUM": r"(?:🟡|MEDIUM)[:\s]*(\d+)|(\d+)\s*(?:MEDIUM|medium)",
-        "LOW": r"(?:🟢|LOW)[:\s]*(\d+)|(\d+)\s*(?:LOW|low)"
-        }
-
-    for severity, pattern in severity_patterns.items():
-        matches = re.findall(pattern, response_text, re.IGNORECASE)
-        if matches:
-            # Get the first non-empty match
-            count = next((int(m) for group in matches for m in group if m), 0)
-            violations[severity] = [{"id": f"{severity}_{i+1}"} for i in range(count)]
-
-    # Count total violations
-    total_violations = sum(len(v) for v in violations.values())
-
-    # Count rewrites (look for "COMPLIANT REWRITE" or similar patterns)
-    rewrite_patterns = [
-        r"✅\s*COMPLIANT\s+REWRITE",
-        r"COMPLIANT\s+VERSION",
-        r"REWRITE\s*:",
-        r"Fixed\s+version"
-    ]
-
-    for pattern in rewrite_patterns:
-        rewrites_generated += len(re.findall(pattern, response_text, re.IGNORECASE))
 
     return {
         "violations": violations,
-        "total_violations": total_violations,
+        "total_violations": sum(len(v) for v in violations.values()),
         "severity_counts": {k: len(v) for k, v in violations.items()},
-        "rewrites_generated": rewrites_generated
+        "rewrites_generated": tokens["rewrites"]
     }
 
 def extract_violation_details(response_text: str) -> List[Dict[str, Any]]:
@@ -70,19 +122,284 @@ def extract_violation_details(response_text: str) -> List[Dict[str, Any]]:
     Returns:
         List of violation dictionaries with details
     """
-    violations = []
+    return [
+        {
+            "severity": severity,
+            "description": description,
+            "extracted_from": "agent_response"
+        }
+        for severity, description in tokenize_report(response_text)["violation_blocks"]
+    ]
 
-    # Pattern to match violation blocks
-    # This is a simplified version - production would be more sophisticated
-    violation_pattern = r"(CRITICAL|HIGH|MEDIUM|LOW):\s*(.+?)(?=(?:CRITICAL|HIGH|MEDIUM|LOW):|$)"
 
-    matches = re.findall(violation_pattern, response_text, re.DOTALL | re.IGNORECASE)
+def split_scanner_findings(scan_text: str) -> List[str]:
+    """
+    Split a document scanner report into one text block per finding.
 
-    for severity, description in matches:
-        violations.append({
-            "severity": severity.upper(),
-            "description": description.strip(),
-            "extracted_from": "agent_response"
-        })
+    The deterministic pipeline asks the scanner to start every finding with
+    "VIOLATION <n>:". Reports that declare no violations yield an empty list.
+
+    Args:
+        scan_text: Raw text response from the document scanner agent
+
+    Returns:
+        List of finding blocks, in the order they appear in the report
+    """
+    if re.search(r"NO\s+VIOLATIONS\s+FOUND", scan_text, re.IGNORECASE):
+        return []
+
+    blocks = re.split(r"^\s*\**\s*VIOLATION\s+\d+\s*\**\s*:", scan_text,
+                      flags=re.IGNORECASE | re.MULTILINE)
+
+    # Anything before the first marker is preamble, not a finding
+    return [block.strip() for block in blocks[1:] if block.strip()]
+
+
+def extract_severity(analysis_text: str, default: str = "MEDIUM") -> str:
+    """
+    Extract the severity score assigned by the violation analyzer.
+
+    Args:
+        analysis_text: Raw text response from the violation analyzer agent
+        default: Severity returned when no level is mentioned
+
+    Returns:
+        One of CRITICAL, HIGH, MEDIUM or LOW
+    """
+    match = re.search(r"severity[^A-Za-z]*(?:score|level)?[^A-Za-z]*(CRITICAL|HIGH|MEDIUM|LOW)",
+                      analysis_text, re.IGNORECASE)
+    if not match:
+        match = re.search(r"\b(CRITICAL|HIGH|MEDIUM|LOW)\b", analysis_text)
+    return match.group(1).upper() if match else default
+
+
+def extract_rule_id(text: str) -> str:
+    """
+    Extract the first policy rule reference (e.g. SEC-1.1 or 2.4) from text.
+
+    Args:
+        text: Finding or analysis text
+
+    Returns:
+        Rule ID string, or an empty string if none is referenced
+    """
+    match = re.search(r"\b[A-Z]{2,}-\d+(?:\.\d+)*\b", text)
+    if not match:
+        match = re.search(r"(?:rule|section|policy)\s*#?\s*(\d+(?:\.\d+)+)", text, re.IGNORECASE)
+        return match.group(1) if match else ""
+    return match.group(0)
 
-    return violations
+
+def finding_key(finding: Dict[str, str]) -> str:
+    """
+    Build a normalized identity for a scanner finding.
+
+    Two findings are the same violation when they quote the same text for the
+    same rule, even if the surrounding explanation is worded differently.
+
+    Args:
+        finding: Finding dictionary from parse_scan_response
+
+    Returns:
+        Key string used for de-duplication
+    """
+    return f"{finding.get('rule_id', '')}|{finding_quote(finding)}"
+
+
+def finding_quote(finding: Dict[str, str]) -> str:
+    """
+    Normalize the document text a finding quotes.
+
+    Args:
+        finding: Finding dictionary from parse_scan_response
+
+    Returns:
+        Lowercased quote with punctuation collapsed, or the normalized
+        explanation if the finding quotes nothing
+    """
+    text = finding.get("quote") or finding.get("explanation", "")
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+def finding_summary(finding: Dict[str, str]) -> str:
+    """
+    One-line description of a finding.
+
+    Args:
+        finding: Finding dictionary from parse_scan_response
+
+    Returns:
+        First line of the explanation, or the quote or rule ID if the
+        explanation is empty
+    """
+    lines = finding.get("explanation", "").strip().splitlines()
+    return (lines[0] if lines else finding.get("quote") or finding.get("rule_id", "")).strip()
+
+
+def deduplicate_findings(findings: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Drop findings reported more than once, e.g. by overlapping document chunks.
+
+    Args:
+        findings: Finding dictionaries in document order
+
+    Returns:
+        Findings with duplicates removed, keeping the first occurrence
+    """
+    seen = set()
+    unique = []
+    for finding in findings:
+        key = finding_key(finding)
+        if key not in seen:
+            seen.add(key)
+            unique.append(finding)
+    return unique
+
+
+def parse_structured(response_text: str, schema: Type[SchemaT]) -> Optional[SchemaT]:
+    """
+    Validate an agent response against its output schema.
+
+    Accepts a bare JSON object, a fenced ```json block, or a JSON object
+    embedded after free text (as in the orchestrator's report).
+
+    Args:
+        response_text: Raw text response from an agent
+        schema: Pydantic model the response should follow
+
+    Returns:
+        Validated model instance, or None if no candidate validates
+    """
+    candidates = re.findall(r"```(?:json)?\s*(\{.*?\})\s*```", response_text, re.DOTALL)
+    start, end = response_text.find("{"), response_text.rfind("}")
+    if start != -1 and end > start:
+        candidates.append(response_text[start:end + 1])
+
+    for candidate in candidates:
+        try:
+            return schema.model_validate_json(candidate)
+        except ValidationError:
+            continue
+    return None
+
+
+def parse_policy_rules(response_text: str) -> str:
+    """
+    Render the policy extractor's structured rules as prompt text.
+
+    Each rule becomes one blank-line-separated block, so the pipeline can
+    pass only the blocks a finding references to later stages.
+
+    Args:
+        response_text: Raw text response from the policy extractor agent
+
+    Returns:
+        Rules text; the raw response if it is not structured
+    """
+    parsed = parse_structured(response_text, PolicyRules)
+    if parsed is None:
+        return response_text
+
+    blocks = []
+    for rule in parsed.rules:
+        block = (
+            f"Rule ID: {rule.rule_id}\n"
+            f"Category: {rule.category}\n"
+            f"Requirement: {rule.requirement}\n"
+            f"Severity if violated: {rule.severity}"
+        )
+        if rule.constraints:
+            block += f"\nConstraints: {rule.constraints}"
+        blocks.append(block)
+    return "\n\n".join(blocks)
+
+
+def parse_scan_response(scan_text: str) -> List[Dict[str, str]]:
+    """
+    Turn a document scanner response into finding dictionaries.
+
+    Args:
+        scan_text: Raw text response from the document scanner agent
+
+    Returns:
+        Findings with rule_id, quote, location and explanation, in report
+        order; prose reports are split with split_scanner_findings
+    """
+    parsed = parse_structured(scan_text, ScanResult)
+    if parsed is not None:
+        return [finding.model_dump() for finding in parsed.violations]
+    return [finding_from_text(block) for block in split_scanner_findings(scan_text)]
+
+
+def finding_from_text(block: str) -> Dict[str, str]:
+    """
+    Build a finding dictionary from one prose finding block.
+
+    Args:
+        block: One block from split_scanner_findings
+
+    Returns:
+        Finding with the first quoted string as its quote and the block as
+        its explanation
+    """
+    quote = re.search(r"[\"“`]([^\"”`]{8,})[\"”`]", block)
+    return {
+        "rule_id": extract_rule_id(block),
+        "quote": quote.group(1) if quote else "",
+        "location": "",
+        "explanation": block.strip(),
+    }
+
+
+def parse_analysis_response(analysis_text: str) -> Dict[str, str]:
+    """
+    Turn a violation analyzer response into severity, remediation and effort.
+
+    Args:
+        analysis_text: Raw text response from the violation analyzer agent
+
+    Returns:
+        Dictionary with severity, justification, risk, remediation and effort
+    """
+    parsed = parse_structured(analysis_text, ViolationAnalysis)
+    if parsed is not None:
+        return parsed.model_dump()
+
+    effort = re.search(r"(?:fix\s+time|effort)[^:\n]*:\s*(.+)", analysis_text, re.IGNORECASE)
+    return {
+        "severity": extract_severity(analysis_text),
+        "justification": analysis_text.strip(),
+        "risk": "",
+        "remediation": analysis_text.strip(),
+        "effort": effort.group(1).strip() if effort else "",
+    }
+
+
+def parse_rewrite_response(rewrite_text: str) -> Dict[str, Any]:
+    """
+    Turn a rewrite agent response into the compliant text and its changes.
+
+    Args:
+        rewrite_text: Raw text response from the rewrite agent
+
+    Returns:
+        Dictionary with rewrite (text) and changes (list of strings)
+    """
+    parsed = parse_structured(rewrite_text, ComplianceRewrite)
+    if parsed is not None:
+        return {"rewrite": parsed.rewrite, "changes": parsed.changes}
+    return {"rewrite": rewrite_text.strip(), "changes": []}
+
+
+def _results_from_report(report: ComplianceReport) -> Dict[str, Any]:
+    """Group a structured orchestrator report into parse_compliance_response's shape."""
+    violations = {"CRITICAL": [], "HIGH": [], "MEDIUM": [], "LOW": []}
+    for violation in report.violations:
+        violations[violation.severity].append(violation.model_dump())
+
+    return {
+        "violations": violations,
+        "total_violations": len(report.violations),
+        "severity_counts": {k: len(v) for k, v in violations.items()},
+        "rewrites_generated": sum(bool(v.rewrite) for v in report.violations)
+    }
@@ -0,0 +1,79 @@
+"""Structured output contracts for the specialist agents and the final report.
+
+Each model is passed to its agent as ``output_schema``, so Gemini returns JSON
+that validates against it. Fields have no defaults because the Gemini API
+does not accept default values in response schemas.
+"""
+
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+
+Severity = Literal["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+
+
+class PolicyRule(BaseModel):
+    """One compliance requirement extracted from the policy."""
+
+    rule_id: str = Field(description="Rule ID, e.g. SEC-1.1 or the policy's own number")
+    category: str = Field(description="Category, e.g. Data Security or Access Control")
+    requirement: str = Field(description="Clear, specific requirement text")
+    severity: Severity = Field(description="Severity level if the rule is violated")
+    constraints: str = Field(description="Key metrics or thresholds, empty if none")
+
+
+class PolicyRules(BaseModel):
+    """Output of the policy_extractor agent."""
+
+    rules: List[PolicyRule]
+
+
+class Finding(BaseModel):
+    """One violation reported by the document scanner."""
+
+    rule_id: str = Field(description="ID of the violated rule")
+    quote: str = Field(description="Exact quote of the violating text or code")
+    location: str = Field(description="Section or line where the quote was found")
+    explanation: str = Field(description="Brief explanation of why it violates the rule")
+
+
+class ScanResult(BaseModel):
+    """Output of the document_scanner agent; an empty list means compliant."""
+
+    violations: List[Finding]
+
+
+class ViolationAnalysis(BaseModel):
+    """Output of the violation_analyzer agent for one finding."""
+
+    severity: Severity
+    justification: str = Field(description="Why this severity was assigned")
+    risk: str = Field(description="Security, regulatory and business risk")
+    remediation: str = Field(description="Step-by-step remediation plan")
+    effort: str = Field(description="Estimated fix time, e.g. '2 hours'")
+
+
+class ComplianceRewrite(BaseModel):
+    """Output of the rewrite_agent for one violation."""
+
+    original: str = Field(description="Exact quote of the violating text")
+    rewrite: str = Field(description="Fully compliant version")
+    changes: List[str] = Field(description="Specific changes made and why")
+
+
+class ReportedViolation(BaseModel):
+    """One violation in the orchestrator's final report."""
+
+    severity: Severity
+    description: str
+    policy_ref: str
+    quote: str
+    remediation: str
+    effort: str
+    rewrite: str = Field(description="Compliant rewrite, empty for MEDIUM and LOW")
+
+
+class ComplianceReport(BaseModel):
+    """Machine-readable part of the orchestrator's final report."""
+
+    violations: List[ReportedViolation]
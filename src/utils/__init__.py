@@ -2,9 +2,34 @@
 Utility functions and configuration.
 """
 
-from .config import get_retry_config, load_api_key
+import importlib
 
-__all__ = [
-    "get_retry_config",
-    "load_api_key",
-]
\ No newline at end of file
+# Public name -> defining module, imported on first access so that importing
+# one utility (e.g. the SQLite stores) does not pull in google.adk
+_EXPORTS = {
+    "get_retry_config": ".config",
+    "load_api_key": ".config",
+    "create_model": ".models",
+    "DEFAULT_MODEL": ".models",
+    "MODEL_BACKENDS": ".models",
+    "PolicyRuleCache": ".policy_cache",
+    "policy_cache_key": ".policy_cache",
+    "ResponseCache": ".response_cache",
+    "SectionFindingsStore": ".section_store",
+    "CheckpointStore": ".checkpoint_store",
+    "StubLlm": ".stub_llm",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
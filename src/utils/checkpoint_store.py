@@ -0,0 +1,110 @@
+"""Persistent per-document stage checkpoints for resumable pipeline runs."""
+
+import hashlib
+import json
+import time
+from contextlib import closing
+from typing import Any, Callable, Optional
+
+from .sqlite_store import SqliteStore
+
+
+DEFAULT_CHECKPOINT_STORE_PATH = ".cache/checkpoints.db"
+
+
+def document_key(document_text: str) -> str:
+    """
+    Build the checkpoint key of one document from its content.
+
+    Args:
+        document_text: Raw document text
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    return hashlib.sha256(document_text.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore(SqliteStore):
+    """
+    SQLite-backed store of stage outputs (findings, analyses, rewrites).
+
+    Entries are keyed by a run key (policy, agent instructions, models and
+    scan settings), a document key and the stage name. A pipeline run that is
+    interrupted - by a crash or by exhausted rate limits - and then resumed
+    restarts from the last stage it completed for each document instead of
+    calling the models again. A document's checkpoints are deleted once its
+    run completes.
+    """
+
+    TABLE = "checkpoints"
+    COLUMNS = (
+        "run_key TEXT NOT NULL, document_key TEXT NOT NULL, stage TEXT NOT NULL, output TEXT NOT NULL,"
+        " created_at REAL NOT NULL, PRIMARY KEY (run_key, document_key, stage)"
+    )
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CHECKPOINT_STORE_PATH,
+        max_age_seconds: Optional[float] = 7 * 24 * 3600,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            path: SQLite database file, created if missing
+            max_age_seconds: Checkpoints older than this are dropped, or None
+                to keep them forever
+            clock: Wall-clock time source in seconds, stored with each entry
+        """
+        super().__init__(path, max_age_seconds, clock)
+
+    def get(self, run_key: str, document_key: str, stage: str) -> Optional[Any]:
+        """
+        Look up the output of one completed stage.
+
+        Args:
+            run_key: Key identifying the policy and agent configuration
+            document_key: Key from document_key
+            stage: Stage name, e.g. "findings" or "analysis:0"
+
+        Returns:
+            The stored output, or None if the stage has not completed
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT output FROM checkpoints"
+                " WHERE run_key = ? AND document_key = ? AND stage = ?",
+                (run_key, document_key, stage)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, run_key: str, document_key: str, stage: str, output: Any) -> None:
+        """
+        Store the output of one completed stage.
+
+        Args:
+            run_key: Key identifying the policy and agent configuration
+            document_key: Key from document_key
+            stage: Stage name
+            output: JSON-serializable stage output
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints"
+                " (run_key, document_key, stage, output, created_at) VALUES (?, ?, ?, ?, ?)",
+                (run_key, document_key, stage, json.dumps(output), self._clock())
+            )
+
+    def delete(self, run_key: str, document_key: str) -> None:
+        """
+        Remove every stage output of one document.
+
+        Args:
+            run_key: Key identifying the policy and agent configuration
+            document_key: Key from document_key
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "DELETE FROM checkpoints WHERE run_key = ? AND document_key = ?",
+                (run_key, document_key)
+            )
@@ -1,8 +1,10 @@
 """Configuration utilities for the compliance copilot."""
 
 import os
-from google.genai import types
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from google.genai import types
 
 
 def load_api_key() -> str:
@@ -31,7 +33,7 @@ def get_retry_config(
     exp_base: int = 7,
     initial_delay: int = 1,
     http_status_codes: Optional[list] = None
-) -> types.HttpRetryOptions:
+) -> "types.HttpRetryOptions":
     """
     Get retry configuration for API calls.
     
@@ -44,6 +46,9 @@ def get_retry_config(
     Returns:
         HttpRetryOptions configuration
     """
+    # Imported here so load_api_key and scripts that only read config skip google.genai
+    from google.genai import types
+
     if http_status_codes is None:
         http_status_codes = [429, 500, 503, 504]
     
@@ -0,0 +1,273 @@
+"""Per-agent and per-stage latency, token and retry instrumentation."""
+
+import json
+import math
+import random
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Iterator, List
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+# Keys the model wrappers set in LlmResponse.custom_metadata for this module
+CACHE_HIT_METADATA = "compliance_cache_hit"
+RETRIES_METADATA = "compliance_rate_limit_retries"
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Latency samples kept per agent or stage for the quantiles
+DEFAULT_MAX_SAMPLES = 1024
+
+
+class LatencySamples:
+    """
+    Running count, total and max of latencies plus a bounded sample of them.
+
+    The sample is a uniform reservoir (Algorithm R) of at most max_samples
+    latencies, so memory and the cost of a summary stay fixed however many
+    calls are recorded; count, total, mean and max are exact.
+    """
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: List[float] = []
+
+    def add(self, latency: float) -> None:
+        """Record one latency."""
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+        if len(self.samples) < self.max_samples:
+            self.samples.append(latency)
+        else:
+            index = random.randrange(self.count)
+            if index < self.max_samples:
+                self.samples[index] = latency
+
+    def summary(self) -> Dict[str, float]:
+        """Count, total, mean, max and nearest-rank quantiles of the recorded latencies."""
+        if not self.count:
+            return {"count": 0, "total": 0.0, "mean": 0.0, "max": 0.0,
+                    **{f"p{int(q * 100)}": 0.0 for q in QUANTILES}}
+        ordered = sorted(self.samples)
+        summary = {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count,
+            "max": self.max,
+        }
+        for q in QUANTILES:
+            summary[f"p{int(q * 100)}"] = ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+        return summary
+
+
+class MetricsRecorder:
+    """
+    In-memory record of every model call and pipeline stage.
+
+    Model calls are recorded per agent (latency, input/output tokens,
+    rate-limit retries, cache hits, errors); pipeline stages are timed by
+    name. snapshot() summarizes both, and to_json / to_prometheus export it.
+    Latency quantiles come from a bounded sample (see LatencySamples), so a
+    long-running service does not grow with every call.
+    """
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES):
+        """
+        Args:
+            max_samples: Latencies kept per agent or stage for the quantiles
+        """
+        self.max_samples = max_samples
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop everything recorded so far."""
+        self._agents: Dict[str, Dict[str, Any]] = {}
+        self._stages: Dict[str, LatencySamples] = {}
+
+    def record_call(
+        self,
+        agent: str,
+        latency: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        retries: int = 0,
+        cached: bool = False,
+        error: bool = False
+    ) -> None:
+        """
+        Record one model call.
+
+        Args:
+            agent: Name of the agent that made the call
+            latency: Seconds from request to last response, including queuing
+            input_tokens: Prompt tokens billed (0 for cache hits)
+            output_tokens: Response tokens billed (0 for cache hits)
+            retries: Times the call was re-sent after a 429
+            cached: Whether the response came from the response cache
+            error: Whether the call raised or returned an error
+        """
+        stats = self._agents.setdefault(agent, {
+            "calls": 0, "cache_hits": 0, "retries": 0, "errors": 0,
+            "input_tokens": 0, "output_tokens": 0, "latencies": LatencySamples(self.max_samples),
+        })
+        stats["calls"] += 1
+        stats["cache_hits"] += int(cached)
+        stats["retries"] += retries
+        stats["errors"] += int(error)
+        stats["input_tokens"] += input_tokens
+        stats["output_tokens"] += output_tokens
+        stats["latencies"].add(latency)
+
+    def record_stage(self, stage: str, latency: float) -> None:
+        """Record one completed pipeline stage."""
+        if stage not in self._stages:
+            self._stages[stage] = LatencySamples(self.max_samples)
+        self._stages[stage].add(latency)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one run of a pipeline stage."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - start_time)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Summarize everything recorded so far.
+
+        Returns:
+            Dictionary with "agents" (per-agent counters, tokens and latency
+            summary) and "stages" (per-stage latency summary); latencies are
+            in seconds
+        """
+        agents = {}
+        for name, stats in sorted(self._agents.items()):
+            agents[name] = {k: v for k, v in stats.items() if k != "latencies"}
+            agents[name]["latency"] = stats["latencies"].summary()
+        stages = {name: samples.summary() for name, samples in sorted(self._stages.items())}
+        return {"agents": agents, "stages": stages}
+
+    def to_json(self) -> str:
+        """Export the snapshot as JSON."""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix: str = "compliance") -> str:
+        """Export the snapshot in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        counters = [
+            ("calls", "agent_calls_total", "Model calls per agent"),
+            ("cache_hits", "agent_cache_hits_total", "Model calls answered from the response cache"),
+            ("retries", "agent_retries_total", "Model calls re-sent after a 429"),
+            ("errors", "agent_errors_total", "Model calls that failed"),
+            ("input_tokens", "agent_input_tokens_total", "Prompt tokens per agent"),
+            ("output_tokens", "agent_output_tokens_total", "Response tokens per agent"),
+        ]
+        for key, metric, help_text in counters:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for agent, stats in snapshot["agents"].items():
+                lines.append(f'{prefix}_{metric}{{agent="{agent}"}} {stats[key]}')
+
+        summaries = [
+            ("agent", "agent_latency_seconds", "Model call latency per agent",
+             {name: stats["latency"] for name, stats in snapshot["agents"].items()}),
+            ("stage", "stage_latency_seconds", "Pipeline stage latency", snapshot["stages"]),
+        ]
+        for label, metric, help_text, latencies in summaries:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} summary")
+            for name, summary in latencies.items():
+                for q in QUANTILES:
+                    lines.append(f'{prefix}_{metric}{{{label}="{name}",quantile="{q}"}} '
+                                 f'{summary[f"p{int(q * 100)}"]:.6f}')
+                lines.append(f'{prefix}_{metric}_sum{{{label}="{name}"}} {summary["total"]:.6f}')
+                lines.append(f'{prefix}_{metric}_count{{{label}="{name}"}} {summary["count"]}')
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write the snapshot to path, as Prometheus text for a .prom file and JSON otherwise."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_prometheus() if path.suffix == ".prom" else self.to_json(), encoding="utf-8")
+
+
+def format_metrics(snapshot: Dict[str, Any]) -> str:
+    """
+    Render a MetricsRecorder snapshot as per-agent and per-stage tables.
+
+    Args:
+        snapshot: Dictionary from MetricsRecorder.snapshot
+
+    Returns:
+        Multi-line text for a run summary
+    """
+    lines = [f"{'Agent':<20}{'Calls':>7}{'Cached':>8}{'Retries':>9}{'Errors':>8}"
+             f"{'Tokens in':>11}{'Tokens out':>12}{'Mean s':>9}{'p95 s':>9}"]
+    for name, stats in snapshot["agents"].items():
+        latency = stats["latency"]
+        lines.append(f"{name:<20}{stats['calls']:>7}{stats['cache_hits']:>8}{stats['retries']:>9}"
+                     f"{stats['errors']:>8}{stats['input_tokens']:>11}{stats['output_tokens']:>12}"
+                     f"{latency['mean']:>9.3f}{latency['p95']:>9.3f}")
+    lines.append("")
+    lines.append(f"{'Stage':<20}{'Runs':>7}{'Mean s':>9}{'p50 s':>9}{'p95 s':>9}{'Max s':>9}")
+    for name, latency in snapshot["stages"].items():
+        lines.append(f"{name:<20}{latency['count']:>7}{latency['mean']:>9.3f}{latency['p50']:>9.3f}"
+                     f"{latency['p95']:>9.3f}{latency['max']:>9.3f}")
+    return "\n".join(lines)
+
+
+class InstrumentedLlm(BaseLlm):
+    """Wraps a model and records every call in a MetricsRecorder."""
+
+    inner: BaseLlm
+    recorder: Any
+    agent_name: str
+
+    @property
+    def capabilities(self):
+        return self.inner.capabilities
+
+    async def generate_content_async(
+        self,
+        llm_request: LlmRequest,
+        stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        start_time = time.perf_counter()
+        call = {"input_tokens": 0, "output_tokens": 0, "retries": 0, "cached": False, "error": False}
+        try:
+            async for response in self.inner.generate_content_async(llm_request, stream):
+                metadata = response.custom_metadata or {}
+                call["cached"] = call["cached"] or bool(metadata.get(CACHE_HIT_METADATA))
+                call["retries"] = max(call["retries"], metadata.get(RETRIES_METADATA, 0))
+                call["error"] = call["error"] or bool(response.error_code)
+                usage = response.usage_metadata
+                if usage and not call["cached"]:
+                    # Streamed chunks report running totals, so keep the largest
+                    call["input_tokens"] = max(call["input_tokens"], usage.prompt_token_count or 0)
+                    call["output_tokens"] = max(call["output_tokens"], usage.candidates_token_count or 0)
+                yield response
+        except Exception:
+            call["error"] = True
+            raise
+        finally:
+            self.recorder.record_call(self.agent_name, time.perf_counter() - start_time, **call)
+
+
+_recorder = MetricsRecorder()
+
+
+def get_metrics() -> MetricsRecorder:
+    """Return the process-wide MetricsRecorder that create_model instruments into."""
+    return _recorder
@@ -0,0 +1,116 @@
+"""Model backend selection for the agent factories."""
+
+import os
+from typing import Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.genai import types
+
+from .metrics import InstrumentedLlm, get_metrics
+from .rate_limiter import RateLimitedLlm, get_rate_limiter
+from .response_cache import CachedLlm, get_response_cache
+from .stub_llm import StubLlm, load_replay_file
+
+DEFAULT_MODEL = "gemini-2.0-flash-lite"
+
+MODEL_BACKENDS = ["gemini", "stub"]
+
+
+def create_backend_model(
+    agent_name: str,
+    retry_config: types.HttpRetryOptions,
+    backend: Optional[str] = None
+) -> BaseLlm:
+    """
+    Create the bare backend model, without rate limiting, caching or metrics.
+
+    The backend defaults to the COMPLIANCE_MODEL_BACKEND environment variable,
+    then to "gemini". The "stub" backend answers locally and is configured with
+    COMPLIANCE_STUB_LATENCY (seconds per call) and COMPLIANCE_STUB_REPLAY
+    (path to a JSON file of recorded responses per agent).
+
+    A Gemini model holds its API client, and with it the pooled HTTP
+    connections, so one instance can be passed to create_model as base_model
+    for every agent of a long-lived service.
+
+    Args:
+        agent_name: Name of the agent the model serves
+        retry_config: HTTP retry configuration for API calls
+        backend: "gemini" or "stub"
+
+    Returns:
+        Model instance
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = backend or os.environ.get("COMPLIANCE_MODEL_BACKEND", "gemini")
+
+    if backend == "gemini":
+        if get_rate_limiter() is not None and retry_config.http_status_codes:
+            retry_config = retry_config.model_copy(update={
+                "http_status_codes": [code for code in retry_config.http_status_codes if code != 429]
+            })
+        return Gemini(model=DEFAULT_MODEL, retry_options=retry_config)
+    if backend == "stub":
+        replay_path = os.environ.get("COMPLIANCE_STUB_REPLAY")
+        return StubLlm(
+            agent_name=agent_name,
+            latency=float(os.environ.get("COMPLIANCE_STUB_LATENCY", "0")),
+            replay=load_replay_file(replay_path) if replay_path else {}
+        )
+    raise ValueError(f"Unknown model backend '{backend}'. Choose from: {', '.join(MODEL_BACKENDS)}")
+
+
+def create_model(
+    agent_name: str,
+    retry_config: types.HttpRetryOptions,
+    backend: Optional[str] = None,
+    base_model: Optional[BaseLlm] = None
+) -> BaseLlm:
+    """
+    Create the model an agent factory should use.
+
+    The backend model comes from create_backend_model unless base_model is
+    given.
+
+    When a process-wide rate limiter is configured (COMPLIANCE_RPM and
+    COMPLIANCE_TPM, or configure_rate_limiter), the model is wrapped so all
+    agents share its budgets, and 429s are left to the limiter instead of
+    the HTTP client's exponential backoff.
+
+    With COMPLIANCE_RESPONSE_CACHE set to a database path, identical calls
+    (same agent, model, instruction and input) are answered from a local
+    response cache ahead of the rate limiter.
+
+    Every model is instrumented: latency, tokens, retries and cache hits of
+    each call are recorded per agent in the get_metrics() recorder.
+
+    Args:
+        agent_name: Name of the agent the model serves
+        retry_config: HTTP retry configuration for API calls
+        backend: "gemini" or "stub"
+        base_model: Existing backend model to wrap, e.g. one Gemini client
+            shared by several agents
+
+    Returns:
+        Model instance for LlmAgent
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    model = base_model or create_backend_model(agent_name, retry_config, backend)
+
+    limiter = get_rate_limiter()
+    if limiter is not None:
+        model = RateLimitedLlm(model=model.model, inner=model, limiter=limiter)
+    cache = get_response_cache()
+    if cache is not None:
+        model = CachedLlm(model=model.model, inner=model, cache=cache, agent_name=agent_name)
+    return InstrumentedLlm(model=model.model, inner=model, recorder=get_metrics(), agent_name=agent_name)
+
+
+def uses_remote_model(backend: Optional[str] = None) -> bool:
+    """Return True if the selected backend needs GOOGLE_API_KEY."""
+    return (backend or os.environ.get("COMPLIANCE_MODEL_BACKEND", "gemini")) == "gemini"
@@ -0,0 +1,81 @@
+"""Persistent cache for extracted policy rules, keyed by policy content hash."""
+
+import hashlib
+import json
+import time
+from typing import Callable, Optional
+
+from .sqlite_store import SqliteCache
+
+
+DEFAULT_POLICY_CACHE_PATH = ".cache/policy_rules.db"
+
+
+def policy_cache_key(policy_text: str, instruction: str, model_name: str) -> str:
+    """
+    Build the cache key for one policy extraction.
+
+    The key covers everything that changes the extractor's output: the policy
+    text, the agent instruction and the model name.
+
+    Args:
+        policy_text: Raw policy document text
+        instruction: Policy extractor agent instruction
+        model_name: Name of the model behind the policy extractor
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps([policy_text, instruction, model_name], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PolicyRuleCache(SqliteCache):
+    """
+    SQLite-backed store of extracted rules with size and age eviction.
+
+    Entries older than max_age_seconds are treated as misses and removed.
+    When more than max_entries are stored, the least recently used are dropped.
+    """
+
+    TABLE = "policy_rules"
+    COLUMNS = "key TEXT PRIMARY KEY, rules TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL"
+    VALUE_COLUMN = "rules"
+
+    def __init__(
+        self,
+        path: str = DEFAULT_POLICY_CACHE_PATH,
+        max_entries: int = 256,
+        max_age_seconds: Optional[float] = 30 * 24 * 3600,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            path: SQLite database file, created if missing
+            max_entries: Maximum number of cached policies
+            max_age_seconds: Maximum entry age, or None to never expire
+            clock: Wall-clock time source in seconds, stored with each entry
+        """
+        super().__init__(path, max_entries, max_age_seconds, clock)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up cached rules.
+
+        Args:
+            key: Key from policy_cache_key
+
+        Returns:
+            Cached rules text, or None on a miss or expired entry
+        """
+        return self._get_value(key)
+
+    def put(self, key: str, rules: str) -> None:
+        """
+        Store extracted rules and apply eviction.
+
+        Args:
+            key: Key from policy_cache_key
+            rules: Extracted rules text
+        """
+        self._put_value(key, rules)
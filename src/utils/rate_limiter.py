@@ -0,0 +1,315 @@
+"""Process-wide request and token budgets shared by every model call."""
+
+import asyncio
+import contextvars
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncGenerator, Callable, Deque, Dict, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .metrics import RETRIES_METADATA
+
+# Calls are queued per key and granted round-robin across keys; the pipeline
+# sets one key per document so a large document cannot starve the others
+rate_limit_key: contextvars.ContextVar[str] = contextvars.ContextVar("rate_limit_key", default="default")
+
+# Expected response size when a request does not set max_output_tokens
+DEFAULT_OUTPUT_TOKENS = 1024
+
+
+class RateLimiter:
+    """
+    Paces model calls to requests-per-minute and tokens-per-minute budgets.
+
+    Both budgets refill continuously, and at most burst_seconds worth can be
+    saved up, so calls are spread evenly over the minute instead of firing
+    in a burst and then stalling. Either budget may be omitted, but not
+    both. Every 429 halves the pace and briefly
+    holds all calls (for the server's retry delay if it gives one). Each
+    successful call restores a little of the pace, so throughput settles
+    just under the real quota.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        burst_seconds: float = 1.0,
+        cooldown_seconds: float = 2.0,
+        min_pace: float = 0.1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            requests_per_minute: Request budget, or None for no request limit
+            tokens_per_minute: Token budget, or None for no token limit
+            burst_seconds: Seconds of budget that may be saved up and spent at once
+            cooldown_seconds: Pause after a 429 without a server retry delay
+            min_pace: Lowest fraction of the budgets the limiter backs off to
+            clock: Monotonic time source in seconds
+        """
+        if requests_per_minute is None and tokens_per_minute is None:
+            raise ValueError("requests_per_minute or tokens_per_minute is required")
+        if requests_per_minute is not None and requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        if tokens_per_minute is not None and tokens_per_minute <= 0:
+            raise ValueError("tokens_per_minute must be positive")
+
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.burst_seconds = burst_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.min_pace = min_pace
+        self._clock = clock
+
+        self.pace = 1.0
+        self._request_capacity = max(1.0, requests_per_minute * burst_seconds / 60) if requests_per_minute else 1.0
+        self._token_capacity = tokens_per_minute * burst_seconds / 60 if tokens_per_minute else 0.0
+        self._requests = self._request_capacity
+        self._tokens = self._token_capacity
+        self._updated = clock()
+        self._hold_until = 0.0
+
+        self._queues: "OrderedDict[str, Deque[Tuple[asyncio.Future, int]]]" = OrderedDict()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.stats = {"granted": 0, "rate_limited": 0, "wait_seconds": 0.0}
+
+    async def acquire(self, tokens: int = 0, key: Optional[str] = None) -> None:
+        """
+        Wait for budget for one call.
+
+        Args:
+            tokens: Estimated tokens the call will use
+            key: Fairness key; defaults to the current rate_limit_key
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queues.setdefault(key or rate_limit_key.get(), deque()).append((future, tokens))
+
+        if self._dispatcher is None or self._dispatcher.done() or self._dispatcher.get_loop() is not loop:
+            self._dispatcher = loop.create_task(self._dispatch())
+
+        start_time = time.perf_counter()
+        await future
+        self.stats["wait_seconds"] += time.perf_counter() - start_time
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token budget once a call reports its real usage."""
+        if self.tokens_per_minute:
+            self._refill()
+            self._tokens -= actual_tokens - estimated_tokens
+
+    def report_success(self) -> None:
+        """Recover pace after a call that was not rate limited."""
+        self.pace = min(1.0, self.pace + 0.05)
+
+    def report_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """
+        Back off after a 429.
+
+        Args:
+            retry_after: Server-suggested delay in seconds, if any
+        """
+        self.stats["rate_limited"] += 1
+        now = self._clock()
+        # Calls already in flight when the first 429 arrived fail together;
+        # count them as one signal rather than backing off once per call
+        if now >= self._hold_until:
+            self.pace = max(self.min_pace, self.pace / 2)
+        self._refill()
+        self._requests = min(self._requests, 0.0)
+        self._hold_until = max(self._hold_until, now + (retry_after or self.cooldown_seconds))
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(
+                self._request_capacity,
+                self._requests + elapsed * self.requests_per_minute / 60 * self.pace
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                self._token_capacity,
+                self._tokens + elapsed * self.tokens_per_minute / 60 * self.pace
+            )
+
+    def _delay(self, tokens: int) -> float:
+        """Seconds until a call of this size fits the budgets (0 if it fits now)."""
+        self._refill()
+        delay = self._hold_until - self._clock()
+        if self.requests_per_minute and self._requests < 1:
+            delay = max(delay, (1 - self._requests) / (self.requests_per_minute / 60 * self.pace))
+        if self.tokens_per_minute:
+            # A call bigger than the burst allowance waits for a full bucket
+            needed = min(tokens, self._token_capacity)
+            if self._tokens < needed:
+                delay = max(delay, (needed - self._tokens) / (self.tokens_per_minute / 60 * self.pace))
+        return max(delay, 0.0)
+
+    async def _dispatch(self) -> None:
+        """Grant queued calls round-robin across keys as budget allows."""
+        loop = asyncio.get_running_loop()
+        while self._queues:
+            key, queue = next(iter(self._queues.items()))
+            future, tokens = queue[0]
+            # Skip cancelled calls and leftovers from an event loop that has closed
+            if future.done() or future.get_loop() is not loop:
+                self._pop(key)
+                continue
+
+            delay = self._delay(tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+            self.stats["granted"] += 1
+            future.set_result(None)
+            self._pop(key)
+            if key in self._queues:
+                self._queues.move_to_end(key)
+
+    def _pop(self, key: str) -> None:
+        self._queues[key].popleft()
+        if not self._queues[key]:
+            del self._queues[key]
+
+
+class RateLimitedLlm(BaseLlm):
+    """
+    Wraps a model so every call goes through a RateLimiter.
+
+    429 responses are reported to the limiter and the call is queued again,
+    instead of sleeping through the HTTP client's exponential backoff.
+    """
+
+    inner: BaseLlm
+    limiter: Any
+    max_attempts: int = 5
+
+    @property
+    def capabilities(self):
+        return self.inner.capabilities
+
+    async def generate_content_async(
+        self,
+        llm_request: LlmRequest,
+        stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        estimate = estimate_tokens(llm_request)
+        for attempt in range(self.max_attempts):
+            await self.limiter.acquire(estimate)
+            responded = False
+            try:
+                async for response in self.inner.generate_content_async(llm_request, stream):
+                    usage = response.usage_metadata
+                    if usage and usage.total_token_count:
+                        self.limiter.record_usage(estimate, usage.total_token_count)
+                    if attempt:
+                        response.custom_metadata = {**(response.custom_metadata or {}), RETRIES_METADATA: attempt}
+                    responded = True
+                    yield response
+            except Exception as e:
+                # Only a call that produced nothing yet can be retried safely
+                if responded or not is_rate_limit_error(e) or attempt == self.max_attempts - 1:
+                    raise
+                self.limiter.report_rate_limited(retry_after_seconds(e))
+                continue
+            self.limiter.report_success()
+            return
+
+
+def estimate_tokens(llm_request: LlmRequest) -> int:
+    """
+    Estimate the tokens a request will use before sending it.
+
+    Roughly four characters per prompt token, plus the response budget.
+
+    Args:
+        llm_request: Request about to be sent
+
+    Returns:
+        Estimated total tokens
+    """
+    chars = 0
+    for content in llm_request.contents or []:
+        for part in content.parts or []:
+            chars += len(getattr(part, "text", None) or "")
+    config = llm_request.config
+    instruction = getattr(config, "system_instruction", None) if config else None
+    if isinstance(instruction, str):
+        chars += len(instruction)
+    max_output = getattr(config, "max_output_tokens", None) if config else None
+    return chars // 4 + (max_output or DEFAULT_OUTPUT_TOKENS)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Return True for a 429 / RESOURCE_EXHAUSTED error from the model API."""
+    return getattr(error, "code", None) == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Extract the server's suggested retry delay (e.g. 'retryDelay': '27s'), if any."""
+    match = re.search(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", str(error))
+    return float(match.group(1)) if match else None
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_configured = False
+
+
+def configure_rate_limiter(
+    requests_per_minute: Optional[float],
+    tokens_per_minute: Optional[float] = None,
+    **kwargs
+) -> Optional[RateLimiter]:
+    """
+    Set the process-wide rate limiter used by create_model.
+
+    Args:
+        requests_per_minute: Request budget, or None for no request limit
+        tokens_per_minute: Token budget, or None for no token limit
+        **kwargs: Further RateLimiter options
+
+    Returns:
+        The new limiter, or None if neither budget is set (rate limiting off)
+    """
+    global _limiter, _limiter_configured
+    if requests_per_minute or tokens_per_minute:
+        _limiter = RateLimiter(requests_per_minute, tokens_per_minute, **kwargs)
+    else:
+        _limiter = None
+    _limiter_configured = True
+    return _limiter
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Return the process-wide rate limiter.
+
+    Unless configure_rate_limiter was called, it is created on first use from
+    COMPLIANCE_RPM and COMPLIANCE_TPM; without either there is none.
+    """
+    if not _limiter_configured:
+        rpm = os.environ.get("COMPLIANCE_RPM")
+        tpm = os.environ.get("COMPLIANCE_TPM")
+        configure_rate_limiter(float(rpm) if rpm else None, float(tpm) if tpm else None)
+    return _limiter
+
+
+def rate_limiter_stats() -> Dict[str, Any]:
+    """Counters of the process-wide limiter (empty if rate limiting is off)."""
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return {}
+    return {**limiter.stats, "pace": limiter.pace}
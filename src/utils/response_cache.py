@@ -0,0 +1,165 @@
+"""Opt-in content-addressed cache of model responses, shared across runs."""
+
+import hashlib
+import json
+import os
+import time
+from typing import AsyncGenerator, Callable, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .metrics import CACHE_HIT_METADATA, RETRIES_METADATA
+from .sqlite_store import SqliteCache
+
+
+DEFAULT_RESPONSE_CACHE_PATH = ".cache/responses.db"
+
+
+def response_cache_key(agent_name: str, llm_request: LlmRequest) -> str:
+    """
+    Build the cache key for one model call.
+
+    The key covers the agent name, the model, the system instruction, the
+    response schema and the full conversation sent to the model.
+
+    Args:
+        agent_name: Name of the agent making the call
+        llm_request: Request about to be sent
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    config = llm_request.config
+    schema = getattr(config, "response_schema", None) if config else None
+    if isinstance(schema, type):
+        schema = schema.model_json_schema()
+    payload = json.dumps([
+        agent_name,
+        llm_request.model,
+        str(getattr(config, "system_instruction", None) if config else None),
+        schema,
+        [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents],
+    ], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(SqliteCache):
+    """
+    SQLite-backed store of model responses with TTL and LRU eviction.
+
+    Entries older than max_age_seconds are treated as misses and removed.
+    When more than max_entries are stored, the least recently used are dropped.
+    """
+
+    TABLE = "responses"
+    COLUMNS = "key TEXT PRIMARY KEY, responses TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL"
+    VALUE_COLUMN = "responses"
+
+    def __init__(
+        self,
+        path: str = DEFAULT_RESPONSE_CACHE_PATH,
+        max_entries: int = 10000,
+        max_age_seconds: Optional[float] = 7 * 24 * 3600,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            path: SQLite database file, created if missing
+            max_entries: Maximum number of cached responses
+            max_age_seconds: Maximum entry age, or None to never expire
+            clock: Wall-clock time source in seconds, stored with each entry
+        """
+        super().__init__(path, max_entries, max_age_seconds, clock)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List[LlmResponse]]:
+        """
+        Look up the responses of an identical earlier call.
+
+        Args:
+            key: Key from response_cache_key
+
+        Returns:
+            Cached responses, or None on a miss or expired entry
+        """
+        payload = self._get_value(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [LlmResponse.model_validate(r) for r in json.loads(payload)]
+
+    def put(self, key: str, responses: List[LlmResponse]) -> None:
+        """
+        Store the responses of one call and apply eviction.
+
+        Args:
+            key: Key from response_cache_key
+            responses: Every response the model yielded for the call
+        """
+        self._put_value(key, json.dumps([r.model_dump(mode="json", exclude_none=True) for r in responses]))
+
+
+class CachedLlm(BaseLlm):
+    """
+    Wraps a model so identical calls are answered from a ResponseCache.
+
+    Only complete, error-free answers are stored. A hit never reaches the
+    wrapped model, so it costs no quota and no rate limiter budget.
+    """
+
+    inner: BaseLlm
+    cache: ResponseCache
+    agent_name: str
+
+    @property
+    def capabilities(self):
+        return self.inner.capabilities
+
+    async def generate_content_async(
+        self,
+        llm_request: LlmRequest,
+        stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = response_cache_key(self.agent_name, llm_request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            for response in cached:
+                response.custom_metadata = {**(response.custom_metadata or {}), CACHE_HIT_METADATA: True}
+                yield response
+            return
+
+        responses = []
+        async for response in self.inner.generate_content_async(llm_request, stream):
+            responses.append(response)
+            yield response
+        if responses and not any(r.error_code for r in responses):
+            self.cache.put(key, [_without_call_metadata(r) for r in responses])
+
+
+def _without_call_metadata(response: LlmResponse) -> LlmResponse:
+    """Copy of a response without the metadata the wrappers attached to this one call."""
+    metadata = {k: v for k, v in (response.custom_metadata or {}).items()
+                if k not in (CACHE_HIT_METADATA, RETRIES_METADATA)}
+    return response.model_copy(update={"custom_metadata": metadata or None})
+
+
+_caches = {}
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Return the response cache selected by COMPLIANCE_RESPONSE_CACHE, if any.
+
+    The variable holds the cache database path; the cache is off when it is
+    unset. One ResponseCache is shared per path within the process.
+    """
+    path = os.environ.get("COMPLIANCE_RESPONSE_CACHE")
+    if not path:
+        return None
+    if path not in _caches:
+        _caches[path] = ResponseCache(path)
+    return _caches[path]
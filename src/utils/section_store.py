@@ -0,0 +1,72 @@
+"""Persistent per-section findings for incremental document re-scans."""
+
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .sqlite_store import SqliteCache
+
+
+DEFAULT_SECTION_STORE_PATH = ".cache/section_findings.db"
+
+
+class SectionFindingsStore(SqliteCache):
+    """
+    SQLite-backed store of analyzed violations per document section.
+
+    Entries are keyed by a findings key (what the findings depend on: policy,
+    agent instructions and models) and the section fingerprint, so an
+    unchanged section is never sent to the agents twice for the same policy.
+    Like the policy and response caches, entries older than max_age_seconds
+    are dropped, and beyond max_entries the least recently used are evicted.
+    """
+
+    TABLE = "section_findings"
+    COLUMNS = (
+        "findings_key TEXT NOT NULL, fingerprint TEXT NOT NULL, violations TEXT NOT NULL,"
+        " created_at REAL NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (findings_key, fingerprint)"
+    )
+    KEY_COLUMNS = ("findings_key", "fingerprint")
+    VALUE_COLUMN = "violations"
+
+    def __init__(
+        self,
+        path: str = DEFAULT_SECTION_STORE_PATH,
+        max_entries: int = 50000,
+        max_age_seconds: Optional[float] = 30 * 24 * 3600,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            path: SQLite database file, created if missing
+            max_entries: Maximum number of stored sections
+            max_age_seconds: Maximum entry age, or None to never expire
+            clock: Wall-clock time source in seconds, stored with each entry
+        """
+        super().__init__(path, max_entries, max_age_seconds, clock)
+
+    def get(self, findings_key: str, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up the stored violations of one section.
+
+        Args:
+            findings_key: Key identifying the policy and agent configuration
+            fingerprint: Fingerprint from section_fingerprint
+
+        Returns:
+            List of violation dictionaries (possibly empty), or None if the
+            section has not been scanned or its entry expired
+        """
+        violations = self._get_value(findings_key, fingerprint)
+        return json.loads(violations) if violations is not None else None
+
+    def put(self, findings_key: str, fingerprint: str, violations: List[Dict[str, Any]]) -> None:
+        """
+        Store the analyzed violations of one section and apply eviction.
+
+        Args:
+            findings_key: Key identifying the policy and agent configuration
+            fingerprint: Fingerprint from section_fingerprint
+            violations: Violation dictionaries found in the section
+        """
+        self._put_value(findings_key, fingerprint, json.dumps(violations))
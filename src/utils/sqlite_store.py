@@ -0,0 +1,126 @@
+"""Shared base of the SQLite-backed caches and stores."""
+
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Callable, Optional
+
+
+class SqliteStore:
+    """
+    One SQLite table in a database file, opened per operation.
+
+    A connection per call keeps a store safe to share between threads and
+    processes. Subclasses set TABLE and COLUMNS (the CREATE TABLE body);
+    with max_age_seconds, rows whose created_at is older are dropped.
+    """
+
+    TABLE = ""
+    COLUMNS = ""
+
+    def __init__(
+        self,
+        path: str,
+        max_age_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            path: SQLite database file, created if missing
+            max_age_seconds: Maximum entry age, or None to never expire
+            clock: Wall-clock time source in seconds, stored with each entry
+        """
+        self.path = Path(path)
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {self.TABLE} ({self.COLUMNS})")
+            self._expire(conn, self._clock())
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _expire(self, conn: sqlite3.Connection, now: float) -> None:
+        """Delete rows older than max_age_seconds."""
+        if self.max_age_seconds is not None:
+            conn.execute(f"DELETE FROM {self.TABLE} WHERE created_at < ?", (now - self.max_age_seconds,))
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.max_age_seconds is not None and now - created_at > self.max_age_seconds
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"DELETE FROM {self.TABLE}")
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+
+
+class SqliteCache(SqliteStore):
+    """
+    Key/value SqliteStore with age and least-recently-used eviction.
+
+    Entries older than max_age_seconds are treated as misses and removed.
+    When more than max_entries are stored, the least recently used are dropped.
+    Subclasses name their key columns in KEY_COLUMNS and their value column
+    in VALUE_COLUMN; COLUMNS must have those, created_at and last_used.
+    """
+
+    KEY_COLUMNS = ("key",)
+    VALUE_COLUMN = "value"
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        max_age_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            path: SQLite database file, created if missing
+            max_entries: Maximum number of entries kept
+            max_age_seconds: Maximum entry age, or None to never expire
+            clock: Wall-clock time source in seconds, stored with each entry
+        """
+        self.max_entries = max_entries
+        super().__init__(path, max_age_seconds, clock)
+
+    def _get_value(self, *key: str) -> Optional[str]:
+        """Return the stored value of key, or None on a miss or expired entry."""
+        where = " AND ".join(f"{column} = ?" for column in self.KEY_COLUMNS)
+        now = self._clock()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                f"SELECT {self.VALUE_COLUMN}, created_at FROM {self.TABLE} WHERE {where}", key
+            ).fetchone()
+            if row is None:
+                return None
+            if self._is_expired(row[1], now):
+                conn.execute(f"DELETE FROM {self.TABLE} WHERE {where}", key)
+                return None
+
+            conn.execute(f"UPDATE {self.TABLE} SET last_used = ? WHERE {where}", (now, *key))
+            return row[0]
+
+    def _put_value(self, *key_and_value: str) -> None:
+        """Store the value (last argument) under the key, then apply age and size eviction."""
+        columns = ", ".join((*self.KEY_COLUMNS, self.VALUE_COLUMN, "created_at", "last_used"))
+        placeholders = ", ".join("?" * (len(self.KEY_COLUMNS) + 3))
+        now = self._clock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE} ({columns}) VALUES ({placeholders})",
+                (*key_and_value, now, now)
+            )
+            self._expire(conn, now)
+            conn.execute(
+                f"DELETE FROM {self.TABLE} WHERE rowid NOT IN ("
+                f" SELECT rowid FROM {self.TABLE} ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,)
+            )
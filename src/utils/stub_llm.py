@@ -0,0 +1,265 @@
+"""Offline stand-in model that answers like the specialist agents without any API call."""
+
+import asyncio
+import json
+import random
+import re
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+from src.tools.prescan import prescan_document
+
+
+# Demo policy rule cited for each pre-scanner violation type
+STUB_POLICY_REFS = {
+    "hardcoded_credential": "POL-3.3",
+    "sql_injection": "POL-2.4",
+    "unencrypted_pii": "POL-2.1",
+    "missing_mfa": "POL-3.2",
+    "pii_in_logs": "POL-2.3",
+    "excessive_error_details": "POL-2.5",
+    "non_compliant_retention": "POL-4.1",
+}
+
+_SEVERITY_KEYWORDS = [
+    ("CRITICAL", ("password", "api key", "credential", "private key", "sql", "unencrypted", "plaintext")),
+    ("HIGH", ("mfa", "log", "retention", "error message")),
+]
+
+
+class StubLlm(BaseLlm):
+    """
+    Local replay/stub model with configurable latency.
+
+    Each instance plays one specialist agent (agent_name). Responses come
+    from, in order: a replay mapping of recorded answers, or simple rules
+    that imitate the agent's output format well enough for the pipeline and
+    parsers to run end to end. Token usage is estimated from text length.
+    """
+
+    model: str = "stub"
+    agent_name: str = ""
+    latency: float = 0.0
+    jitter: float = 0.0
+    replay: Dict[str, Any] = {}
+
+    _replay_calls: int = PrivateAttr(default=0)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        prompt = _last_user_text(llm_request)
+
+        delay = self.latency + random.uniform(0, self.jitter) if self.jitter else self.latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        text = self._replayed_response()
+        if text is None:
+            structured = bool(llm_request.config and llm_request.config.response_schema)
+            text = stub_response(self.agent_name, prompt, structured)
+
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=_estimate_tokens(prompt),
+                candidates_token_count=_estimate_tokens(text),
+                total_token_count=_estimate_tokens(prompt) + _estimate_tokens(text)
+            )
+        )
+
+    def _replayed_response(self) -> Optional[str]:
+        """Return the next recorded response for this agent, cycling through lists."""
+        recorded = self.replay.get(self.agent_name)
+        if recorded is None:
+            return None
+        if isinstance(recorded, str):
+            return recorded
+
+        response = recorded[self._replay_calls % len(recorded)]
+        self._replay_calls += 1
+        return response
+
+
+def load_replay_file(path: str) -> Dict[str, Any]:
+    """
+    Load recorded responses for StubLlm.
+
+    The file is a JSON object mapping agent names to a response string or a
+    list of responses that are returned in turn.
+
+    Args:
+        path: Path to the replay JSON file
+
+    Returns:
+        Replay mapping
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def stub_response(agent_name: str, prompt: str, structured: bool = False) -> str:
+    """
+    Generate a rule-based response in the output format of the named agent.
+
+    Args:
+        agent_name: Name of the agent being imitated
+        prompt: Prompt text sent to the agent
+        structured: Answer with JSON for the agent's output schema, as Gemini
+            does when the request carries a response schema
+
+    Returns:
+        Response text
+    """
+    if agent_name == "policy_extractor":
+        rules = _stub_rules(prompt)
+        if structured:
+            return json.dumps({"rules": rules})
+        return "\n\n".join(
+            f"Rule ID: {rule['rule_id']}\nRequirement: {rule['requirement']}" for rule in rules
+        ) or "No explicit numbered requirements found."
+    if agent_name == "document_scanner":
+        findings = _stub_scan(prompt)
+        if structured:
+            return json.dumps({"violations": findings})
+        if not findings:
+            return "NO VIOLATIONS FOUND"
+        return "\n".join(
+            f"VIOLATION {i}: {f['explanation']} (violates {f['rule_id']})\nQuote: \"{f['quote']}\""
+            for i, f in enumerate(findings, 1)
+        )
+    if agent_name == "violation_analyzer":
+        analysis = _stub_analysis(prompt)
+        if structured:
+            return json.dumps(analysis)
+        return (
+            f"Severity: {analysis['severity']}\n"
+            f"Risk: {analysis['risk']}\n"
+            f"Remediation: {analysis['remediation']}\n"
+            f"Estimated fix time: {analysis['effort']}"
+        )
+    if agent_name == "rewrite_agent":
+        rewrite = _stub_rewrite(prompt)
+        if structured:
+            return json.dumps(rewrite)
+        return (
+            f"❌ ORIGINAL (VIOLATION):\n{rewrite['original']}\n\n"
+            f"✅ COMPLIANT REWRITE:\n{rewrite['rewrite']}\n\n"
+            "📋 CHANGES MADE:\n" + "\n".join(f"- {change}" for change in rewrite["changes"])
+        )
+    if agent_name == "compliance_orchestrator":
+        return _stub_summary(prompt)
+    return "OK"
+
+
+def _stub_rules(prompt: str) -> List[Dict[str, str]]:
+    return [
+        {
+            "rule_id": f"POL-{number}",
+            "category": "Policy",
+            "requirement": requirement.strip(),
+            "severity": "HIGH",
+            "constraints": "",
+        }
+        for number, requirement in re.findall(r"^\s*(\d+\.\d+)\s+(.+)$", prompt, re.MULTILINE)
+    ]
+
+
+def _scan_hits(text: str) -> List[Dict[str, str]]:
+    return [
+        {**hit, "rule": STUB_POLICY_REFS.get(hit["type"], "POL-1.1")}
+        for hit in prescan_document(text)
+    ]
+
+
+def _document_section(prompt: str) -> str:
+    """Only scan the DOCUMENT part of a prompt, never the policy text."""
+    match = re.search(r"^DOCUMENT:\s*$(.*)", prompt, re.MULTILINE | re.DOTALL)
+    return match.group(1) if match else prompt
+
+
+def _stub_scan(prompt: str) -> List[Dict[str, str]]:
+    return [
+        {
+            "rule_id": hit["rule"],
+            "quote": hit["quote"],
+            "location": f"line {hit['line']}",
+            "explanation": hit["description"],
+        }
+        for hit in _scan_hits(_document_section(prompt))
+    ]
+
+
+def _stub_analysis(prompt: str) -> Dict[str, str]:
+    violation = prompt.split("VIOLATION:", 1)[-1].lower()
+    severity = "MEDIUM"
+    for level, keywords in _SEVERITY_KEYWORDS:
+        if any(keyword in violation for keyword in keywords):
+            severity = level
+            break
+    return {
+        "severity": severity,
+        "justification": "Stub analysis generated offline.",
+        "risk": "Stub analysis generated offline.",
+        "remediation": "Apply the referenced policy requirement.",
+        "effort": "2 hours",
+    }
+
+
+def _stub_rewrite(prompt: str) -> Dict[str, Any]:
+    violation = prompt.split("VIOLATION:", 1)[-1].split("SEVERITY ANALYSIS:", 1)[0].strip()
+    quote = re.search(r'^Quote: "(.*)"$', violation, re.MULTILINE)
+    return {
+        "original": quote.group(1) if quote else violation,
+        "rewrite": "Stub rewrite generated offline.",
+        "changes": ["Applied the referenced policy requirement"],
+    }
+
+
+def _stub_summary(prompt: str) -> str:
+    hits = _scan_hits(_document_section(prompt))
+    counts = {level: 0 for level in ("CRITICAL", "HIGH", "MEDIUM", "LOW")}
+    for hit in hits:
+        counts[hit["severity"]] += 1
+    report = {"violations": [
+        {
+            "severity": hit["severity"],
+            "description": hit["description"],
+            "policy_ref": hit["rule"],
+            "quote": hit["quote"],
+            "remediation": "Apply the referenced policy requirement.",
+            "effort": "2 hours",
+            "rewrite": "Stub rewrite generated offline." if hit["severity"] in ("CRITICAL", "HIGH") else "",
+        }
+        for hit in hits
+    ]}
+    return "\n".join([
+        "📊 EXECUTIVE SUMMARY:",
+        f"- Total violations found: {len(hits)}",
+        f"🔴 CRITICAL: {counts['CRITICAL']}",
+        f"🟠 HIGH: {counts['HIGH']}",
+        f"🟡 MEDIUM: {counts['MEDIUM']}",
+        f"🟢 LOW: {counts['LOW']}",
+        "",
+        "```json",
+        json.dumps(report, indent=2),
+        "```",
+    ])
+
+
+def _last_user_text(llm_request: LlmRequest) -> str:
+    for content in reversed(llm_request.contents or []):
+        texts = [part.text for part in content.parts or [] if getattr(part, "text", None)]
+        if texts:
+            return "".join(texts)
+    return ""
+
+
+def _estimate_tokens(text: str) -> int:
+    # Rough 4 characters per token, good enough for offline benchmarking
+    return max(1, len(text) // 4)
@@ -1,30 +1,28 @@
 """Evaluation script for testing the compliance copilot on labeled data."""
 
+import argparse
 import json
 import asyncio
+import os
 import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
-
-from src.agents import (
-    create_orchestrator_agent,
-    create_policy_extractor_agent,
-    create_document_scanner_agent,
-    create_violation_analyzer_agent,
-    create_rewrite_agent,
-)
-from src.tools.response_parser import parse_compliance_response
+from src.pipeline import create_compliance_service
 from src.utils.config import get_retry_config, load_api_key
+from src.utils.metrics import format_metrics, get_metrics
+from src.utils.models import MODEL_BACKENDS, uses_remote_model
+from src.utils.policy_cache import PolicyRuleCache
+from src.utils.response_cache import DEFAULT_RESPONSE_CACHE_PATH, get_response_cache
 
 
 async def run_evaluation(
     policy_path: str,
     test_docs_dir: str,
-    gold_labels_path: str
+    gold_labels_path: str,
+    use_pipeline: bool = False,
+    policy_cache_path: Optional[str] = None,
+    max_concurrency: int = 4
 ) -> Dict[str, Any]:
     """
     Run evaluation on test dataset.
@@ -33,35 +31,32 @@ async def run_evaluation(
         policy_path: Path to policy document
         test_docs_dir: Directory containing test documents
         gold_labels_path: Path to gold labels JSON
+        use_pipeline: Evaluate the deterministic pipeline instead of the orchestrator
+        policy_cache_path: Extracted policy rule cache (pipeline mode only), so
+            the policy is extracted once and reused across documents and runs
+        max_concurrency: Maximum number of documents evaluated at once; each
+            document runs in its own session
         
     Returns:
-        Dictionary with evaluation results
+        Dictionary with evaluation results, including per-agent and
+        per-stage latency, token and retry instrumentation
     """
-    # Load API key
-    load_api_key()
-    
-    # Create agents
-    retry_config = get_retry_config()
-    
-    policy_extractor = create_policy_extractor_agent(retry_config)
-    document_scanner = create_document_scanner_agent(retry_config)
-    violation_analyzer = create_violation_analyzer_agent(retry_config)
-    rewrite_agent = create_rewrite_agent(retry_config)
-    
-    orchestrator = create_orchestrator_agent(
-        policy_extractor,
-        document_scanner,
-        violation_analyzer,
-        rewrite_agent,
-        retry_config
-    )
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    
+    # Instrument this evaluation only
+    get_metrics().reset()
     
-    # Setup runner
-    session_service = InMemorySessionService()
-    runner = Runner(
-        agent=orchestrator,
-        app_name="ComplianceEval",
-        session_service=session_service
+    # Load API key (not needed for the offline stub backend)
+    if uses_remote_model():
+        load_api_key()
+    
+    # Agents, runners and model clients are built once and shared by all documents
+    policy_cache = PolicyRuleCache(policy_cache_path) if policy_cache_path else None
+    service = create_compliance_service(
+        get_retry_config(),
+        policy_cache=policy_cache,
+        app_name="ComplianceEval"
     )
     
     # Load policy
@@ -79,6 +74,24 @@ async def run_evaluation(
         with open(doc_file, 'r') as f:
             test_documents[doc_file.name] = f.read()
     
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def evaluate_document(doc_name: str, doc_text: str):
+        """Run one document in its own session and time it."""
+        async with semaphore:
+            print(f"Evaluating: {doc_name}")
+            start_time = time.time()
+            
+            # The policy is extracted once and shared by concurrent documents
+            parsed = await service.check(
+                policy_text,
+                doc_text,
+                mode="pipeline" if use_pipeline else "orchestrator",
+                user_id="eval"
+            )
+            
+            return parsed, time.time() - start_time
+    
     # Run evaluation
     results = {
         "true_positives": 0,
@@ -89,48 +102,21 @@ async def run_evaluation(
         "per_document": {}
     }
     
-    for doc_name, doc_text in test_documents.items():
-        print(f"Evaluating: {doc_name}")
-        
+    doc_names = sorted(test_documents)
+    wall_start = time.time()
+    try:
+        outcomes = await asyncio.gather(
+            *(evaluate_document(name, test_documents[name]) for name in doc_names)
+        )
+    finally:
+        await service.aclose()
+    wall_time = time.time() - wall_start
+    
+    for doc_name, (parsed, elapsed) in zip(doc_names, outcomes):
         expected = gold_labels.get(doc_name, {})
         expected_count = expected.get("total_violations", 0)
         
-        # Run compliance check
-        start_time = time.time()
-        
-        query = f"""
-Scan this document for violations:
-
-POLICY:
-{policy_text}
-
-DOCUMENT:
-{doc_text}
-
-Provide summary with severity breakdown.
-        """
-        
-        query_content = types.Content(
-            role="user",
-            parts=[types.Part(text=query)]
-        )
-        
-        response_text = ""
-        async for event in runner.run_async(
-            user_id="eval",
-            session_id=f"eval_{doc_name}",
-            new_message=query_content
-        ):
-            if event.is_final_response() and event.content:
-                for part in event.content.parts:
-                    if hasattr(part, 'text'):
-                        response_text += part.text
-        
-        elapsed = time.time() - start_time
         results["processing_times"].append(elapsed)
-        
-        # Parse results
-        parsed = parse_compliance_response(response_text)
         actual_count = parsed["total_violations"]
         
         # Calculate metrics
@@ -159,6 +145,8 @@ Provide summary with severity breakdown.
     fp = results["false_positives"]
     fn = results["false_negatives"]
     
+    serial_time = sum(results["processing_times"])
+    
     precision = tp / (tp + fp) if (tp + fp) > 0 else 0
     recall = tp / (tp + fn) if (tp + fn) > 0 else 0
     f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
@@ -167,18 +155,46 @@ Provide summary with severity breakdown.
         "precision": precision,
         "recall": recall,
         "f1_score": f1_score,
-        "avg_time": sum(results["processing_times"]) / len(results["processing_times"])
+        "avg_time": serial_time / len(results["processing_times"]),
+        "wall_time": wall_time,
+        "speedup": serial_time / wall_time if wall_time > 0 else 1.0
     }
+    results["instrumentation"] = get_metrics().snapshot()
     
     return results
 
 
 def main():
     """Run evaluation from command line."""
+    parser = argparse.ArgumentParser(description="Evaluate against gold labels")
+    parser.add_argument("--policy", default="demo_data/acme_corporation_company_policy.txt",
+                       help="Path to policy document")
+    parser.add_argument("--concurrency", type=int, default=4,
+                       help="Documents evaluated concurrently (default: 4)")
+    parser.add_argument("--pipeline", action="store_true",
+                       help="Evaluate the deterministic pipeline instead of the orchestrator agent")
+    parser.add_argument("--response-cache", nargs="?", const=DEFAULT_RESPONSE_CACHE_PATH,
+                       help="Answer identical model calls from a local cache "
+                            f"(default path: {DEFAULT_RESPONSE_CACHE_PATH}; $COMPLIANCE_RESPONSE_CACHE)")
+    parser.add_argument("--metrics-out",
+                       help="Write per-agent and per-stage metrics here "
+                            "(Prometheus text for a .prom file, JSON otherwise)")
+    parser.add_argument("--backend", choices=MODEL_BACKENDS,
+                       help="Model backend (default: $COMPLIANCE_MODEL_BACKEND or gemini)")
+    
+    args = parser.parse_args()
+    
+    if args.backend:
+        os.environ["COMPLIANCE_MODEL_BACKEND"] = args.backend
+    if args.response_cache:
+        os.environ["COMPLIANCE_RESPONSE_CACHE"] = args.response_cache
+    
     results = asyncio.run(run_evaluation(
-        policy_path="demo_data/sample_policy.txt",
+        policy_path=args.policy,
         test_docs_dir="demo_data/test_documents",
-        gold_labels_path="demo_data/gold_labels.json"
+        gold_labels_path="demo_data/gold_labels.json",
+        use_pipeline=args.pipeline,
+        max_concurrency=args.concurrency
     ))
     
     print("\n" + "="*70)
@@ -188,6 +204,16 @@ def main():
     print(f"Recall: {results['metrics']['recall']:.2%}")
     print(f"F1 Score: {results['metrics']['f1_score']:.3f}")
     print(f"Avg Time: {results['metrics']['avg_time']/60:.2f} min/doc")
+    print(f"Wall Time: {results['metrics']['wall_time']/60:.2f} min "
+          f"(speedup {results['metrics']['speedup']:.1f}x vs serial)")
+    cache = get_response_cache()
+    if cache is not None:
+        print(f"Response cache: {cache.hits} hits, {cache.misses} misses")
+    print("\nInstrumentation:")
+    print(format_metrics(results["instrumentation"]))
+    if args.metrics_out:
+        get_metrics().write(args.metrics_out)
+        print(f"Metrics written to {args.metrics_out}")
     print("\nPer-Document Results:")
     for doc, res in results['per_document'].items():
         print(f"  {doc}: Expected {res['expected']}, Found {res['actual']}")
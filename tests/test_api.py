@@ -0,0 +1,100 @@
+"""Unit tests for the HTTP service mode."""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import create_app
+from src.pipeline import create_compliance_service
+from src.utils.config import get_retry_config
+
+DEMO_DATA = Path(__file__).parent.parent / "demo_data"
+POLICY = (DEMO_DATA / "acme_corporation_company_policy.txt").read_text()
+DOCUMENT = (DEMO_DATA / "test_documents" / "doc_001_critical.txt").read_text()
+
+
+def client(monkeypatch, latency="0", **kwargs):
+    """Test client for an app served by the stub backend."""
+    monkeypatch.setenv("COMPLIANCE_STUB_LATENCY", latency)
+    app = create_app(lambda: create_compliance_service(get_retry_config(), backend="stub"), **kwargs)
+    return TestClient(app)
+
+
+def wait_for(http, job_id, timeout=10.0):
+    """Poll a check until it finishes."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = http.get(f"/checks/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.02)
+    raise TimeoutError(job_id)
+
+
+class TestHttpService:
+    """Tests for the queued HTTP service."""
+
+    def test_check_completes_with_results(self, monkeypatch):
+        """Test that a submitted check is queued, run and reported."""
+        with client(monkeypatch) as http:
+            response = http.post("/checks", json={"policy_text": POLICY, "document_text": DOCUMENT})
+            assert response.status_code == 202
+
+            job = wait_for(http, response.json()["id"])
+
+        assert job["status"] == "completed"
+        assert job["result"]["severity_counts"]["CRITICAL"] > 0
+
+    def test_events_stream_each_stage(self, monkeypatch):
+        """Test that the event stream reports every pipeline stage until completion."""
+        with client(monkeypatch) as http:
+            job_id = http.post("/checks", json={"policy_text": POLICY, "document_text": DOCUMENT}).json()["id"]
+            with http.stream("GET", f"/checks/{job_id}/events") as response:
+                events = [json.loads(line[len("data: "):]) for line in response.iter_lines()
+                          if line.startswith("data: ")]
+
+        names = [event["event"] for event in events]
+        assert names[:4] == ["queued", "started", "rules", "scan"]
+        assert "analysis" in names and "rewrite" in names
+        assert names[-1] == "completed"
+        assert names.count("analysis") == events[-1]["total_violations"]
+
+    def test_gate_mode(self, monkeypatch):
+        """Test that a gate check completes with its verdict and triggering evidence."""
+        with client(monkeypatch) as http:
+            body = {"policy_text": POLICY, "document_text": DOCUMENT, "mode": "gate", "threshold": "HIGH"}
+            job = wait_for(http, http.post("/checks", json=body).json()["id"])
+            events = list(http.app.state.queue.get(job["id"]).events)
+
+        assert job["result"]["status"] == "FAIL"
+        assert job["result"]["evidence"]["severity"] in ("CRITICAL", "HIGH")
+        assert events[-1]["status"] == "FAIL"
+
+    def test_saturated_queue_returns_429(self, monkeypatch):
+        """Test that submissions beyond the queue bound are rejected with Retry-After."""
+        with client(monkeypatch, latency="0.2", workers=1, max_queued=1) as http:
+            body = {"policy_text": POLICY, "document_text": DOCUMENT}
+            statuses = [http.post("/checks", json=body) for _ in range(4)]
+
+            rejected = [r for r in statuses if r.status_code == 429]
+            assert rejected
+            assert int(rejected[0].headers["Retry-After"]) >= 1
+            assert http.get("/health").json()["rejected"] == len(rejected)
+
+    def test_invalid_requests(self, monkeypatch):
+        """Test unknown modes and unknown checks."""
+        with client(monkeypatch) as http:
+            response = http.post("/checks", json={"policy_text": POLICY, "document_text": DOCUMENT,
+                                                  "mode": "unknown"})
+            assert response.status_code == 422
+            response = http.post("/checks", json={"policy_text": POLICY, "document_text": DOCUMENT,
+                                                  "mode": "gate", "threshold": "SEVERE"})
+            assert response.status_code == 422
+            assert http.get("/checks/missing").status_code == 404
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,186 @@
+"""Unit tests for the exporters."""
+
+import csv
+import json
+
+import pytest
+
+from src.exporter.exporter import export_all, export_to_html
+from src.exporter.pdf_generator import export_to_pdf
+from src.exporter.report import build_report
+from src.exporter.streaming import (
+    document_label,
+    iter_batch_records,
+    iter_violation_records,
+    stream_to_csv,
+    stream_to_jsonl,
+)
+
+
+@pytest.fixture
+def results():
+    """Fixture for a pipeline-style results dictionary."""
+    return {
+        "violations": {
+            "CRITICAL": [{"description": "Hardcoded API key", "policy_ref": "SEC-3.3",
+                          "quote": "sk_live_abc", "remediation": "Use a vault", "effort": "1 hour"}],
+            "HIGH": [{"description": "Missing MFA", "policy_ref": "SEC-3.2"}],
+            "MEDIUM": [],
+            "LOW": [],
+        },
+        "total_violations": 2,
+    }
+
+
+class TestStreamingExport:
+    """Tests for streaming JSON Lines and CSV export."""
+    
+    def test_violation_records(self, results):
+        """Test that results flatten to records numbered per document."""
+        records = list(iter_violation_records(results, "docs/spec.txt"))
+        
+        assert [r["id"] for r in records] == [f"{document_label('docs/spec.txt')}-V{n}" for n in ("001", "002")]
+        assert document_label("docs/spec.txt").startswith("spec-")
+        assert records[0]["quote"] == "sk_live_abc"
+        assert records[1]["remediation"] == ""
+    
+    def test_jsonl_consumes_generator(self, tmp_path):
+        """Test that a generator is written record by record."""
+        records = ({"id": f"V{i}", "severity": "LOW"} for i in range(10000))
+        output = tmp_path / "out" / "violations.jsonl"
+        
+        count = stream_to_jsonl(records, output)
+        
+        assert count == 10000
+        lines = output.read_text().splitlines()
+        assert len(lines) == 10000
+        assert json.loads(lines[-1])["id"] == "V9999"
+    
+    def test_csv_append_writes_one_header(self, results, tmp_path):
+        """Test that appending keeps a single header row."""
+        output = tmp_path / "violations.csv"
+        
+        stream_to_csv(iter_violation_records(results, "a.txt"), output, append=True)
+        stream_to_csv(iter_violation_records(results, "b.txt"), output, append=True)
+        
+        rows = list(csv.reader(output.open()))
+        assert rows[0][0] == "ID"
+        a, b = document_label("a.txt"), document_label("b.txt")
+        assert [row[0] for row in rows[1:]] == [f"{a}-V001", f"{a}-V002", f"{b}-V001", f"{b}-V002"]
+    
+    def test_csv_overwrite(self, results, tmp_path):
+        """Test that a non-append export replaces the file."""
+        output = tmp_path / "violations.csv"
+        stream_to_csv(iter_violation_records(results), output)
+        
+        stream_to_csv(iter_violation_records(results), output)
+        
+        assert len(list(csv.reader(output.open()))) == 3
+    
+    def test_batch_records_skip_errors_and_partial_lines(self, results, tmp_path):
+        """Test reading a batch file that is still being written."""
+        batch = tmp_path / "batch.jsonl"
+        batch.write_text(
+            json.dumps({"document": "a.txt", "status": "success", **results}) + "\n"
+            + json.dumps({"document": "b.txt", "status": "error"}) + "\n"
+            + '{"document": "c.txt", "status": "succ'
+        )
+        
+        records = list(iter_batch_records(batch))
+        
+        assert [r["document"] for r in records] == ["a.txt", "a.txt"]
+
+
+class TestExportAll:
+    """Tests for the one-pass, concurrent export."""
+    
+    def test_build_report(self, results):
+        """Test that results are normalized once into counts and records."""
+        report = build_report(results)
+        
+        assert report["total_violations"] == 2
+        assert report["severity_counts"] == {"CRITICAL": 1, "HIGH": 1, "MEDIUM": 0, "LOW": 0}
+        assert [r["severity"] for r in report["records"]] == ["CRITICAL", "HIGH"]
+        assert report["results"] is results
+    
+    def test_export_all_formats(self, results, tmp_path):
+        """Test that every format is written, including the PDF from a worker process."""
+        paths = export_all(results, "report", tmp_path)
+        
+        assert set(paths) == {"json", "csv", "html", "pdf"}
+        assert all(path.stat().st_size > 0 for path in paths.values())
+        assert json.loads(paths["json"].read_text()) == results
+        assert "Hardcoded API key" in paths["html"].read_text()
+        assert paths["pdf"].read_bytes().startswith(b"%PDF")
+    
+    def test_csv_keeps_report_layout(self, tmp_path):
+        """Test that the report CSV keeps its original columns and numbering."""
+        results = {"violations": {
+            "HIGH": [{"description": "Missing MFA", "policy_ref": "SEC-3.2"}],
+            "CRITICAL": [{"description": "Hardcoded API key", "policy_ref": "SEC-3.3",
+                          "quote": "sk_live_abc", "remediation": "Use a vault"}],
+        }}
+        paths = export_all(results, "report", tmp_path, fmt="csv")
+
+        rows = list(csv.reader(paths["csv"].open()))
+        assert rows[0] == ["ID", "Severity", "Description", "Policy Reference", "Remediation"]
+        assert rows[1] == ["V001", "HIGH", "Missing MFA", "SEC-3.2", ""]
+        assert rows[2] == ["V002", "CRITICAL", "Hardcoded API key", "SEC-3.3", "Use a vault"]
+
+    def test_export_single_format(self, results, tmp_path):
+        """Test that a single format skips the others."""
+        paths = export_all(results, "report", tmp_path, fmt="csv")
+        
+        assert list(paths) == ["csv"]
+        assert len(list(tmp_path.iterdir())) == 1
+
+
+class TestHtmlExport:
+    """Tests for the escaping, paginated HTML report."""
+    
+    def test_agent_text_is_escaped(self, tmp_path):
+        """Test that markup and braces in agent text are rendered literally."""
+        results = {"violations": {"HIGH": [{"description": "<script>alert(1)</script> {x}"}]}}
+        
+        [page] = export_to_html(results, tmp_path / "report.html")
+        
+        html = page.read_text()
+        assert "<script>" not in html
+        assert "&lt;script&gt;alert(1)&lt;/script&gt; {x}" in html
+    
+    def test_pagination(self, tmp_path):
+        """Test that a large report is split into linked pages."""
+        results = {"violations": {"LOW": [{"description": f"Issue {i}"} for i in range(25)]}}
+        
+        pages = export_to_html(results, tmp_path / "report.html", page_size=10)
+        
+        assert [p.name for p in pages] == ["report.html", "report_page2.html", "report_page3.html"]
+        last = pages[2].read_text()
+        assert last.count('class="violation low"') == 5
+        assert '<a href="report.html">1</a>' in last
+    
+    def test_single_page_has_no_nav(self, results, tmp_path):
+        """Test that a report within one page has no page links."""
+        [page] = export_to_html(results, tmp_path / "report.html", page_size=10)
+        
+        assert "<nav" not in page.read_text()
+
+
+class TestPdfExport:
+    """Tests for the table-based, multi-volume PDF report."""
+    
+    def test_markup_in_agent_text(self, tmp_path):
+        """Test that ReportLab markup characters in descriptions do not break the build."""
+        results = {"violations": {"HIGH": [{"description": "Key <b> & <unclosed"}]}}
+        
+        [path] = export_to_pdf(results, tmp_path / "report.pdf")
+        
+        assert open(path, "rb").read().startswith(b"%PDF")
+    
+    def test_volumes(self, tmp_path):
+        """Test that a large report is split into volumes of bounded size."""
+        results = {"violations": {"LOW": [{"description": f"Issue {i}"} for i in range(25)]}}
+        
+        paths = export_to_pdf(results, tmp_path / "report.pdf", volume_size=10)
+        
+        assert [p.rsplit("/", 1)[-1] for p in paths] == ["report.pdf", "report_vol2.pdf", "report_vol3.pdf"]
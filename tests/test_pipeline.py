@@ -0,0 +1,866 @@
+"""Unit tests for the deterministic compliance pipeline."""
+
+import asyncio
+import json
+import re
+import threading
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from src.pipeline import (
+    CompliancePipeline,
+    ComplianceService,
+    PipelineCompleted,
+    RewriteGenerated,
+    ViolationAnalyzed,
+    collect_documents,
+    create_compliance_service,
+    format_report,
+    run_batch,
+)
+from src.exporter.streaming import document_label
+from src.utils.checkpoint_store import CheckpointStore
+from src.utils.config import get_retry_config
+from src.utils.policy_cache import PolicyRuleCache
+from src.utils.section_store import SectionFindingsStore
+
+
+SCAN_REPORT = """
+VIOLATION 1: API Key: sk_live_abc123 is hardcoded (violates SEC-3.3)
+VIOLATION 2: User emails are logged for debugging (violates SEC-2.3)
+"""
+
+RULES = """
+SEC-2.3: Customer PII must not be stored in logs.
+
+SEC-3.3: API keys must be stored in secret management.
+"""
+
+
+class ScriptedLlm(BaseLlm):
+    """Test model that answers every prompt via a callable and records prompts."""
+
+    model: str = "scripted"
+    reply: object = None
+    prompts: list = []
+    delay: float = 0.0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        prompt = llm_request.contents[-1].parts[0].text
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        yield LlmResponse(content=types.Content(
+            role="model",
+            parts=[types.Part(text=self.reply(prompt))]
+        ))
+
+
+def analyzer_reply(prompt):
+    """Hardcoded keys are CRITICAL, everything else MEDIUM."""
+    return "Severity: CRITICAL" if "sk_live" in prompt else "Severity: MEDIUM"
+
+
+@pytest.fixture
+def models():
+    """Fixture for one scripted model per specialist agent."""
+    return {
+        "policy_extractor": ScriptedLlm(reply=lambda p: RULES, prompts=[]),
+        "document_scanner": ScriptedLlm(reply=lambda p: SCAN_REPORT, prompts=[]),
+        "violation_analyzer": ScriptedLlm(reply=analyzer_reply, prompts=[]),
+        "rewrite_agent": ScriptedLlm(reply=lambda p: "✅ COMPLIANT REWRITE: use a secret manager", prompts=[]),
+    }
+
+
+def build_pipeline(models, **kwargs):
+    """Wire the scripted models into a CompliancePipeline."""
+    agents = [LlmAgent(name=name, model=model, instruction="") for name, model in models.items()]
+    return CompliancePipeline(*agents, **kwargs)
+
+
+@pytest.fixture
+def pipeline(models):
+    """Fixture for a pipeline wired to the scripted models."""
+    return build_pipeline(models)
+
+
+class TestCompliancePipeline:
+    """Tests for CompliancePipeline."""
+
+    def test_run_produces_results(self, pipeline):
+        """Test that a run returns exporter-compatible results."""
+        results = asyncio.run(pipeline.run("policy text", "document text"))
+
+        assert results["total_violations"] == 2
+        assert results["severity_counts"]["CRITICAL"] == 1
+        assert results["severity_counts"]["MEDIUM"] == 1
+        assert results["rewrites_generated"] == 1
+
+        critical = results["violations"]["CRITICAL"][0]
+        assert critical["policy_ref"] == "SEC-3.3"
+        assert "secret manager" in critical["rewrite"]
+        assert "rewrite" not in results["violations"]["MEDIUM"][0]
+
+    def test_model_call_count_is_fixed(self, pipeline, models):
+        """Test that a document costs 2 + violations + rewrites model calls."""
+        results = asyncio.run(pipeline.run("policy text", "document text"))
+
+        assert results["model_calls"] == 2 + 2 + 1
+        assert sum(len(m.prompts) for m in models.values()) == results["model_calls"]
+
+    def test_stage_outputs_feed_next_stage(self, pipeline, models):
+        """Test that each stage only receives the context it needs."""
+        asyncio.run(pipeline.run("policy text", "document text"))
+
+        scan_prompt = models["document_scanner"].prompts[0]
+        assert RULES.strip() in scan_prompt
+        assert "policy text" not in scan_prompt
+
+        # Analysis prompts carry only the referenced rule, not the whole rule set
+        for prompt in models["violation_analyzer"].prompts:
+            assert "document text" not in prompt
+            assert len(set(re.findall(r"SEC-\d\.\d", prompt))) == 1
+
+    def test_relevant_rule_matches_whole_id(self, models):
+        """Test that a finding citing SEC-1.1 is not given SEC-1.10 as well."""
+        models["policy_extractor"].reply = lambda p: (
+            "SEC-1.1: Passwords must be hashed.\n\nSEC-1.10: Sessions expire after 15 minutes."
+        )
+        models["document_scanner"].reply = lambda p: "VIOLATION 1: Passwords stored in clear (violates SEC-1.1)"
+
+        asyncio.run(build_pipeline(models).run("policy text", "document text"))
+
+        prompt = models["violation_analyzer"].prompts[0]
+        assert "SEC-1.1:" in prompt
+        assert "SEC-1.10" not in prompt
+
+    def test_finding_without_explanation(self, models):
+        """Test that a structured finding with an empty explanation is still analyzed."""
+        models["document_scanner"].reply = lambda p: json.dumps({"violations": [
+            {"rule_id": "SEC-3.3", "quote": "sk_live_abc123", "location": "line 1", "explanation": ""},
+        ]})
+
+        results = asyncio.run(build_pipeline(models).run("policy text", "document text"))
+
+        assert results["violations"]["CRITICAL"][0]["description"] == "sk_live_abc123"
+
+    def test_clean_document_skips_analysis(self, pipeline, models):
+        """Test that a clean scan ends the workflow after two calls."""
+        models["document_scanner"].reply = lambda p: "NO VIOLATIONS FOUND"
+
+        results = asyncio.run(pipeline.run("policy text", "document text"))
+
+        assert results["total_violations"] == 0
+        assert results["model_calls"] == 2
+        assert "PASS" in results["report"]
+
+
+class TestPolicyCache:
+    """Tests for reusing cached policy rules."""
+
+    def test_second_run_skips_extraction(self, models, tmp_path):
+        """Test that a cached policy is not sent to the extractor again."""
+        cache = PolicyRuleCache(tmp_path / "rules.db")
+        first = asyncio.run(build_pipeline(models, policy_cache=cache).run("policy text", "doc"))
+        second = asyncio.run(build_pipeline(models, policy_cache=cache).run("policy text", "doc"))
+
+        assert len(models["policy_extractor"].prompts) == 1
+        assert not first["policy_cache_hit"]
+        assert second["policy_cache_hit"]
+        assert second["model_calls"] == first["model_calls"] - 1
+        assert second["rules"] == first["rules"]
+
+    def test_changed_policy_misses(self, models, tmp_path):
+        """Test that editing the policy invalidates the cached rules."""
+        pipeline = build_pipeline(models, policy_cache=PolicyRuleCache(tmp_path / "rules.db"))
+        asyncio.run(pipeline.run("policy text", "doc"))
+        asyncio.run(pipeline.run("policy text, revised", "doc"))
+
+        assert len(models["policy_extractor"].prompts) == 2
+
+
+class TestCheckpoints:
+    """Tests for resuming interrupted runs from stage checkpoints."""
+
+    def test_interrupted_run_resumes_at_failed_stage(self, models, tmp_path):
+        """Test that a rerun only repeats the stage that did not complete."""
+        store = CheckpointStore(tmp_path / "checkpoints.db")
+
+        def exhausted(prompt):
+            raise RuntimeError("429 RESOURCE_EXHAUSTED")
+
+        working_rewrite = models["rewrite_agent"].reply
+        models["rewrite_agent"].reply = exhausted
+        with pytest.raises(RuntimeError):
+            asyncio.run(build_pipeline(models, checkpoint_store=store).run("policy text", "doc"))
+
+        models["rewrite_agent"].reply = working_rewrite
+        for model in models.values():
+            model.prompts.clear()
+        results = asyncio.run(
+            build_pipeline(models, checkpoint_store=store).run("policy text", "doc", resume=True)
+        )
+
+        # Rules come from the policy cache or a new extraction, never from checkpoints
+        assert {name: len(m.prompts) for name, m in models.items()} == {
+            "policy_extractor": 1, "document_scanner": 0, "violation_analyzer": 0, "rewrite_agent": 1,
+        }
+        assert results["model_calls"] == 2
+        assert results["resumed_stages"] == 3
+        assert results["rewrites_generated"] == 1
+        assert len(store) == 0
+
+    def test_fresh_run_ignores_checkpoints(self, models, tmp_path):
+        """Test that only a resumed run reads checkpoints, and a completed run removes them."""
+        store = CheckpointStore(tmp_path / "checkpoints.db")
+        pipeline = build_pipeline(models, checkpoint_store=store)
+        models["rewrite_agent"].reply = lambda p: 1 / 0
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(pipeline.run("policy text", "doc"))
+        assert len(store) == 3
+        models["rewrite_agent"].reply = lambda p: "✅ COMPLIANT REWRITE: use a secret manager"
+
+        results = asyncio.run(pipeline.run("policy text", "doc"))
+
+        assert results["resumed_stages"] == 0
+        assert results["model_calls"] == 2 + 2 + 1
+        assert len(store) == 0
+
+    def test_store_io_runs_off_the_event_loop(self, models, tmp_path):
+        """Test that checkpoint reads, writes and deletes never block the event loop thread."""
+        threads = []
+
+        class RecordingStore(CheckpointStore):
+            def get(self, *args):
+                threads.append(threading.get_ident())
+                return super().get(*args)
+
+            def put(self, *args):
+                threads.append(threading.get_ident())
+                super().put(*args)
+
+            def delete(self, *args):
+                threads.append(threading.get_ident())
+                super().delete(*args)
+
+        pipeline = build_pipeline(models, checkpoint_store=RecordingStore(tmp_path / "checkpoints.db"))
+        asyncio.run(pipeline.run("policy text", "doc"))
+        asyncio.run(pipeline.run("policy text", "doc", resume=True))
+
+        assert len(threads) > 0
+        assert threading.get_ident() not in threads
+
+    def test_edited_document_is_rescanned(self, models, tmp_path):
+        """Test that checkpoints are keyed by document content."""
+        pipeline = build_pipeline(models, checkpoint_store=CheckpointStore(tmp_path / "checkpoints.db"))
+        asyncio.run(pipeline.run("policy text", "doc"))
+        results = asyncio.run(pipeline.run("policy text", "doc, edited"))
+
+        assert len(models["document_scanner"].prompts) == 2
+        assert results["resumed_stages"] == 0
+
+
+class TestIncrementalScan:
+    """Tests for re-checking only changed sections."""
+
+    DOCUMENT = "DATABASE:\nUser emails are logged\n\nAPI:\nKey sk_live_abc123 in code\n\nACCESS:\nSSO only"
+
+    @pytest.fixture
+    def section_models(self, models):
+        """Scanner that reports one finding per offending section line."""
+        def scan(prompt):
+            section = prompt.split("DOCUMENT:", 1)[1]
+            found = [line for line in section.splitlines() if "sk_live" in line or "emails" in line]
+            if not found:
+                return "NO VIOLATIONS FOUND"
+            return "\n".join(f"VIOLATION {i}: {line}" for i, line in enumerate(found, 1))
+        models["document_scanner"].reply = scan
+        return models
+
+    def test_unchanged_document_makes_no_scan_calls(self, section_models, tmp_path):
+        """Test that a second scan of the same document reuses every section."""
+        store = SectionFindingsStore(tmp_path / "sections.db")
+        pipeline = build_pipeline(section_models)
+
+        first = asyncio.run(pipeline.run_incremental("policy", self.DOCUMENT, store, rules=RULES))
+        second = asyncio.run(pipeline.run_incremental("policy", self.DOCUMENT, store, rules=RULES))
+
+        assert first["sections_rescanned"] == 3
+        assert second["sections_rescanned"] == 0
+        assert second["model_calls"] == 0
+        assert second["severity_counts"] == first["severity_counts"]
+        assert len(section_models["document_scanner"].prompts) == 3
+
+    def test_only_changed_section_is_rescanned(self, section_models, tmp_path):
+        """Test that editing one section re-sends only that section downstream."""
+        store = SectionFindingsStore(tmp_path / "sections.db")
+        pipeline = build_pipeline(section_models)
+        asyncio.run(pipeline.run_incremental("policy", self.DOCUMENT, store, rules=RULES))
+        scans_before = len(section_models["document_scanner"].prompts)
+
+        edited = self.DOCUMENT.replace("SSO only", "SSO only\nDebug log of user emails")
+        results = asyncio.run(pipeline.run_incremental("policy", edited, store, rules=RULES))
+
+        assert results["sections_rescanned"] == 1
+        assert len(section_models["document_scanner"].prompts) == scans_before + 1
+        assert "Debug log" in section_models["document_scanner"].prompts[-1]
+        assert results["total_violations"] == 3
+        # Merged results keep document order: DATABASE, API, ACCESS
+        descriptions = [v["description"] for v in results["violations"]["MEDIUM"]]
+        assert descriptions == ["User emails are logged", "Debug log of user emails"]
+
+    def test_policy_change_invalidates_sections(self, section_models, tmp_path):
+        """Test that stored findings are not reused for a different policy."""
+        store = SectionFindingsStore(tmp_path / "sections.db")
+        pipeline = build_pipeline(section_models)
+        asyncio.run(pipeline.run_incremental("policy", self.DOCUMENT, store, rules=RULES))
+
+        results = asyncio.run(pipeline.run_incremental("policy v2", self.DOCUMENT, store, rules=RULES))
+
+        assert results["sections_rescanned"] == 3
+
+    def test_scan_settings_change_invalidates_sections(self, section_models, tmp_path):
+        """Test that findings stored under other pre-scan or chunk settings are not reused."""
+        store = SectionFindingsStore(tmp_path / "sections.db")
+        asyncio.run(build_pipeline(section_models).run_incremental("policy", self.DOCUMENT, store, rules=RULES))
+
+        for settings in ({"prescan": "merge"}, {"chunk_chars": 5000}):
+            pipeline = build_pipeline(section_models, **settings)
+            results = asyncio.run(pipeline.run_incremental("policy", self.DOCUMENT, store, rules=RULES))
+            assert results["sections_rescanned"] == 3
+
+
+class TestConcurrentFanOut:
+    """Tests for the per-violation concurrent fan-out."""
+
+    @pytest.fixture
+    def many_findings(self, models):
+        """Scanner reporting 8 findings, alternating CRITICAL and MEDIUM."""
+        report = "\n".join(
+            f"VIOLATION {i}: " + ("sk_live key" if i % 2 else "emails logged") + f" #{i}"
+            for i in range(1, 9)
+        )
+        models["document_scanner"].reply = lambda p: report
+        models["violation_analyzer"].delay = 0.05
+        return models
+
+    def test_concurrency_is_bounded(self, many_findings):
+        """Test that at most max_concurrency analysis calls run at once."""
+        pipeline = build_pipeline(many_findings, max_concurrency=3)
+
+        asyncio.run(pipeline.run("policy text", "document text"))
+
+        assert many_findings["violation_analyzer"].peak_in_flight == 3
+
+    def test_results_keep_scanner_order(self, many_findings):
+        """Test that gathered violations keep the order the scanner reported."""
+        pipeline = build_pipeline(many_findings, max_concurrency=8)
+
+        results = asyncio.run(pipeline.run("policy text", "document text"))
+
+        critical = [v["description"] for v in results["violations"]["CRITICAL"]]
+        assert critical == [f"sk_live key #{i}" for i in (1, 3, 5, 7)]
+        assert results["model_calls"] == 2 + 8 + 4
+
+    def test_invalid_concurrency(self, models):
+        """Test that a non-positive limit is rejected."""
+        with pytest.raises(ValueError):
+            build_pipeline(models, max_concurrency=0)
+
+
+class TestChunkedScan:
+    """Tests for scanning long documents as overlapping chunks."""
+
+    DOCUMENT = "\n\n".join(f"SECTION {i}\n" + "filler text " * 10 for i in range(6))
+
+    @pytest.fixture
+    def chunk_models(self, models):
+        """Scanner that reports the same boundary finding from every chunk."""
+        models["document_scanner"].reply = lambda p: (
+            'VIOLATION 1: API key hardcoded (violates SEC-3.3)\nQuote: "sk_live_abc123 in config"'
+        )
+        models["document_scanner"].delay = 0.05
+        return models
+
+    def test_chunks_scanned_concurrently(self, chunk_models):
+        """Test that every chunk is scanned, in parallel, and counted as a model call."""
+        pipeline = build_pipeline(chunk_models, chunk_chars=200, chunk_overlap=50)
+
+        results = asyncio.run(pipeline.run("policy", self.DOCUMENT, rules=RULES))
+
+        scans = len(chunk_models["document_scanner"].prompts)
+        assert scans > 1
+        assert chunk_models["document_scanner"].peak_in_flight > 1
+        assert results["model_calls"] == scans + 1 + 1
+
+    def test_overlapping_findings_deduplicated(self, chunk_models):
+        """Test that a finding reported by several chunks is analyzed once."""
+        pipeline = build_pipeline(chunk_models, chunk_chars=200, chunk_overlap=50)
+
+        results = asyncio.run(pipeline.run("policy", self.DOCUMENT, rules=RULES))
+
+        assert results["total_violations"] == 1
+        assert len(chunk_models["violation_analyzer"].prompts) == 1
+
+    def test_short_document_not_chunked(self, chunk_models):
+        """Test that documents under chunk_chars are scanned in one call."""
+        pipeline = build_pipeline(chunk_models, chunk_chars=10_000)
+
+        asyncio.run(pipeline.run("policy", self.DOCUMENT, rules=RULES))
+
+        assert len(chunk_models["document_scanner"].prompts) == 1
+
+
+class TestPrescan:
+    """Tests for combining the local pre-scan with the model scan."""
+
+    DOCUMENT = "API:\napi_key = sk_live_abcdef123456\nNotes: reviewed annually"
+
+    def test_merge_lists_hits_for_the_scanner_to_confirm(self, models):
+        """Test that local hits are scanner candidates and confirmed ones carry a policy rule."""
+        models["document_scanner"].reply = lambda p: (
+            'VIOLATION 1: API key in code (violates SEC-3.3)\nQuote: "api_key = sk_live_abcdef123456"\n'
+            'VIOLATION 2: Reviews not quarterly (violates SEC-3.1)\nQuote: "reviewed annually"'
+        )
+        pipeline = build_pipeline(models, prescan="merge")
+
+        results = asyncio.run(pipeline.run("policy", self.DOCUMENT, rules=RULES))
+
+        assert "CANDIDATES" in models["document_scanner"].prompts[0]
+        assert "api_key = sk_live_abcdef123456" in models["document_scanner"].prompts[0]
+        assert results["prescan_hits"] == 1
+        assert results["total_violations"] == 2
+        assert results["violations"]["CRITICAL"][0]["policy_ref"] == "SEC-3.3"
+
+    def test_merge_scanner_dismisses_hits(self, models):
+        """Test that a local hit the scanner does not confirm is not reported."""
+        models["document_scanner"].reply = lambda p: "NO VIOLATIONS FOUND"
+        pipeline = build_pipeline(models, prescan="merge")
+
+        results = asyncio.run(pipeline.run("policy", self.DOCUMENT, rules=RULES))
+
+        assert results["prescan_hits"] == 1
+        assert results["total_violations"] == 0
+        assert models["violation_analyzer"].prompts == []
+
+    def test_local_mode_skips_scanner(self, models):
+        """Test that local mode makes no scanner call."""
+        pipeline = build_pipeline(models, prescan="local")
+
+        results = asyncio.run(pipeline.run("policy", self.DOCUMENT, rules=RULES))
+
+        assert models["document_scanner"].prompts == []
+        assert results["total_violations"] == 1
+        assert results["model_calls"] == 2
+
+    def test_invalid_mode(self, models):
+        """Test that unknown pre-scan modes are rejected."""
+        with pytest.raises(ValueError):
+            build_pipeline(models, prescan="fast")
+
+
+class TestBatch:
+    """Tests for batch scanning."""
+
+    @pytest.fixture
+    def documents(self, tmp_path):
+        """Directory of five documents plus a non-matching file."""
+        docs_dir = tmp_path / "docs"
+        (docs_dir / "nested").mkdir(parents=True)
+        for i in range(4):
+            (docs_dir / f"doc_{i}.txt").write_text(f"document {i}")
+        (docs_dir / "nested" / "doc_4.txt").write_text("document 4")
+        (docs_dir / "notes.md").write_text("not scanned")
+        return docs_dir
+
+    def test_collect_documents(self, documents):
+        """Test resolving directories and globs to document files."""
+        assert len(collect_documents(str(documents))) == 5
+        assert len(collect_documents(str(documents / "*.txt"))) == 4
+        assert len(collect_documents(str(documents), pattern="*.md")) == 1
+
+    def test_run_batch_streams_results(self, models, documents, tmp_path):
+        """Test that every document gets one JSON line and the policy is extracted once."""
+        models["document_scanner"].delay = 0.02
+        output = tmp_path / "out" / "results.jsonl"
+        paths = collect_documents(str(documents))
+
+        summary = asyncio.run(run_batch(
+            build_pipeline(models), "policy text", paths, str(output), max_in_flight=3
+        ))
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert sorted(r["document"] for r in records) == [str(p) for p in paths]
+        assert all(r["status"] == "success" for r in records)
+        assert summary["documents"] == 5
+        assert summary["total_violations"] == 10
+        assert summary["severity_counts"]["CRITICAL"] == 5
+        assert len(models["policy_extractor"].prompts) == 1
+        assert models["document_scanner"].peak_in_flight == 3
+
+    def test_run_batch_records_errors(self, models, tmp_path):
+        """Test that an unreadable document is recorded without stopping the batch."""
+        good = tmp_path / "good.txt"
+        good.write_text("document")
+        output = tmp_path / "results.jsonl"
+
+        summary = asyncio.run(run_batch(
+            build_pipeline(models), "policy text", [tmp_path / "missing.txt", good], str(output)
+        ))
+
+        records = {r["document"]: r for r in map(json.loads, output.read_text().splitlines())}
+        assert records[str(tmp_path / "missing.txt")]["status"] == "error"
+        assert records[str(good)]["status"] == "success"
+        assert summary["errors"] == 1
+
+    def test_run_batch_appends_csv(self, models, documents, tmp_path):
+        """Test that violations are appended to the CSV export as documents finish."""
+        csv_path = tmp_path / "violations.csv"
+
+        asyncio.run(run_batch(
+            build_pipeline(models), "policy text", collect_documents(str(documents)),
+            str(tmp_path / "results.jsonl"), csv_path=str(csv_path)
+        ))
+
+        lines = csv_path.read_text().splitlines()
+        assert lines[0].startswith("ID,Document,Severity")
+        assert len(lines) == 1 + 10
+
+    def test_run_batch_renders_pdfs(self, models, documents, tmp_path):
+        """Test that one PDF per successful document is rendered in the process pool."""
+        pdf_dir = tmp_path / "pdf"
+
+        summary = asyncio.run(run_batch(
+            build_pipeline(models), "policy text", collect_documents(str(documents)),
+            str(tmp_path / "results.jsonl"), pdf_dir=str(pdf_dir), pdf_workers=2
+        ))
+
+        assert summary["pdf_reports"] == summary["documents"] - summary["errors"]
+        assert len(list(pdf_dir.glob("*.pdf"))) == summary["pdf_reports"]
+
+    def test_run_batch_same_file_names(self, models, documents, tmp_path):
+        """Test that documents sharing a file name in different directories keep separate outputs."""
+        (documents / "nested" / "doc_0.txt").write_text("nested document 0")
+        pdf_dir = tmp_path / "pdf"
+        csv_path = tmp_path / "violations.csv"
+
+        summary = asyncio.run(run_batch(
+            build_pipeline(models), "policy text", collect_documents(str(documents)),
+            str(tmp_path / "results.jsonl"), csv_path=str(csv_path), pdf_dir=str(pdf_dir), pdf_workers=2
+        ))
+
+        assert summary["pdf_reports"] == 6
+        assert len(list(pdf_dir.glob("doc_0-*.pdf"))) == 2
+        ids = [line.split(",")[0] for line in csv_path.read_text().splitlines()[1:]]
+        assert len(set(ids)) == len(ids)
+
+    def test_run_batch_counts_failed_pdf_renders(self, models, documents, tmp_path):
+        """Test that a report that fails to render is counted instead of failing the batch."""
+        pdf_dir = tmp_path / "pdf"
+        # A directory where the first report should go makes its render fail
+        (pdf_dir / f"{document_label(str(documents / 'doc_0.txt'))}.pdf").mkdir(parents=True)
+
+        summary = asyncio.run(run_batch(
+            build_pipeline(models), "policy text", collect_documents(str(documents)),
+            str(tmp_path / "results.jsonl"), pdf_dir=str(pdf_dir), pdf_workers=2
+        ))
+
+        assert summary["documents"] == 5
+        assert (summary["pdf_reports"], summary["pdf_errors"]) == (4, 1)
+        assert summary["pdf_error_messages"][0].startswith(str(documents / "doc_0.txt"))
+
+    def test_run_batch_resume(self, models, documents, tmp_path):
+        """Test that a resumed batch skips finished documents and repairs a torn last line."""
+        output = tmp_path / "results.jsonl"
+        paths = collect_documents(str(documents))
+        asyncio.run(run_batch(build_pipeline(models), "policy text", paths[:3], str(output)))
+        with open(output, "a") as f:
+            f.write('{"document": "torn')
+
+        summary = asyncio.run(run_batch(
+            build_pipeline(models), "policy text", paths, str(output), resume=True
+        ))
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert sorted(r["document"] for r in records) == [str(p) for p in paths]
+        assert summary["skipped"] == 3
+        assert summary["documents"] == 2
+
+
+ORCHESTRATOR_REPORT = """
+📊 EXECUTIVE SUMMARY:
+- Total violations found: 1
+- Severity breakdown: 1 CRITICAL, 0 HIGH, 0 MEDIUM, 0 LOW
+
+🔴 CRITICAL VIOLATIONS:
+- Hardcoded API key [SEC-3.3]
+"""
+
+
+class TestStreaming:
+    """Tests for streamed stage events."""
+
+    def collect(self, pipeline):
+        async def consume():
+            return [event async for event in pipeline.stream("policy text", "document text")]
+
+        return asyncio.run(consume())
+
+    def test_event_order_and_results(self, pipeline):
+        """Test that events follow the stages and end with the run's results."""
+        events = self.collect(pipeline)
+
+        names = [event.event for event in events]
+        assert names[:4] == ["rules", "scan", "violation", "violation"]
+        assert sorted(names[4:-1]) == ["analysis", "analysis", "rewrite"]
+        assert isinstance(events[-1], PipelineCompleted)
+        assert events[-1].results["total_violations"] == 2
+
+    def test_critical_analysis_precedes_slow_rewrite(self, models):
+        """Test that a CRITICAL finding is reported before its rewrite finishes."""
+        models["rewrite_agent"].delay = 0.2
+        events = self.collect(build_pipeline(models))
+
+        analyzed = next(i for i, e in enumerate(events)
+                        if isinstance(e, ViolationAnalyzed) and e.violation["severity"] == "CRITICAL")
+        rewritten = next(i for i, e in enumerate(events) if isinstance(e, RewriteGenerated))
+        assert analyzed < rewritten
+        assert "rewrite" not in events[analyzed].violation
+
+    def test_closing_stream_cancels_run(self, models):
+        """Test that abandoning the stream stops the remaining model calls."""
+        models["rewrite_agent"].delay = 0.2
+        pipeline = build_pipeline(models)
+
+        async def first_analysis():
+            stream = pipeline.stream("policy text", "document text")
+            async for event in stream:
+                if isinstance(event, ViolationAnalyzed):
+                    break
+            await stream.aclose()
+            return asyncio.all_tasks() - {asyncio.current_task()}
+
+        assert asyncio.run(first_analysis()) == set()
+        assert models["rewrite_agent"].prompts
+
+
+class TestGate:
+    """Tests for the early-exit severity gate."""
+
+    DOCUMENT = "API:\napi_key = sk_live_abcdef123456\nNotes: reviewed annually"
+
+    def test_fails_on_critical_without_rewrites(self, pipeline, models):
+        """Test that a CRITICAL violation fails the gate and skips rewrites and report."""
+        verdict = asyncio.run(pipeline.gate("policy text", "document text"))
+
+        assert verdict["status"] == "FAIL"
+        assert not verdict["passed"]
+        assert verdict["evidence"]["severity"] == "CRITICAL"
+        assert verdict["evidence"]["policy_ref"] == "SEC-3.3"
+        assert models["rewrite_agent"].prompts == []
+        assert "report" not in verdict
+
+    def test_passes_below_threshold(self, models):
+        """Test that violations below the threshold pass, and a lower threshold fails them."""
+        models["violation_analyzer"].reply = lambda p: "Severity: MEDIUM"
+        pipeline = build_pipeline(models)
+
+        verdict = asyncio.run(pipeline.gate("policy", "document", "HIGH", rules=RULES))
+        assert verdict["status"] == "PASS"
+        assert verdict["evidence"] is None
+        assert verdict["violations_analyzed"] == 2
+        assert verdict["model_calls"] == 1 + 2
+
+        verdict = asyncio.run(pipeline.gate("policy", "document", "MEDIUM", rules=RULES))
+        assert verdict["status"] == "FAIL"
+
+    def test_first_failure_cancels_remaining_analyses(self, models):
+        """Test that the gate stops analyzing once a failing violation is confirmed."""
+        models["document_scanner"].reply = lambda p: "\n".join(
+            f"VIOLATION {i}: " + ("sk_live key" if i == 1 else "emails logged") + f" #{i}"
+            for i in range(1, 9)
+        )
+        pipeline = build_pipeline(models, max_concurrency=1)
+
+        async def gate():
+            verdict = await pipeline.gate("policy", "document", rules=RULES)
+            return verdict, asyncio.all_tasks() - {asyncio.current_task()}
+
+        verdict, pending = asyncio.run(gate())
+
+        assert verdict["status"] == "FAIL"
+        assert verdict["findings"] == 8
+        assert verdict["violations_analyzed"] == 1
+        # At most the next analysis has started by the time the first one fails the gate
+        assert len(models["violation_analyzer"].prompts) <= 2
+        assert pending == set()
+
+    def test_prescan_hit_dismissed_by_scanner_passes(self, models):
+        """Test that in merge mode a local hit only fails the gate once the scanner confirms it."""
+        models["document_scanner"].reply = lambda p: "NO VIOLATIONS FOUND"
+        pipeline = build_pipeline(models, prescan="merge")
+
+        verdict = asyncio.run(pipeline.gate("policy", self.DOCUMENT, rules=RULES))
+
+        assert verdict["status"] == "PASS"
+        assert verdict["prescan_hits"] == 1
+        assert verdict["findings"] == 0
+        assert "api_key = sk_live_abcdef123456" in models["document_scanner"].prompts[0]
+        assert models["violation_analyzer"].prompts == []
+
+    def test_local_prescan_hits_are_analyzed(self, models):
+        """Test that in local mode the analyzer, not the pattern, decides a hit's severity."""
+        models["violation_analyzer"].reply = lambda p: "Severity: MEDIUM"
+        pipeline = build_pipeline(models, prescan="local")
+
+        verdict = asyncio.run(pipeline.gate("policy", self.DOCUMENT, rules=RULES))
+
+        assert verdict["status"] == "PASS"
+        assert verdict["violations_analyzed"] == 1
+        assert verdict["model_calls"] == 1
+        assert models["document_scanner"].prompts == []
+
+    def test_invalid_threshold(self, pipeline):
+        """Test that unknown severities are rejected."""
+        with pytest.raises(ValueError):
+            asyncio.run(pipeline.gate("policy", "document", "SEVERE"))
+
+
+class TestComplianceService:
+    """Tests for the long-lived compliance service."""
+
+    def build_service(self, models):
+        orchestrator = LlmAgent(
+            name="compliance_orchestrator",
+            model=ScriptedLlm(reply=lambda p: ORCHESTRATOR_REPORT, prompts=[]),
+            instruction=""
+        )
+        return ComplianceService(build_pipeline(models), orchestrator)
+
+    def test_concurrent_checks_share_one_extraction(self, models):
+        """Test that checks against one policy extract its rules once."""
+        service = self.build_service(models)
+
+        async def check_all():
+            return await asyncio.gather(*(
+                service.check("policy text", f"document {i}") for i in range(4)
+            ))
+
+        results = asyncio.run(check_all())
+
+        assert [r["total_violations"] for r in results] == [2] * 4
+        assert len(models["policy_extractor"].prompts) == 1
+        assert service.stats == {"checks": 4, "in_flight": 0, "rules_extracted": 1}
+
+    def test_extracted_rules_are_bounded(self, models):
+        """Test that only the most recently used policies keep their rules in memory."""
+        service = self.build_service(models)
+        service.max_policies = 2
+
+        async def check_all():
+            for policy in ["policy a", "policy b", "policy a", "policy c", "policy a", "policy b"]:
+                await service.check(policy, "document text")
+
+        asyncio.run(check_all())
+
+        assert len(service._rules) == 2
+        # "policy b" was evicted by "policy c" and extracted again
+        assert service.stats["rules_extracted"] == 4
+
+    def test_sessions_released_after_each_check(self, models):
+        """Test that the shared runners do not accumulate per-turn sessions."""
+        service = self.build_service(models)
+
+        asyncio.run(service.check("policy text", "document text"))
+        asyncio.run(service.check("policy text", "document text", mode="orchestrator"))
+
+        sessions = service.pipeline.session_service.sessions
+        assert sum(len(by_user) for app in sessions.values() for by_user in app.values()) == 0
+
+    def test_orchestrator_mode(self, models):
+        """Test that orchestrator mode parses the orchestrator's report."""
+        service = self.build_service(models)
+
+        results = asyncio.run(service.check("policy text", "document text", mode="orchestrator"))
+
+        assert results["severity_counts"]["CRITICAL"] == 1
+        assert "EXECUTIVE SUMMARY" in results["report"]
+        with pytest.raises(ValueError):
+            asyncio.run(service.check("policy text", "document text", mode="unknown"))
+
+    def test_gate_mode(self, models):
+        """Test that gate mode reuses the extracted rules and returns a verdict."""
+        service = self.build_service(models)
+
+        asyncio.run(service.check("policy text", "document text"))
+        verdict = asyncio.run(service.check("policy text", "document text", mode="gate", threshold="HIGH"))
+
+        assert verdict["status"] == "FAIL"
+        assert verdict["threshold"] == "HIGH"
+        assert len(models["policy_extractor"].prompts) == 1
+
+    def test_gemini_agents_share_one_client(self):
+        """Test that all agents wrap the same Gemini model, and so one API client."""
+        service = create_compliance_service(get_retry_config(), backend="gemini")
+
+        agents = [*service.pipeline.agents, service.orchestrator.agent]
+        assert all(agent.model.inner is service.shared_model for agent in agents)
+        assert len({agent.model.agent_name for agent in agents}) == 5
+
+    def test_aclose_closes_shared_client(self, monkeypatch):
+        """Test that aclose closes the API client the shared model opened on the running loop."""
+        monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+        service = create_compliance_service(get_retry_config(), backend="gemini")
+        closed = []
+
+        async def open_and_close():
+            client = service.shared_model.api_client
+
+            async def aclose():
+                closed.append(client)
+
+            monkeypatch.setattr(client.aio, "aclose", aclose)
+            async with service:
+                pass
+            return client
+
+        client = asyncio.run(open_and_close())
+
+        assert closed == [client]
+
+    def test_aclose_without_opened_client(self):
+        """Test that aclose does not build a client just to close it."""
+        service = create_compliance_service(get_retry_config(), backend="gemini")
+
+        asyncio.run(service.aclose())
+
+        assert "_per_loop_api_client" not in service.shared_model.__dict__
+
+
+class TestFormatReport:
+    """Tests for local report compilation."""
+
+    def test_report_status(self):
+        """Test that any CRITICAL violation fails the report."""
+        results = {
+            "violations": {"CRITICAL": [{"description": "Hardcoded key", "policy_ref": "SEC-3.3"}]},
+            "total_violations": 1,
+            "severity_counts": {"CRITICAL": 1, "HIGH": 0, "MEDIUM": 0, "LOW": 0},
+        }
+
+        report = format_report(results)
+
+        assert "Overall compliance status: FAIL" in report
+        assert "Hardcoded key [SEC-3.3]" in report
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
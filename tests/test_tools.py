@@ -2,10 +2,33 @@
 
 import pytest
 import io
+import json
+import time
 from pathlib import Path
 
-from src.tools.pdf_ingestion import extract_text_from_pdf, parse_policy_structure
-from src.tools.response_parser import parse_compliance_response, extract_violation_details
+from src.tools.pdf_ingestion import (
+    extract_text_from_pdf,
+    iter_pdf_pages,
+    count_pdf_pages,
+    parse_policy_structure,
+)
+from src.tools.prescan import prescan_document, prescan_finding
+from src.tools.document_sections import split_sections, section_fingerprint, chunk_document
+from src.tools.response_parser import (
+    parse_compliance_response,
+    extract_violation_details,
+    tokenize_report,
+    split_scanner_findings,
+    extract_severity,
+    extract_rule_id,
+    deduplicate_findings,
+    finding_summary,
+    finding_from_text,
+    parse_structured,
+    parse_scan_response,
+    parse_analysis_response,
+)
+from src.tools.schemas import ViolationAnalysis
 
 
 class TestPDFIngestion:
@@ -36,6 +59,43 @@ class TestPDFIngestion:
         assert result["status"] == "success"
         assert result["total_sections"] == 0
 
+    
+    @pytest.fixture
+    def policy_pdf(self):
+        """Fixture for the demo policy PDF."""
+        return Path(__file__).parent.parent / "demo_data" / "acme_corporation_company_policy.pdf"
+    
+    def test_extract_text_from_pdf_path_matches_bytes(self, policy_pdf):
+        """Test that memory-mapped path extraction matches bytes extraction."""
+        from_bytes = extract_text_from_pdf(policy_pdf.read_bytes())
+        from_path = extract_text_from_pdf(str(policy_pdf))
+        
+        assert from_path["status"] == "success"
+        assert from_path["text"] == from_bytes["text"]
+        assert from_path["page_count"] == from_bytes["page_count"]
+        assert "ACME CORPORATION" in from_path["text"]
+    
+    def test_extract_text_from_pdf_process_pool(self, policy_pdf):
+        """Test that page-parallel extraction keeps page order."""
+        serial = extract_text_from_pdf(policy_pdf)
+        parallel = extract_text_from_pdf(policy_pdf, workers=2, pages_per_task=1)
+        
+        assert parallel["status"] == "success"
+        assert parallel["text"] == serial["text"]
+    
+    def test_iter_pdf_pages_is_lazy(self, policy_pdf):
+        """Test that pages are yielded one at a time and can be ranged."""
+        pages = iter_pdf_pages(policy_pdf)
+        
+        assert "ACME CORPORATION" in next(pages)
+        assert len(list(iter_pdf_pages(policy_pdf, start=1))) == count_pdf_pages(policy_pdf) - 1
+    
+    def test_extract_text_from_pdf_missing_file(self, tmp_path):
+        """Test that a missing file reports an error status."""
+        result = extract_text_from_pdf(tmp_path / "missing.pdf")
+        
+        assert result["status"] == "error"
+
 
 class TestResponseParser:
     """Tests for response parser."""
@@ -115,6 +175,305 @@ class TestResponseParser:
         assert any(v["severity"] == "HIGH" for v in violations)
         assert any(v["severity"] == "MEDIUM" for v in violations)
 
+    def test_tokenize_report_single_pass(self):
+        """Test that counts, rewrites and blocks come from one tokenization."""
+        response_text = """
+        - Severity breakdown: 2 CRITICAL, 1 HIGH, 0 MEDIUM, 0 LOW
+        CRITICAL: Hardcoded password in config.py line 42
+        ✅ COMPLIANT REWRITE: read it from the vault
+        CRITICAL: API key in source
+        HIGH: Missing MFA for admin panel
+        """
+        
+        tokens = tokenize_report(response_text)
+        
+        assert tokens["severity_counts"] == {"CRITICAL": 2, "HIGH": 1, "MEDIUM": 0, "LOW": 0}
+        assert tokens["rewrites"] == 1
+        assert [severity for severity, _ in tokens["violation_blocks"]] == ["CRITICAL", "CRITICAL", "HIGH"]
+        assert tokens["violation_blocks"][0][1].startswith("Hardcoded password in config.py line 42")
+    
+    def test_tokenize_large_report(self):
+        """Test that a report with thousands of blocks is fully tokenized."""
+        response_text = "\n".join(f"HIGH: issue {i} with no further detail" for i in range(5000))
+        
+        tokens = tokenize_report(response_text)
+        
+        assert len(tokens["violation_blocks"]) == 5000
+        assert tokens["violation_blocks"][-1] == ("HIGH", "issue 4999 with no further detail")
+    
+    def test_split_scanner_findings(self):
+        """Test splitting a scanner report into findings."""
+        scan_text = """
+        Here are the findings:
+        VIOLATION 1: Hardcoded API key sk_live_abc123 (violates SEC-3.3)
+        Found in Implementation section.
+        VIOLATION 2: PII written to logs (violates SEC-2.3)
+        """
+        
+        findings = split_scanner_findings(scan_text)
+        
+        assert len(findings) == 2
+        assert findings[0].startswith("Hardcoded API key")
+        assert "Implementation section" in findings[0]
+        assert findings[1].startswith("PII written to logs")
+    
+    def test_split_scanner_findings_clean(self):
+        """Test that a clean scan yields no findings."""
+        assert split_scanner_findings("NO VIOLATIONS FOUND") == []
+    
+    def test_extract_severity(self):
+        """Test extracting the analyzer's severity score."""
+        assert extract_severity("Severity: CRITICAL\nHardcoded key") == "CRITICAL"
+        assert extract_severity("**Severity Score:** high - missing MFA") == "HIGH"
+        assert extract_severity("No level given", default="LOW") == "LOW"
+    
+    def test_extract_rule_id(self):
+        """Test extracting policy rule references."""
+        assert extract_rule_id("Violates SEC-1.1 encryption rule") == "SEC-1.1"
+        assert extract_rule_id("Breaks policy section 2.4") == "2.4"
+        assert extract_rule_id("No reference") == ""
+
+
+class TestStructuredOutput:
+    """Tests for parsing schema-validated agent output."""
+    
+    def test_scan_response_json(self):
+        """Test that structured scanner output becomes finding dictionaries."""
+        scan_text = json.dumps({"violations": [{
+            "rule_id": "SEC-3.3",
+            "quote": "API Key: sk_live_abc",
+            "location": "line 12",
+            "explanation": "Hardcoded API key"
+        }]})
+        
+        findings = parse_scan_response(scan_text)
+        
+        assert findings == [{
+            "rule_id": "SEC-3.3",
+            "quote": "API Key: sk_live_abc",
+            "location": "line 12",
+            "explanation": "Hardcoded API key"
+        }]
+        assert parse_scan_response('{"violations": []}') == []
+    
+    def test_scan_response_prose_fallback(self):
+        """Test that prose scanner output is still split into findings."""
+        findings = parse_scan_response('VIOLATION 1: Key in code (violates SEC-3.3)\nQuote: "sk_live_abc123"')
+        
+        assert findings[0]["rule_id"] == "SEC-3.3"
+        assert findings[0]["quote"] == "sk_live_abc123"
+    
+    def test_analysis_response(self):
+        """Test structured and prose analyzer output."""
+        structured = parse_analysis_response(
+            '```json\n{"severity": "HIGH", "justification": "j", "risk": "r", '
+            '"remediation": "Enable MFA", "effort": "4 hours"}\n```'
+        )
+        prose = parse_analysis_response("Severity: CRITICAL\nEstimated fix time: 2 hours")
+        
+        assert structured["severity"] == "HIGH"
+        assert structured["effort"] == "4 hours"
+        assert prose["severity"] == "CRITICAL"
+        assert prose["effort"] == "2 hours"
+    
+    def test_invalid_structure_returns_none(self):
+        """Test that output failing the schema is rejected, not half-parsed."""
+        assert parse_structured('{"severity": "SEVERE"}', ViolationAnalysis) is None
+        assert parse_structured("no json here", ViolationAnalysis) is None
+    
+    def test_structured_compliance_report(self):
+        """Test that the orchestrator's JSON report yields real violations."""
+        report = json.dumps({"violations": [{
+            "severity": "CRITICAL",
+            "description": "Hardcoded API key",
+            "policy_ref": "SEC-3.3",
+            "quote": "sk_live_abc",
+            "remediation": "Use a secret manager",
+            "effort": "1 hour",
+            "rewrite": "Load the key from the vault"
+        }]})
+        
+        result = parse_compliance_response(f"📊 EXECUTIVE SUMMARY: 1 CRITICAL\n```json\n{report}\n```")
+        
+        assert result["total_violations"] == 1
+        assert result["rewrites_generated"] == 1
+        assert result["violations"]["CRITICAL"][0]["description"] == "Hardcoded API key"
+
+
+class TestDocumentSections:
+    """Tests for section splitting and fingerprinting."""
+    
+    def test_split_on_headings(self):
+        """Test that all-caps and Markdown headings start new sections."""
+        document = """FEATURE: Payment Processing
+
+DATABASE:
+Payment data stored unencrypted
+
+## API
+Stripe key in source code"""
+        
+        sections = split_sections(document)
+        
+        assert len(sections) == 3
+        assert sections[1].startswith("DATABASE:")
+        assert sections[2].startswith("## API")
+    
+    def test_code_blocks_are_not_split(self):
+        """Test that heading-like lines inside code fences stay in their section."""
+        document = """DATABASE:
+```
+CONFIG:
+password = "secret"
+```
+ACCESS:
+No MFA"""
+        
+        sections = split_sections(document)
+        
+        assert len(sections) == 2
+        assert 'password = "secret"' in sections[0]
+    
+    def test_fingerprint_ignores_whitespace(self):
+        """Test that reflowing a section keeps its fingerprint."""
+        assert section_fingerprint("API:\n  key  in code") == section_fingerprint("API: key in code")
+        assert section_fingerprint("API: key in code") != section_fingerprint("API: key in vault")
+    
+    def test_chunks_respect_size_and_overlap(self):
+        """Test that chunks follow headings, stay within max_chars and repeat trailing context."""
+        document = "\n\n".join(f"SECTION {i}\n" + "x" * 80 for i in range(10))
+        
+        chunks = chunk_document(document, max_chars=300, overlap_chars=100)
+        
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 300 for chunk in chunks)
+        assert chunks[0].startswith("SECTION 0")
+        for previous, chunk in zip(chunks, chunks[1:]):
+            assert previous.endswith(chunk.split("\n\n")[0])
+        assert "SECTION 9" in chunks[-1]
+    
+    def test_overlap_counts_towards_max_chars(self):
+        """Test that the overlap is shortened rather than pushing a chunk past max_chars."""
+        document = "\n\n".join(f"SECTION {i}\n" + "\n".join(["y" * 50] * 10) for i in range(6))
+
+        chunks = chunk_document(document, max_chars=600, overlap_chars=200)
+
+        assert len(chunks) > 1
+        assert max(len(chunk) for chunk in chunks) <= 600
+        assert "SECTION 5" in chunks[-1]
+
+    def test_short_document_is_one_chunk(self):
+        """Test that a document within max_chars is returned unchanged."""
+        assert chunk_document("API:\nkey in code", max_chars=100) == ["API:\nkey in code"]
+        with pytest.raises(ValueError):
+            chunk_document("text", max_chars=0)
+
+
+class TestFindingDeduplication:
+    """Tests for dropping findings reported twice by overlapping chunks."""
+    
+    def test_duplicates_across_chunks(self):
+        """Test that the same quote and rule reported twice is kept once."""
+        findings = [
+            finding_from_text('Hardcoded key (violates SEC-3.3)\nQuote: "api_key = sk_live_abc123"'),
+            finding_from_text('Emails logged (violates SEC-2.3)'),
+            finding_from_text('Hardcoded API key (violates SEC-3.3)\nQuote: "API_KEY = sk_live_abc123"'),
+        ]
+        
+        unique = deduplicate_findings(findings)
+        
+        assert unique == findings[:2]
+    
+    def test_same_quote_different_rule_is_kept(self):
+        """Test that one line violating two rules yields two findings."""
+        findings = [
+            finding_from_text('Key in code (violates SEC-3.3)\nQuote: "api_key = sk_live_abc123"'),
+            finding_from_text('Key logged (violates SEC-2.3)\nQuote: "api_key = sk_live_abc123"'),
+        ]
+        
+        assert deduplicate_findings(findings) == findings
+
+    def test_summary_of_finding_without_explanation(self):
+        """Test that an empty explanation falls back to the quote, then the rule ID."""
+        finding = {"rule_id": "SEC-3.3", "quote": "api_key = sk_live_abc123", "location": "", "explanation": ""}
+
+        assert finding_summary({**finding, "explanation": "Key in code\nMore detail"}) == "Key in code"
+        assert finding_summary(finding) == "api_key = sk_live_abc123"
+        assert finding_summary({**finding, "quote": ""}) == "SEC-3.3"
+
+
+class TestPrescan:
+    """Tests for the local pattern pre-scanner."""
+    
+    def test_gold_violations_detected(self):
+        """Test that the pattern-detectable gold violations of doc_001 are all found."""
+        document = Path("demo_data/test_documents/doc_001_critical.txt").read_text()
+        
+        hits = prescan_document(document)
+        
+        assert [hit["type"] for hit in hits] == [
+            "hardcoded_credential", "sql_injection", "unencrypted_pii", "hardcoded_credential"
+        ]
+        assert all(hit["severity"] == "CRITICAL" for hit in hits)
+        assert hits[0]["line"] == 4
+    
+    def test_clean_document_has_no_hits(self):
+        """Test that compliant statements such as 'No PII in logs' are not flagged."""
+        document = Path("demo_data/test_documents/doc_005_clean.txt").read_text()
+        
+        assert prescan_document(document) == []
+    
+    def test_negated_and_prose_statements_have_no_hits(self):
+        """Test that statements of the policy, rather than violations of it, are not flagged."""
+        compliant = [
+            "Nothing is stored unencrypted.",
+            "Customer data must never be stored in plaintext",
+            "Password: must be rotated every 90 days",
+            "Do not keep logs indefinitely",
+            "We do not log emails or phone numbers",
+            "- Unencrypted customer PII or financial data",
+        ]
+
+        for line in compliant:
+            assert prescan_document(line) == [], line
+
+    def test_scan_time_is_linear_in_document_size(self):
+        """Test that negation checks do not rescan the document from the start for every hit."""
+        line = "Session data stored unencrypted in the cache. Logs are never kept indefinitely.\n"
+
+        def scan_time(lines):
+            document = line * lines
+            timings = []
+            for _ in range(3):
+                start_time = time.perf_counter()
+                prescan_document(document)
+                timings.append(time.perf_counter() - start_time)
+            return min(timings)
+
+        # Four times the text should take about four times as long, not sixteen
+        assert scan_time(4000) < 8 * scan_time(1000)
+
+    def test_violations_next_to_negated_clauses(self):
+        """Test that a negation only suppresses hits in its own clause."""
+        hits = prescan_document(
+            "Backups are not compressed. Data stored unencrypted in S3\n"
+            "Customer data stored in /tmp/no_backup.json (plaintext)\n"
+            "Records are never deleted\n"
+            "password: hunter22"
+        )
+
+        assert [hit["rule"] for hit in hits] == [
+            "plaintext_data", "plaintext_data", "indefinite_retention", "password"
+        ]
+
+    def test_one_hit_per_rule_per_line(self):
+        """Test that repeated matches on a line are reported once, with the full line quoted."""
+        hits = prescan_document('x = 1\npassword = "a1b2c3"; password: hunter22')
+        
+        assert len(hits) == 1
+        assert hits[0]["line"] == 2
+        assert prescan_finding(hits[0])["location"] == "line 2"
+
 
 class TestIntegration:
     """Integration tests for tools."""
@@ -0,0 +1,539 @@
+"""Unit tests for utilities."""
+
+import asyncio
+import json
+import time
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from src.utils.checkpoint_store import CheckpointStore, document_key
+from src.utils.config import get_retry_config
+from src.utils.metrics import InstrumentedLlm, MetricsRecorder
+from src.utils.models import create_model
+from src.utils import rate_limiter
+from src.utils.policy_cache import PolicyRuleCache, policy_cache_key
+from src.utils.rate_limiter import RateLimitedLlm, RateLimiter, retry_after_seconds
+from src.utils.response_cache import CachedLlm, ResponseCache, response_cache_key
+from src.utils.section_store import SectionFindingsStore
+from src.utils.stub_llm import StubLlm, load_replay_file
+
+
+class FakeClock:
+    """Wall clock for the SQLite stores that only moves when advanced."""
+
+    def __init__(self):
+        # Starts at the real time, so stores reopened with the default clock see fresh entries
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """Fixture for a manually advanced clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    """Fixture for a policy cache in a temporary directory."""
+    return PolicyRuleCache(tmp_path / "rules.db", max_entries=2, clock=clock)
+
+
+class TestPolicyRuleCache:
+    """Tests for the persistent policy rule cache."""
+    
+    def test_key_covers_policy_instruction_and_model(self):
+        """Test that changing any key component changes the key."""
+        key = policy_cache_key("policy", "instruction", "model")
+        
+        assert key == policy_cache_key("policy", "instruction", "model")
+        assert key != policy_cache_key("policy v2", "instruction", "model")
+        assert key != policy_cache_key("policy", "new instruction", "model")
+        assert key != policy_cache_key("policy", "instruction", "other-model")
+    
+    def test_put_and_get(self, cache):
+        """Test storing and retrieving rules."""
+        assert cache.get("k1") is None
+        
+        cache.put("k1", "SEC-1.1 Encrypt data")
+        
+        assert cache.get("k1") == "SEC-1.1 Encrypt data"
+    
+    def test_persists_across_instances(self, cache):
+        """Test that entries survive reopening the database."""
+        cache.put("k1", "rules")
+        
+        reopened = PolicyRuleCache(cache.path)
+        
+        assert reopened.get("k1") == "rules"
+    
+    def test_size_eviction_drops_least_recently_used(self, cache, clock):
+        """Test that the least recently used entry is evicted first."""
+        cache.put("k1", "rules 1")
+        clock.advance(1)
+        cache.put("k2", "rules 2")
+        clock.advance(1)
+        cache.get("k1")
+        clock.advance(1)
+        cache.put("k3", "rules 3")
+        
+        assert len(cache) == 2
+        assert cache.get("k2") is None
+        assert cache.get("k1") == "rules 1"
+    
+    def test_age_eviction(self, tmp_path, clock):
+        """Test that expired entries are treated as misses."""
+        cache = PolicyRuleCache(tmp_path / "rules.db", max_age_seconds=60, clock=clock)
+        cache.put("k1", "rules")
+        clock.advance(61)
+        
+        assert cache.get("k1") is None
+        assert len(cache) == 0
+
+
+
+class TestSectionFindingsStore:
+    """Tests for the per-section findings store."""
+    
+    def test_put_and_get(self, tmp_path):
+        """Test that stored findings round-trip and clean sections are remembered."""
+        store = SectionFindingsStore(tmp_path / "sections.db")
+        violations = [{"severity": "CRITICAL", "description": "Hardcoded key"}]
+        
+        assert store.get("policy", "fp1") is None
+        
+        store.put("policy", "fp1", violations)
+        store.put("policy", "fp2", [])
+        
+        assert store.get("policy", "fp1") == violations
+        assert store.get("policy", "fp2") == []
+        assert store.get("other policy", "fp1") is None
+        assert len(SectionFindingsStore(store.path)) == 2
+
+    def test_lru_eviction(self, tmp_path, clock):
+        """Test that sections beyond max_entries are evicted least recently used first."""
+        store = SectionFindingsStore(tmp_path / "sections.db", max_entries=2, clock=clock)
+        store.put("policy", "fp1", [])
+        clock.advance(1)
+        store.put("policy", "fp2", [])
+        clock.advance(1)
+        store.get("policy", "fp1")
+        clock.advance(1)
+        store.put("policy", "fp3", [])
+
+        assert len(store) == 2
+        assert store.get("policy", "fp1") == []
+        assert store.get("policy", "fp2") is None
+
+
+class TestCheckpointStore:
+    """Tests for the per-document stage checkpoint store."""
+    
+    def test_put_and_get(self, tmp_path):
+        """Test that stage outputs round-trip per run, document and stage."""
+        store = CheckpointStore(tmp_path / "checkpoints.db")
+        doc = document_key("document text")
+        
+        assert store.get("run", doc, "findings") is None
+        
+        store.put("run", doc, "findings", {"findings": [], "scan_calls": 1})
+        
+        assert store.get("run", doc, "findings") == {"findings": [], "scan_calls": 1}
+        assert store.get("run", document_key("edited text"), "findings") is None
+        assert store.get("other run", doc, "findings") is None
+        assert len(CheckpointStore(store.path)) == 1
+    
+    def test_old_checkpoints_dropped_on_open(self, tmp_path, clock):
+        """Test that expired checkpoints are removed when the store is opened."""
+        CheckpointStore(tmp_path / "checkpoints.db", clock=clock).put("run", "doc", "findings", [])
+        clock.advance(61)
+        
+        assert len(CheckpointStore(tmp_path / "checkpoints.db", max_age_seconds=60, clock=clock)) == 0
+
+
+class RateLimitError(Exception):
+    """Stand-in for the API's 429 error."""
+
+    code = 429
+
+
+class FlakyLlm(StubLlm):
+    """Stub model whose first call is rate limited."""
+
+    attempts: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.attempts += 1
+        if self.attempts == 1:
+            raise RateLimitError("429 RESOURCE_EXHAUSTED")
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+class TestRateLimiter:
+    """Tests for the process-wide rate limiter."""
+    
+    def test_requests_are_paced(self):
+        """Test that calls beyond the burst allowance are spread over time."""
+        limiter = RateLimiter(requests_per_minute=1200, burst_seconds=0.05)
+        
+        async def acquire_all():
+            start_time = time.perf_counter()
+            await asyncio.gather(*(limiter.acquire() for _ in range(6)))
+            return time.perf_counter() - start_time
+        
+        # 20 requests/s with a burst of one: the sixth call waits ~0.25s
+        assert 0.2 < asyncio.run(acquire_all()) < 1.0
+        assert limiter.stats["granted"] == 6
+    
+    def test_token_budget(self):
+        """Test that large calls wait for the token budget."""
+        limiter = RateLimiter(requests_per_minute=60000, tokens_per_minute=60000, burst_seconds=0.1)
+        
+        async def acquire_all():
+            start_time = time.perf_counter()
+            for _ in range(3):
+                await limiter.acquire(tokens=100)
+            return time.perf_counter() - start_time
+        
+        # 1000 tokens/s with a 100-token burst: each further call waits ~0.1s
+        assert 0.15 < asyncio.run(acquire_all()) < 1.0
+    
+    def test_token_budget_without_request_budget(self, monkeypatch):
+        """Test that COMPLIANCE_TPM alone builds a limiter that paces by tokens only."""
+        monkeypatch.setattr(rate_limiter, "_limiter", None)
+        monkeypatch.setattr(rate_limiter, "_limiter_configured", False)
+        monkeypatch.delenv("COMPLIANCE_RPM", raising=False)
+        monkeypatch.setenv("COMPLIANCE_TPM", "60000")
+
+        shared = rate_limiter.get_rate_limiter()
+        assert shared is not None
+        assert (shared.requests_per_minute, shared.tokens_per_minute) == (None, 60000)
+
+        limiter = RateLimiter(tokens_per_minute=60000, burst_seconds=0.1)
+
+        async def acquire_all():
+            start_time = time.perf_counter()
+            await asyncio.gather(*(limiter.acquire() for _ in range(20)))
+            for _ in range(3):
+                await limiter.acquire(tokens=100)
+            return time.perf_counter() - start_time
+
+        # Token-free calls are not paced; 100-token calls wait ~0.1s each after the burst
+        assert 0.15 < asyncio.run(acquire_all()) < 1.0
+        with pytest.raises(ValueError):
+            RateLimiter()
+
+    def test_keys_are_served_round_robin(self):
+        """Test that a key with many queued calls does not starve another key."""
+        limiter = RateLimiter(requests_per_minute=6000, burst_seconds=0.01)
+        order = []
+        
+        async def call(key):
+            await limiter.acquire(key=key)
+            order.append(key)
+        
+        async def run():
+            await asyncio.gather(*[call("big") for _ in range(5)], call("small"))
+        
+        asyncio.run(run())
+        
+        assert order.index("small") <= 2
+    
+    def test_rate_limit_backs_off_once_per_burst(self):
+        """Test that 429s halve the pace once and hold further calls."""
+        limiter = RateLimiter(requests_per_minute=60)
+        
+        limiter.report_rate_limited(retry_after=5)
+        limiter.report_rate_limited()
+        
+        assert limiter.pace == 0.5
+        assert limiter.stats["rate_limited"] == 2
+        assert limiter._delay(0) > 4
+        
+        limiter.report_success()
+        assert limiter.pace == 0.55
+    
+    def test_retry_delay_from_error(self):
+        """Test reading the server's retry delay from a 429 error."""
+        error = Exception("429 RESOURCE_EXHAUSTED. {'retryDelay': '27s'}")
+        
+        assert retry_after_seconds(error) == 27
+        assert retry_after_seconds(Exception("500")) is None
+    
+    def test_wrapped_model_retries_rate_limited_call(self):
+        """Test that a 429 is reported to the limiter and the call is re-queued."""
+        limiter = RateLimiter(requests_per_minute=6000, cooldown_seconds=0.01)
+        inner = FlakyLlm(agent_name="violation_analyzer")
+        model = RateLimitedLlm(model=inner.model, inner=inner, limiter=limiter)
+        
+        response = generate(model, "VIOLATION: Hardcoded password")
+        
+        assert response.content.parts[0].text
+        assert inner.attempts == 2
+        assert limiter.stats["rate_limited"] == 1
+    
+    def test_create_model_uses_shared_limiter(self, monkeypatch):
+        """Test that COMPLIANCE_RPM wraps every model around one limiter."""
+        monkeypatch.setattr(rate_limiter, "_limiter", None)
+        monkeypatch.setattr(rate_limiter, "_limiter_configured", False)
+        monkeypatch.setenv("COMPLIANCE_RPM", "30")
+        
+        first = create_model("policy_extractor", get_retry_config(), backend="stub")
+        second = create_model("rewrite_agent", get_retry_config(), backend="stub")
+        
+        assert isinstance(first.inner, RateLimitedLlm)
+        assert first.inner.limiter is second.inner.limiter
+        assert first.inner.limiter.requests_per_minute == 30
+
+
+def llm_request(prompt, instruction="Scan documents"):
+    """Build a one-turn request like an agent would send."""
+    return LlmRequest(
+        model="stub",
+        contents=[types.Content(role="user", parts=[types.Part(text=prompt)])],
+        config=types.GenerateContentConfig(system_instruction=instruction)
+    )
+
+
+class CountingLlm(StubLlm):
+    """Stub model that counts the calls reaching it."""
+
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+class TestResponseCache:
+    """Tests for the content-addressed response cache."""
+    
+    def test_key_covers_agent_instruction_and_input(self):
+        """Test that changing any key component changes the key."""
+        key = response_cache_key("document_scanner", llm_request("doc"))
+        
+        assert key == response_cache_key("document_scanner", llm_request("doc"))
+        assert key != response_cache_key("violation_analyzer", llm_request("doc"))
+        assert key != response_cache_key("document_scanner", llm_request("doc v2"))
+        assert key != response_cache_key("document_scanner", llm_request("doc", "New instruction"))
+    
+    def test_identical_call_served_from_cache(self, tmp_path):
+        """Test that a repeated call never reaches the model and returns the same answer."""
+        inner = CountingLlm(agent_name="document_scanner")
+        cache = ResponseCache(tmp_path / "responses.db")
+        model = CachedLlm(model=inner.model, inner=inner, cache=cache, agent_name="document_scanner")
+        
+        first = generate(model, "password = hunter2")
+        second = generate(model, "password = hunter2")
+        generate(model, "nothing to see")
+        
+        assert inner.calls == 2
+        assert second.content == first.content
+        assert (cache.hits, cache.misses) == (1, 2)
+    
+    def test_persists_across_instances(self, tmp_path):
+        """Test that cached responses survive reopening the database."""
+        inner = CountingLlm(agent_name="document_scanner")
+        generate(CachedLlm(model=inner.model, inner=inner, agent_name="document_scanner",
+                           cache=ResponseCache(tmp_path / "responses.db")), "doc")
+        generate(CachedLlm(model=inner.model, inner=inner, agent_name="document_scanner",
+                           cache=ResponseCache(tmp_path / "responses.db")), "doc")
+        
+        assert inner.calls == 1
+    
+    def test_ttl_and_lru_eviction(self, tmp_path, clock):
+        """Test that expired and least recently used entries are dropped."""
+        cache = ResponseCache(tmp_path / "responses.db", max_entries=2, max_age_seconds=60, clock=clock)
+        response = [LlmResponse(content=types.Content(role="model", parts=[types.Part(text="ok")]))]
+        cache.put("k1", response)
+        clock.advance(1)
+        cache.put("k2", response)
+        clock.advance(1)
+        cache.get("k1")
+        clock.advance(1)
+        cache.put("k3", response)
+        
+        assert cache.get("k2") is None
+        assert cache.get("k1")[0].content.parts[0].text == "ok"
+        
+        clock.advance(61)
+        assert cache.get("k3") is None
+
+
+class TestMetrics:
+    """Tests for per-agent and per-stage instrumentation."""
+    
+    def test_records_latency_tokens_and_retries(self):
+        """Test that an instrumented call records tokens and rate-limit retries."""
+        recorder = MetricsRecorder()
+        inner = FlakyLlm(agent_name="document_scanner")
+        limited = RateLimitedLlm(model=inner.model, inner=inner, limiter=RateLimiter(6000, cooldown_seconds=0.01))
+        model = InstrumentedLlm(model=inner.model, inner=limited, recorder=recorder, agent_name="document_scanner")
+        
+        generate(model, "password = hunter2")
+        
+        stats = recorder.snapshot()["agents"]["document_scanner"]
+        assert stats["calls"] == 1
+        assert stats["retries"] == 1
+        assert stats["input_tokens"] > 0 and stats["output_tokens"] > 0
+        assert stats["latency"]["count"] == 1
+    
+    def test_cache_hits_cost_no_tokens(self, tmp_path):
+        """Test that calls answered by the response cache are counted without tokens."""
+        recorder = MetricsRecorder()
+        inner = StubLlm(agent_name="document_scanner")
+        cached = CachedLlm(model=inner.model, inner=inner, cache=ResponseCache(tmp_path / "responses.db"),
+                           agent_name="document_scanner")
+        model = InstrumentedLlm(model=inner.model, inner=cached, recorder=recorder, agent_name="document_scanner")
+        
+        generate(model, "doc")
+        tokens = recorder.snapshot()["agents"]["document_scanner"]["input_tokens"]
+        generate(model, "doc")
+        
+        stats = recorder.snapshot()["agents"]["document_scanner"]
+        assert (stats["calls"], stats["cache_hits"]) == (2, 1)
+        assert stats["input_tokens"] == tokens
+    
+    def test_cache_hits_do_not_count_retries(self, tmp_path):
+        """Test that the retries of the original call are not replayed with its cached answer."""
+        recorder = MetricsRecorder()
+        inner = FlakyLlm(agent_name="document_scanner")
+        limited = RateLimitedLlm(model=inner.model, inner=inner, limiter=RateLimiter(6000, cooldown_seconds=0.01))
+        cached = CachedLlm(model=inner.model, inner=limited, cache=ResponseCache(tmp_path / "responses.db"),
+                           agent_name="document_scanner")
+        model = InstrumentedLlm(model=inner.model, inner=cached, recorder=recorder, agent_name="document_scanner")
+
+        for _ in range(3):
+            generate(model, "password = hunter2")
+
+        stats = recorder.snapshot()["agents"]["document_scanner"]
+        assert (stats["calls"], stats["cache_hits"], stats["retries"]) == (3, 2, 1)
+
+    def test_stage_percentiles(self):
+        """Test nearest-rank stage latency percentiles."""
+        recorder = MetricsRecorder()
+        for latency in range(1, 101):
+            recorder.record_stage("scan", latency / 100)
+        with recorder.stage("analysis"):
+            pass
+        
+        stages = recorder.snapshot()["stages"]
+        assert stages["scan"]["p50"] == 0.5
+        assert stages["scan"]["p95"] == 0.95
+        assert stages["scan"]["max"] == 1.0
+        assert stages["analysis"]["count"] == 1
+
+    def test_latency_samples_are_bounded(self):
+        """Test that only max_samples latencies are kept while totals stay exact."""
+        recorder = MetricsRecorder(max_samples=50)
+        for latency in range(1, 1001):
+            recorder.record_call("document_scanner", latency / 1000)
+            recorder.record_stage("scan", latency / 1000)
+
+        assert len(recorder._agents["document_scanner"]["latencies"].samples) == 50
+        assert len(recorder._stages["scan"].samples) == 50
+        latency = recorder.snapshot()["agents"]["document_scanner"]["latency"]
+        assert latency["count"] == 1000
+        assert latency["total"] == pytest.approx(500.5)
+        assert latency["max"] == 1.0
+        assert 0.0 < latency["p50"] <= latency["p95"] <= 1.0
+
+    def test_exports(self, tmp_path):
+        """Test the JSON and Prometheus exports."""
+        recorder = MetricsRecorder()
+        recorder.record_call("rewrite_agent", 0.25, input_tokens=100, output_tokens=20)
+        recorder.record_stage("rewrite", 0.3)
+        
+        recorder.write(tmp_path / "metrics.json")
+        recorder.write(tmp_path / "metrics.prom")
+        
+        data = json.loads((tmp_path / "metrics.json").read_text())
+        assert data["agents"]["rewrite_agent"]["input_tokens"] == 100
+        prom = (tmp_path / "metrics.prom").read_text()
+        assert 'compliance_agent_calls_total{agent="rewrite_agent"} 1' in prom
+        assert 'compliance_agent_output_tokens_total{agent="rewrite_agent"} 20' in prom
+        assert 'compliance_stage_latency_seconds_count{stage="rewrite"} 1' in prom
+        assert "# TYPE compliance_agent_latency_seconds summary" in prom
+
+
+def generate(model, prompt):
+    """Run one StubLlm turn and return its response."""
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=prompt)])])
+
+    async def first_response():
+        # Drain the generator like a runner does, so wrappers see the call complete
+        responses = [response async for response in model.generate_content_async(request)]
+        return responses[0]
+
+    return asyncio.run(first_response())
+
+
+class TestStubLlm:
+    """Tests for the offline stub model."""
+    
+    def test_extractor_generates_rules(self):
+        """Test that numbered policy requirements become rule IDs."""
+        model = StubLlm(agent_name="policy_extractor")
+        
+        response = generate(model, "2.1 Encrypt data at rest.\n3.2 Require MFA.")
+        
+        text = response.content.parts[0].text
+        assert "POL-2.1" in text
+        assert "POL-3.2" in text
+        assert response.usage_metadata.prompt_token_count > 0
+    
+    def test_scanner_flags_document_only(self):
+        """Test that the scanner flags document lines, not the policy text."""
+        model = StubLlm(agent_name="document_scanner")
+        prompt = "COMPLIANCE REQUIREMENTS:\npassword = must be vaulted\n\nDOCUMENT:\nAPI key: sk_live_abc123\n"
+        
+        text = generate(model, prompt).content.parts[0].text
+        
+        assert text.count("VIOLATION") == 1
+        assert "Hardcoded API key" in text
+    
+    def test_scanner_clean_document(self):
+        """Test that a clean document reports no violations."""
+        model = StubLlm(agent_name="document_scanner")
+        
+        text = generate(model, "DOCUMENT:\nSecrets live in the vault.").content.parts[0].text
+        
+        assert text == "NO VIOLATIONS FOUND"
+    
+    def test_latency(self):
+        """Test that configured latency delays the response."""
+        model = StubLlm(agent_name="rewrite_agent", latency=0.05)
+        
+        start = time.perf_counter()
+        generate(model, "VIOLATION: hardcoded key")
+        
+        assert time.perf_counter() - start >= 0.05
+    
+    def test_replay_cycles_recorded_responses(self, tmp_path):
+        """Test that recorded responses are returned in turn."""
+        replay_path = tmp_path / "replay.json"
+        replay_path.write_text(json.dumps({"violation_analyzer": ["Severity: HIGH", "Severity: LOW"]}))
+        model = StubLlm(agent_name="violation_analyzer", replay=load_replay_file(replay_path))
+        
+        texts = [generate(model, "VIOLATION: x").content.parts[0].text for _ in range(3)]
+        
+        assert texts == ["Severity: HIGH", "Severity: LOW", "Severity: HIGH"]
+    
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected."""
+        with pytest.raises(ValueError):
+            create_model("rewrite_agent", get_retry_config(), backend="unknown")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])